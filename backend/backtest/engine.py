@@ -6,6 +6,8 @@ import logging
 import os
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 import pytz
 from pathlib import Path
 from typing import List, Dict, Optional, Any, Tuple
@@ -49,6 +51,7 @@ from engines.market_state_cache import MarketStateCache
 from engines.master_candle import calculate_master_candle, get_ny_rth_session_date, get_session_labels
 from engines.regime_filter import calculate_adx, calculate_chop_index, calculate_vwap, calculate_avg_volume
 from engines.session_range import SessionRangeTracker
+from engines.features.directional_change import detect_structure_multi_scale
 from utils.timeframes import get_session_info, is_in_kill_zone
 from utils.volatility import volatility_score_from_1m
 
@@ -73,8 +76,14 @@ class BacktestEngine:
     - Recalcul HTF seulement quand la bougie HTF clôture
     """
     
-    def __init__(self, config: BacktestConfig):
+    def __init__(self, config: BacktestConfig, preloaded_data: Optional[Dict[str, pd.DataFrame]] = None):
         self.config = config
+        # DataFrames déjà décodés, indexés par chemin de config.data_paths :
+        # load_data() les utilise à la place de pd.read_parquet (runs répétés
+        # dans un même process, ex. smoke tests).
+        self.preloaded_data: Dict[str, pd.DataFrame] = {
+            str(Path(k)): v for k, v in (preloaded_data or {}).items()
+        }
         
         # Engines
         self.market_state_engine = MarketStateEngine()
@@ -301,6 +310,56 @@ class BacktestEngine:
         if config.export_market_state:
             logger.info(f"  Market state export: ENABLED (stride={config.market_state_export_stride})")
     
+    def _read_bounds(self) -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp]]:
+        """Bornes UTC [lo, hi) utiles au run : start_date - htf_warmup_days → end_date (jour inclus)."""
+        lo = hi = None
+        if self.config.start_date:
+            lo = pd.Timestamp(self.config.start_date)
+            lo = lo.tz_localize('UTC') if lo.tz is None else lo.tz_convert('UTC')
+            lo -= pd.Timedelta(days=max(0, self.config.htf_warmup_days))
+        if self.config.end_date:
+            hi = pd.Timestamp(self.config.end_date)
+            hi = hi.tz_localize('UTC') if hi.tz is None else hi.tz_convert('UTC')
+            hi += pd.Timedelta(days=1)
+        return lo, hi
+    
+    def _datetime_filters(self, path: Path) -> Optional[List[Tuple[str, str, Any]]]:
+        """Filtres pyarrow sur la colonne 'datetime' (pushdown : seuls les row groups utiles sont lus)."""
+        lo, hi = self._read_bounds()
+        if lo is None and hi is None:
+            return None
+        schema = pq.read_schema(path)
+        idx = schema.get_field_index('datetime')
+        if idx < 0 or not pa.types.is_timestamp(schema.field(idx).type):
+            return None
+        if schema.field(idx).type.tz is None:
+            # Colonne naïve = UTC implicite (même convention que la normalisation plus bas)
+            lo = lo.tz_localize(None) if lo is not None else None
+            hi = hi.tz_localize(None) if hi is not None else None
+        filters = []
+        if lo is not None:
+            filters.append(('datetime', '>=', lo))
+        if hi is not None:
+            filters.append(('datetime', '<', hi))
+        return filters
+    
+    def _read_data_file(self, path: Path) -> pd.DataFrame:
+        """Lit un fichier parquet, ou une copie du DataFrame préchargé pour ce chemin.
+        
+        Les lectures disque ne matérialisent que la fenêtre du run (warmup HTF inclus) ;
+        le slicing exact reste fait dans load_data.
+        """
+        preloaded = self.preloaded_data.get(str(path))
+        if preloaded is not None:
+            return preloaded.copy()
+        try:
+            filters = self._datetime_filters(path)
+            if filters:
+                return pd.read_parquet(path, filters=filters)
+        except Exception as e:
+            logger.debug(f"  Pushdown filter skipped for {path.name}: {e}")
+        return pd.read_parquet(path)
+    
     def load_data(self):
         """Charge et combine les données historiques"""
         logger.info(f"Loading {len(self.config.data_paths)} data files...")
@@ -309,12 +368,12 @@ class BacktestEngine:
         
         for path_str in self.config.data_paths:
             path = Path(path_str)
-            if not path.exists():
+            if str(path) not in self.preloaded_data and not path.exists():
                 logger.warning(f"File not found: {path}")
                 continue
             
             try:
-                df = pd.read_parquet(path)
+                df = self._read_data_file(path)
                 
                 # P0 BUGFIX: Normalize datetime to avoid index/column ambiguity
                 # Step 1: If index is DatetimeIndex, move it to column safely
@@ -474,7 +533,7 @@ class BacktestEngine:
             for i, path in enumerate(self.config.data_paths):
                 symbol = self.config.symbols[i]
                 path_obj = Path(path)
-                df_warmup = pd.read_parquet(path_obj)
+                df_warmup = self._read_data_file(path_obj)
                 
                 # P0 BUGFIX: Normalize datetime for warmup (same as main load)
                 if isinstance(df_warmup.index, pd.DatetimeIndex):
@@ -542,6 +601,9 @@ class BacktestEngine:
         
         # Séparer par symbole ET créer index par timestamp pour accès O(1)
         self.candles_1m_by_timestamp: Dict[str, Dict[datetime, Candle]] = {}
+        # Même données en colonnes numpy (SoA), alignées par position et triées par ts
+        # (int64 ns UTC) : accès positionnel sans lookup dict par barre.
+        self.candle_arrays: Dict[str, Dict[str, np.ndarray]] = {}
         
         for symbol in self.config.symbols:
             symbol_data = self.combined_data[self.combined_data['symbol'] == symbol].copy()
@@ -563,6 +625,14 @@ class BacktestEngine:
                         volume=row['volume']
                     )
                 self.candles_1m_by_timestamp[symbol] = candles_dict
+                self.candle_arrays[symbol] = {
+                    "ts": pd.DatetimeIndex(symbol_data['datetime']).as_unit('ns').asi8,
+                    "open": symbol_data['open'].to_numpy(dtype=np.float64),
+                    "high": symbol_data['high'].to_numpy(dtype=np.float64),
+                    "low": symbol_data['low'].to_numpy(dtype=np.float64),
+                    "close": symbol_data['close'].to_numpy(dtype=np.float64),
+                    "volume": symbol_data['volume'].to_numpy(),
+                }
                 
                 # DIAGNOSTIC: Compter candles 1m chargés
                 self.debug_counts["candles_loaded_1m"] += len(symbol_data)
@@ -575,6 +645,47 @@ class BacktestEngine:
         # PERF: Ne JAMAIS appeler _build_multi_timeframe_candles (legacy path bloquant)
         # L'agrégation se fait de manière incrémentale via TimeframeAggregator dans le loop
     
+    def sorted_minutes(self) -> pd.DatetimeIndex:
+        """Minutes uniques de combined_data, triées.
+
+        load_data trie déjà combined_data : unique() garde l'ordre d'apparition,
+        donc pas de sorted() Python sur des Timestamps boxés.
+        """
+        minutes = pd.DatetimeIndex(self.combined_data["datetime"]).unique()
+        if not minutes.is_monotonic_increasing:
+            minutes = minutes.sort_values()
+        return minutes
+    
+    # Produits de load_data() : ne dépendent que de _load_key(config)
+    _LOADED_ATTRS = ('data', 'combined_data', 'htf_warmup_data', 'candles_1m_by_timestamp', 'candle_arrays')
+    
+    @staticmethod
+    def _load_key(config: BacktestConfig) -> Tuple:
+        """Champs de config lus par load_data() (run_name : filtre rolling_YYYY-MM)."""
+        return (
+            tuple(config.symbols), tuple(config.data_paths), config.start_date,
+            config.end_date, config.htf_warmup_days, config.run_name,
+        )
+    
+    def reset(self, config: Optional[BacktestConfig] = None) -> None:
+        """Remet le moteur à neuf pour un nouveau run (engines, agrégateur, caches, compteurs).
+        
+        Les données chargées par load_data() sont conservées si la config porte sur
+        les mêmes symboles / fichiers / période : pas de relecture parquet ni de
+        reconstruction des Candle 1m.
+        """
+        config = config or self.config
+        loaded = None
+        if self.combined_data is not None and self._load_key(config) == self._load_key(self.config):
+            loaded = {name: getattr(self, name) for name in self._LOADED_ATTRS}
+            candles_loaded_1m = self.debug_counts["candles_loaded_1m"]
+        
+        self.__init__(config, preloaded_data=self.preloaded_data)
+        
+        if loaded is not None:
+            self.__dict__.update(loaded)
+            self.debug_counts["candles_loaded_1m"] = candles_loaded_1m
+    
     def _build_multi_timeframe_candles(self):
         """Construit des listes de Candle multi-timeframes à partir des Parquet M1."""
         self.multi_tf_candles = {}
@@ -894,7 +1005,7 @@ class BacktestEngine:
         
         # Group by minute (pour traiter SPY et QQQ ensemble)
         self.combined_data["minute"] = self.combined_data["datetime"].dt.floor("1min")
-        minutes = sorted(self.combined_data["datetime"].unique())  # Toutes les bougies 1m
+        minutes = self.sorted_minutes()  # Toutes les bougies 1m
 
         logger.info("\n📊 Processing %d bars (1m driver)...", len(minutes))
 
@@ -1140,7 +1251,6 @@ class BacktestEngine:
             return
 
         # Lazy imports (avoid circular at module load).
-        from engines.features.directional_change import detect_structure_multi_scale
         from engines.features.htf_bias_structure import HTFBiasInputs, compute_htf_bias
         from engines.features.daily_profile import classify_session_profile, is_profile_allowed
         from engines.execution.entry_gates import check_macro_kill_zone
@@ -1393,9 +1503,10 @@ class BacktestEngine:
         if len(candles_1m) > 20:
             ict_1m: List[ICTPattern] = []
             candle_1m_patterns: List[CandlestickPattern] = []
-            raw_1m = self.candlestick_engine.detect_patterns(candles_1m[-100:], timeframe="1m")
+            recent_1m = candles_1m[-100:]  # une seule copie par barre, partagée par les détecteurs
+            raw_1m = self.candlestick_engine.detect_patterns(recent_1m, timeframe="1m")
             candle_1m_patterns = self._convert_candlestick_patterns(raw_1m)
-            det_1m = detect_custom_patterns(candles_1m[-100:], "1m")
+            det_1m = detect_custom_patterns(recent_1m, "1m")
             for plist in det_1m.values():
                 if plist:
                     ict_1m.extend(plist)
@@ -1405,9 +1516,10 @@ class BacktestEngine:
         # 5m detection: on 5m close
         if htf_events.get("is_close_5m") and len(candles_5m) > 10:
             ict_5m: List[ICTPattern] = []
-            raw_5m = self.candlestick_engine.detect_patterns(candles_5m[-100:], timeframe="5m")
+            recent_5m = candles_5m[-100:]
+            raw_5m = self.candlestick_engine.detect_patterns(recent_5m, timeframe="5m")
             self._candle_by_tf["5m"] = self._convert_candlestick_patterns(raw_5m)
-            det_5m = detect_custom_patterns(candles_5m[-100:], "5m")
+            det_5m = detect_custom_patterns(recent_5m, "5m")
             for plist in det_5m.values():
                 if plist:
                     ict_5m.extend(plist)
@@ -1530,7 +1642,6 @@ class BacktestEngine:
         bars_for_struct = None
         if candles_5m and len(candles_5m) >= 20:
             try:
-                from engines.features.directional_change import detect_structure_multi_scale
                 # Bound the window so the ATR-adaptive zigzag stays local.
                 bars_for_struct = candles_5m[-400:]
                 structure_pivots = detect_structure_multi_scale(
@@ -2,11 +2,31 @@
 import logging
 from typing import List, Dict, Any, Optional
 from datetime import datetime
+
+import numpy as np
+
 from models.market_data import Candle, MarketState
 from utils.indicators import detect_structure, calculate_pivot_points
+from utils.streaming_stats import StreamingStat
 
 logger = logging.getLogger(__name__)
 
+# Une ligne par appel à create_market_state (instrumentation SoA, ms)
+INSTRUMENTATION_DTYPE = np.dtype([
+    ('t_prepare', 'f8'),
+    ('t_detect', 'f8'),
+    ('t_bias', 'f8'),
+    ('t_profile', 'f8'),
+    ('t_finalize', 'f8'),
+    ('t_total', 'f8'),
+    ('daily', 'i4'),
+    ('h4', 'i4'),
+    ('h1', 'i4'),
+])
+
+# Étapes chronométrées de create_market_state (champs t_* de INSTRUMENTATION_DTYPE)
+TIMING_STAGES = ('prepare', 'detect', 'bias', 'profile', 'finalize', 'total')
+
 class MarketStateEngine:
     """Moteur d'analyse de l'état du marché et détermination du biais"""
     
@@ -14,6 +34,28 @@ class MarketStateEngine:
         self.current_states = {}  # {symbol: MarketState}
         logger.info("MarketStateEngine initialized")
     
+    def enable_instrumentation_array(self, capacity: int = 100_000):
+        """Active l'instrumentation en tableau structuré préalloué (une ligne par appel)."""
+        self._instrumentation_arr = np.empty(capacity, dtype=INSTRUMENTATION_DTYPE)
+        self._instrumentation_n = 0
+    
+    def instrumentation_array(self) -> np.ndarray:
+        """Lignes remplies de l'instrumentation (vue, sans copie)."""
+        if not hasattr(self, '_instrumentation_arr'):
+            return np.empty(0, dtype=INSTRUMENTATION_DTYPE)
+        return self._instrumentation_arr[:self._instrumentation_n]
+    
+    def enable_timing_summary(self, p: float = 0.95):
+        """Active le résumé des timings en flux (moyenne + quantile p, mémoire constante)."""
+        self._timing_stats = {stage: StreamingStat(p) for stage in TIMING_STAGES}
+    
+    def get_timing_summary(self) -> Dict[str, Dict[str, float]]:
+        """{stage: {'n', 'mean_ms', 'p95_ms'}} depuis enable_timing_summary()."""
+        return {
+            stage: {'n': stat.n, 'mean_ms': stat.mean, 'p95_ms': stat.quantile}
+            for stage, stat in getattr(self, '_timing_stats', {}).items()
+        }
+    
     def analyze_htf_structure(self, daily: List[Candle], h4: List[Candle], h1: List[Candle]) -> Dict[str, str]:
         """
         Analyse la structure sur les timeframes élevés
@@ -334,6 +376,23 @@ class MarketStateEngine:
                 'h4_candles': len(h4),
                 'h1_candles': len(h1)
             })
+        if hasattr(self, '_instrumentation_arr'):
+            n = self._instrumentation_n
+            if n == len(self._instrumentation_arr):
+                self._instrumentation_arr = np.resize(self._instrumentation_arr, max(1, 2 * n))
+            self._instrumentation_arr[n] = (
+                t_prepare_inputs, t_detect_structure, t_bias_calc, t_profile_confluence,
+                t_finalize_state, t_total, len(daily), len(h4), len(h1),
+            )
+            self._instrumentation_n = n + 1
+        if hasattr(self, '_timing_stats'):
+            stats = self._timing_stats
+            stats['prepare'].add(t_prepare_inputs)
+            stats['detect'].add(t_detect_structure)
+            stats['bias'].add(t_bias_calc)
+            stats['profile'].add(t_profile_confluence)
+            stats['finalize'].add(t_finalize_state)
+            stats['total'].add(t_total)
         
         return market_state
         
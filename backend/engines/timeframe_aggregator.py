@@ -3,9 +3,38 @@ Timeframe Aggregator - Agrégation incrémentale des TF supérieurs
 Maintient les buffers 1m et agrège vers 5m/10m/15m/1h uniquement à la clôture
 """
 from typing import Dict, List, Optional, Tuple
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from models.market_data import Candle
 
+# Flags de clôture HTF packés dans un int (add_1m_candle_flags)
+CLOSE_1H = 1
+CLOSE_4H = 2
+CLOSE_1D = 4
+CLOSE_5M = 8
+CLOSE_10M = 16
+CLOSE_15M = 32
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _to_ns(ts: datetime) -> int:
+    """datetime (naïf = UTC) -> ns depuis epoch"""
+    delta = ts - (_EPOCH if ts.tzinfo is None else _EPOCH_UTC)
+    return delta // timedelta(microseconds=1) * 1000
+
+
+def close_events(flags: int) -> Dict[str, bool]:
+    """Flags packés -> dict is_close_* (format renvoyé par add_1m_candle)"""
+    return {
+        "is_close_5m": bool(flags & CLOSE_5M),
+        "is_close_10m": bool(flags & CLOSE_10M),
+        "is_close_15m": bool(flags & CLOSE_15M),
+        "is_close_1h": bool(flags & CLOSE_1H),
+        "is_close_4h": bool(flags & CLOSE_4H),
+        "is_close_1d": bool(flags & CLOSE_1D)
+    }
+
 
 class TimeframeAggregator:
     """
@@ -31,6 +60,10 @@ class TimeframeAggregator:
         self.candles_4h: Dict[str, List[Candle]] = {}
         self.candles_1d: Dict[str, List[Candle]] = {}
         
+        # Timestamp de la dernière bougie complète par (symbol, tf) : lecture O(1)
+        self._last_close: Dict[Tuple[str, str], datetime] = {}
+        self._last_close_ns: Dict[Tuple[str, str], int] = {}
+        
         # Tailles des rolling windows
         self.WINDOW_SIZES = {
             "1m": 500,
@@ -49,6 +82,13 @@ class TimeframeAggregator:
         Returns:
             Dict avec is_close_5m, is_close_10m, is_close_15m, is_close_1h, is_close_4h, is_close_1d
         """
+        return close_events(self.add_1m_candle_flags(candle))
+    
+    def add_1m_candle_flags(self, candle: Candle) -> int:
+        """
+        Comme add_1m_candle, mais retourne les clôtures HTF packées en bits
+        (CLOSE_1H | CLOSE_4H | ...) : un seul int à tester, pas de dict par bougie.
+        """
         symbol = candle.symbol
         
         # Initialiser les listes si nécessaire
@@ -64,7 +104,8 @@ class TimeframeAggregator:
         # Ajouter la bougie 1m
         self.candles_1m[symbol].append(candle)
         if len(self.candles_1m[symbol]) > self.WINDOW_SIZES["1m"]:
-            self.candles_1m[symbol] = self.candles_1m[symbol][-self.WINDOW_SIZES["1m"]:]
+            # Trim en place : pas de copie de 500 références à chaque nouvelle bougie
+            del self.candles_1m[symbol][:-self.WINDOW_SIZES["1m"]]
         
         # Déterminer si c'est une clôture HTF
         ts = candle.timestamp
@@ -92,14 +133,14 @@ class TimeframeAggregator:
         self._update_htf_candle(symbol, candle, "4h", is_close_4h)
         self._update_htf_candle(symbol, candle, "1d", is_close_1d)
         
-        return {
-            "is_close_5m": is_close_5m,
-            "is_close_10m": is_close_10m,
-            "is_close_15m": is_close_15m,
-            "is_close_1h": is_close_1h,
-            "is_close_4h": is_close_4h,
-            "is_close_1d": is_close_1d
-        }
+        return (
+            (CLOSE_1H if is_close_1h else 0)
+            | (CLOSE_4H if is_close_4h else 0)
+            | (CLOSE_1D if is_close_1d else 0)
+            | (CLOSE_5M if is_close_5m else 0)
+            | (CLOSE_10M if is_close_10m else 0)
+            | (CLOSE_15M if is_close_15m else 0)
+        )
     
     def _update_htf_candle(self, symbol: str, candle_1m: Candle, tf: str, is_close: bool):
         """Met à jour une bougie HTF (5m, 10m, 15m, 1h, 4h, 1d).
@@ -122,7 +163,8 @@ class TimeframeAggregator:
         if current is not None and current.timestamp != expected_ts:
             candles_list.append(current)
             if len(candles_list) > self.WINDOW_SIZES[tf]:
-                candles_list[:] = candles_list[-self.WINDOW_SIZES[tf]:]
+                del candles_list[:-self.WINDOW_SIZES[tf]]
+            self._set_last_close(symbol, tf, current.timestamp)
             current_dict[symbol] = None
             current = None
 
@@ -149,7 +191,8 @@ class TimeframeAggregator:
             # Finaliser et ajouter à l'historique
             candles_list.append(current_dict[symbol])
             if len(candles_list) > self.WINDOW_SIZES[tf]:
-                candles_list[:] = candles_list[-self.WINDOW_SIZES[tf]:]
+                del candles_list[:-self.WINDOW_SIZES[tf]]
+            self._set_last_close(symbol, tf, current_dict[symbol].timestamp)
             # Réinitialiser
             current_dict[symbol] = None
     
@@ -177,6 +220,18 @@ class TimeframeAggregator:
         """Retourne les bougies complètes pour un symbole/TF donné"""
         return getattr(self, f"candles_{tf}").get(symbol, [])
     
+    def last_close_ts(self, symbol: str, tf: str) -> Optional[datetime]:
+        """Timestamp de la dernière bougie HTF complète (= get_candles(...)[-1].timestamp), sans parcourir la liste"""
+        return self._last_close.get((symbol, tf))
+    
+    def last_close_ns(self, symbol: str, tf: str) -> int:
+        """Comme last_close_ts, en ns depuis epoch (-1 si aucune) : comparable en bloc via numpy"""
+        return self._last_close_ns.get((symbol, tf), -1)
+    
+    def _set_last_close(self, symbol: str, tf: str, ts: datetime):
+        self._last_close[(symbol, tf)] = ts
+        self._last_close_ns[(symbol, tf)] = _to_ns(ts)
+    
     def get_current_candle(self, symbol: str, tf: str) -> Optional[Candle]:
         """Retourne la bougie HTF en cours de construction (pour visualisation)"""
         current_dict = getattr(self, f"current_{tf}")
@@ -0,0 +1,90 @@
+"""Socle commun des scripts de mesure (p05, p05b, baseline, optimized).
+
+Les imports lourds (engine, modèles) sont faits une seule fois par process :
+un runner qui enchaîne les scripts en process (runpy) les réutilise, ainsi que
+les parquets décodés par make_engine(shared=True).
+"""
+import logging
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from backtest.engine import BacktestEngine
+from engines.timeframe_aggregator import CLOSE_1D, CLOSE_1H, CLOSE_4H
+from models.backtest import BacktestConfig
+
+BENCH_DATA_PATH = '/app/data/historical/1m/SPY.parquet'
+
+# Config commune aux runs de mesure ; chaque script ne donne que run_name et les dates
+BENCH_DEFAULTS: Dict[str, Any] = {
+    'symbols': ['SPY'],
+    'data_paths': [BENCH_DATA_PATH],
+    'initial_capital': 10000.0,
+    'trading_mode': 'AGGRESSIVE',
+    'trade_types': ['DAILY', 'SCALP'],
+}
+
+
+def setup_logging(level: int = logging.ERROR, engines_level: Optional[int] = None) -> None:
+    """Logs réduits pour ne pas fausser les mesures."""
+    logging.basicConfig(level=level)
+    if engines_level is not None:
+        logging.getLogger('engines').setLevel(engines_level)
+
+
+def make_config(config_dict: Dict[str, Any]) -> BacktestConfig:
+    """BacktestConfig sur BENCH_DEFAULTS surchargés par config_dict."""
+    return BacktestConfig(**{**BENCH_DEFAULTS, **config_dict})
+
+
+@lru_cache(maxsize=4)
+def _shared_table(path: str, mtime_ns: int) -> pa.Table:
+    return pq.read_table(path, memory_map=True)
+
+
+def shared_table(path: str) -> pa.Table:
+    """Table Arrow du parquet, décodée une fois par process et par (path, mtime)."""
+    return _shared_table(path, os.stat(path).st_mtime_ns)
+
+
+def make_engine(
+    config_dict: Union[Dict[str, Any], BacktestConfig], load: bool = True, shared: bool = False
+) -> BacktestEngine:
+    """BacktestEngine sur make_config(config_dict), ou sur la config déjà construite (données chargées si load).
+
+    shared : les données viennent de shared_table (fenêtre du run seulement convertie
+    en pandas) au lieu d'une relecture du parquet ; utile quand plusieurs runs
+    s'enchaînent dans le même process.
+    """
+    config = config_dict if isinstance(config_dict, BacktestConfig) else make_config(config_dict)
+    engine = BacktestEngine(config)
+    if shared:
+        for path_str in engine.config.data_paths:
+            path = Path(path_str)
+            if not path.exists():
+                continue  # load_data le signale
+            table = shared_table(str(path))
+            filters = engine._datetime_filters(path)
+            if filters:
+                table = table.filter(pq.filters_to_expression(filters))
+            engine.preloaded_data[str(path)] = table.to_pandas()
+    if load:
+        engine.load_data()
+    return engine
+
+
+def miss_reasons(flags: np.ndarray) -> Dict[str, int]:
+    """Raisons des cache misses depuis les flags de clôture packés, en une passe (bincount)."""
+    counts = np.bincount(flags & (CLOSE_1H | CLOSE_4H | CLOSE_1D), minlength=8)
+    bins = np.arange(8)
+    return {
+        '1h_close': int(counts[(bins & CLOSE_1H) != 0].sum()),
+        '4h_close': int(counts[(bins & CLOSE_4H) != 0].sum()),
+        '1d_close': int(counts[(bins & CLOSE_1D) != 0].sum()),
+        'other': int(counts[0]),
+    }
@@ -0,0 +1,66 @@
+"""Config figée des scripts profile_* et cache disque de leurs données chargées.
+
+Tous les scripts profilent la même journée avec CFG_PROFILE_DAY (un seul cache).
+cached_engine(cfg) restaure les produits de load_data() (_LOADED_ATTRS : frames,
+Candle 1m indexées, tableaux numpy) depuis CACHE_DIR/profile_cache_<hash>.pkl :
+les runs suivants ne relisent ni ne reconvertissent le parquet.
+
+CACHE_DIR est privé (0o700, à l'utilisateur courant) : le pickle n'est chargé
+que depuis un répertoire où personne d'autre ne peut écrire.
+"""
+import hashlib
+import os
+import pickle
+from pathlib import Path
+
+from backtest.engine import BacktestEngine
+from models.backtest import BacktestConfig
+from scripts._bench_common import make_config, make_engine
+
+PROFILE_DAY = '2024-06-12'
+
+CFG_PROFILE_DAY = make_config({'run_name': 'profile_day', 'start_date': PROFILE_DAY, 'end_date': PROFILE_DAY})
+
+CACHE_DIR = Path.home() / '.cache' / 'dexterio' / 'profile'
+
+
+def _private_cache_dir() -> Path:
+    """CACHE_DIR créé en 0o700 ; refusé s'il appartient à un autre utilisateur."""
+    CACHE_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+    st = CACHE_DIR.stat()
+    if st.st_uid != os.getuid():
+        raise PermissionError(f"{CACHE_DIR} n'appartient pas à l'utilisateur courant")
+    if st.st_mode & 0o077:
+        CACHE_DIR.chmod(0o700)
+    return CACHE_DIR
+
+
+def cache_path(cfg: BacktestConfig) -> Path:
+    """Fichier cache de cfg : clé de chargement du moteur + mtime des parquets."""
+    mtimes = tuple(os.stat(p).st_mtime_ns if os.path.exists(p) else None for p in cfg.data_paths)
+    digest = hashlib.sha1(repr((BacktestEngine._load_key(cfg), mtimes)).encode()).hexdigest()[:16]
+    return _private_cache_dir() / f'profile_cache_{digest}.pkl'
+
+
+def prebuild_cache(cfg: BacktestConfig) -> Path:
+    """Charge les données de cfg une fois et les sérialise (no-op si le cache est à jour)."""
+    path = cache_path(cfg)
+    if not path.exists():
+        engine = make_engine(cfg, shared=True)
+        loaded = {name: getattr(engine, name) for name in engine._LOADED_ATTRS}
+        loaded['candles_loaded_1m'] = engine.debug_counts['candles_loaded_1m']
+        tmp = path.with_name(path.name + '.tmp')
+        with open(tmp, 'wb') as f:
+            pickle.dump(loaded, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    return path
+
+
+def cached_engine(cfg: BacktestConfig) -> BacktestEngine:
+    """BacktestEngine(cfg) avec les données restaurées du cache, sans load_data()."""
+    with open(prebuild_cache(cfg), 'rb') as f:
+        loaded = pickle.load(f)
+    engine = BacktestEngine(cfg)
+    engine.debug_counts['candles_loaded_1m'] = loaded.pop('candles_loaded_1m')
+    engine.__dict__.update(loaded)
+    return engine
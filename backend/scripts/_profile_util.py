@@ -0,0 +1,81 @@
+"""Profilage commun aux scripts profile_*.py.
+
+Par défaut : profiler par échantillonnage (pyinstrument, 1 ms) s'il est installé.
+Son coût est fixe par seconde quel que soit le nombre d'appels, et le temps passé
+dans pandas/numpy reste attribué aux bonnes lignes. Sinon, ou avec --cprofile,
+on garde cProfile (instrumentation de chaque appel Python).
+"""
+import cProfile
+import io
+import pstats
+import sys
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+try:
+    from pyinstrument import Profiler as _SamplingProfiler
+except ImportError:  # dépendance optionnelle
+    _SamplingProfiler = None
+
+
+def wants_cprofile(argv: Optional[List[str]] = None) -> bool:
+    """cProfile si demandé (--cprofile) ou si pyinstrument n'est pas installé."""
+    argv = sys.argv[1:] if argv is None else argv
+    return '--cprofile' in argv or _SamplingProfiler is None
+
+
+class ProfileReport:
+    """Résultat d'un bloc sampling_profiler : rapport texte + fichier écrit."""
+
+    def __init__(self, profiler, path: str):
+        self.profiler = profiler
+        self.path = path
+
+    @property
+    def is_cprofile(self) -> bool:
+        return isinstance(self.profiler, cProfile.Profile)
+
+    def text(self, limit: Optional[int] = 20, *restrictions: str) -> str:
+        """Top `limit` (cumulatif, None = tout) ; restrictions = filtres de nom comme pstats.print_stats."""
+        if self.is_cprofile:
+            amount = restrictions if limit is None else (*restrictions, limit)
+            s = io.StringIO()
+            pstats.Stats(self.profiler, stream=s).sort_stats('cumulative').print_stats(*amount)
+            return s.getvalue()
+        out = self.profiler.output_text(unicode=True, color=False)
+        if restrictions:
+            out = '\n'.join(line for line in out.splitlines() if any(r in line for r in restrictions))
+        return out
+
+
+@contextmanager
+def sampling_profiler(
+    output_path: str,
+    cprofile: Optional[bool] = None,
+    interval: float = 0.001,
+    full_limit: int = 100,
+) -> Iterator[ProfileReport]:
+    """Profile le bloc ; écrit output_path + '.html' (échantillonnage) ou '.txt' (cProfile)."""
+    if cprofile is None:
+        cprofile = wants_cprofile()
+    if cprofile:
+        report = ProfileReport(cProfile.Profile(), output_path + '.txt')
+    else:
+        report = ProfileReport(_SamplingProfiler(interval=interval), output_path + '.html')
+
+    profiler = report.profiler
+    if report.is_cprofile:
+        profiler.enable()
+    else:
+        profiler.start()
+    try:
+        yield report
+    finally:
+        if report.is_cprofile:
+            profiler.disable()
+            with open(report.path, 'w') as f:
+                f.write(report.text(full_limit))
+        else:
+            profiler.stop()
+            with open(report.path, 'w') as f:
+                f.write(profiler.output_html())
@@ -4,38 +4,27 @@ import sys
 import time
 import logging
 from pathlib import Path
-from datetime import datetime
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-# Logs WARNING seulement
-logging.basicConfig(level=logging.WARNING)
-logging.getLogger('engines').setLevel(logging.ERROR)
+from scripts._bench_common import make_engine, setup_logging  # noqa: E402
 
-from backtest.engine import BacktestEngine
-from models.backtest import BacktestConfig
+# Logs WARNING seulement
+setup_logging(logging.WARNING, engines_level=logging.ERROR)
 
 def run_baseline_test():
-    """Test baseline sur 30 minutes (assez pour mesurer mais pas trop long)"""
-    config = BacktestConfig(
-        run_name='baseline_30min',
-        start_date=datetime(2024, 6, 12, 9, 30, 0),
-        end_date=datetime(2024, 6, 12, 10, 0, 0),
-        symbols=['SPY'],
-        data_paths=['/app/data/historical/1m/SPY.parquet'],
-        initial_capital=10000.0,
-        trading_mode='AGGRESSIVE',
-        trade_types=['DAILY', 'SCALP']
-    )
-    
+    """Test baseline sur une journée (assez pour mesurer mais pas trop long)"""
     print("Loading data...")
     t_start = time.time()
-    engine = BacktestEngine(config)
-    engine.load_data()
+    engine = make_engine({
+        'run_name': 'baseline_1day',
+        'start_date': '2024-06-12',
+        'end_date': '2024-06-12',
+    })
     t_load = time.time() - t_start
     
     print(f"Data loaded in {t_load:.2f}s")
-    print("Running BASELINE (30 minutes)...")
+    print("Running BASELINE (1 day)...")
     
     t_run_start = time.time()
     result = engine.run()
@@ -50,7 +39,7 @@ if __name__ == "__main__":
     
     result, t_load, t_run, engine = run_baseline_test()
     
-    bars = 30  # 30 minutes
+    bars = len(engine.sorted_minutes())
     total_time = t_load + t_run
     ms_per_bar = (t_run / bars) * 1000
     bars_per_sec = bars / t_run if t_run > 0 else 0
@@ -67,8 +56,8 @@ if __name__ == "__main__":
     
     print(f"\n📊 TRADES")
     print(f"Total: {result.total_trades}")
-    print(f"Total R: {result.total_r:+.2f}R")
-    print(f"Win Rate: {result.win_rate:.1f}%")
+    print(f"Total R: {result.total_pnl_r:+.2f}R")
+    print(f"Win Rate: {result.winrate:.1f}%")
     
     print(f"\n🛡️ ANTI-SPAM")
     print(f"Blocked by cooldown: {engine.blocked_by_cooldown}")
@@ -89,7 +78,7 @@ if __name__ == "__main__":
         f.write(f"ms_per_bar={ms_per_bar}\n")
         f.write(f"bars_per_sec={bars_per_sec}\n")
         f.write(f"trades={result.total_trades}\n")
-        f.write(f"total_r={result.total_r}\n")
+        f.write(f"total_r={result.total_pnl_r}\n")
         f.write(f"cooldown_blocks={engine.blocked_by_cooldown}\n")
         f.write(f"session_blocks={engine.blocked_by_session_limit}\n")
     
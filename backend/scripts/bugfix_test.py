@@ -3,8 +3,11 @@
 import sys
 import time
 import logging
+from functools import lru_cache
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
+
+import pandas as pd
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
@@ -15,6 +18,23 @@ logging.getLogger('engines').setLevel(logging.ERROR)
 from backtest.engine import BacktestEngine
 from models.backtest import BacktestConfig
 
+
+@lru_cache(maxsize=4)
+def _load_parquet(path: str) -> pd.DataFrame:
+    """Décode le parquet une seule fois par process (réutilisé entre invocations)."""
+    return pd.read_parquet(path)
+
+
+def _preload_window(path: str, config: BacktestConfig) -> pd.DataFrame:
+    """Tranche du parquet couvrant [start - warmup HTF, end + 1 jour) en UTC."""
+    df = _load_parquet(path)
+    ts = df.index if isinstance(df.index, pd.DatetimeIndex) else df['datetime']
+    ts = pd.to_datetime(ts, utc=True)
+    lo = pd.Timestamp(config.start_date, tz='UTC') - timedelta(days=config.htf_warmup_days)
+    hi = pd.Timestamp(config.end_date, tz='UTC') + timedelta(days=1)
+    return df[(ts >= lo) & (ts < hi)]
+
+
 print("="*80)
 print("BUGFIX VALIDATION - 5 minutes test")
 print("="*80)
@@ -32,7 +52,10 @@ config = BacktestConfig(
 
 print("Loading data...")
 t_start = time.time()
-engine = BacktestEngine(config)
+engine = BacktestEngine(
+    config,
+    preloaded_data={p: _preload_window(p, config) for p in config.data_paths},
+)
 engine.load_data()
 t_load = time.time() - t_start
 
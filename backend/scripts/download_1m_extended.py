@@ -12,14 +12,22 @@ Usage:
     python -m scripts.download_1m_extended --all --months 6
 """
 import argparse
+import hashlib
 import json
 import logging
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, date
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 try:
     import yfinance as yf
@@ -54,16 +62,168 @@ MIN_BARS_PER_DAY = 360  # ~6h de trading (390 min session RTH)
 RTH_START = "09:30"  # Regular Trading Hours start
 RTH_END = "16:00"    # Regular Trading Hours end
 
+# Écriture parquet: row groups d'~1 semaine RTH (390 barres/jour x 5) pour que
+# les lecteurs puissent filtrer par date via les statistiques min/max
+PARQUET_ROW_GROUP_SIZE = 390 * 5
+PARQUET_DATA_PAGE_SIZE = 1 << 20
+
+# Origine de la colonne 'day_index' (int32, jours calendaires locaux depuis cette date)
+DAY_INDEX_EPOCH = np.datetime64('2024-01-01', 'D')
+
+# Cache disque des fenêtres téléchargées (clé: symbol|start|end)
+CACHE_DIR = DATA_DIR / ".window_cache"
+# Fenêtre récente (peut encore bouger côté Yahoo): TTL 24h
+RECENT_WINDOW_TTL_SECONDS = 24 * 3600
+# Fenêtre terminée depuis plus de N jours: données figées, pas d'expiration
+IMMUTABLE_AFTER_DAYS = 7
+
+# Compteurs hit/miss du cache par symbole (logués en fin de download_extended).
+# Un compteur par symbole: les symboles sont téléchargés en parallèle (threads).
+CACHE_STATS: Dict[str, Dict[str, int]] = {}
+
+
+def _cache_stats(symbol: str) -> Dict[str, int]:
+    return CACHE_STATS.setdefault(symbol, {'hits': 0, 'misses': 0})
+
+
+def compute_day_index(dt: pd.Series) -> np.ndarray:
+    """
+    Index de jour int32 (jour calendaire dans le fuseau des timestamps).
+    
+    Stocké dans le parquet: les lecteurs groupent sur un int32 au lieu de
+    reconvertir chaque timestamp en objet datetime.date.
+    """
+    if dt.dt.tz is not None:
+        dt = dt.dt.tz_localize(None)  # heure locale "murale", jour local correct
+    return (dt.values.astype('datetime64[D]') - DAY_INDEX_EPOCH).astype('int32')
+
+
+def day_index_to_str(day_index: np.ndarray) -> List[str]:
+    """Inverse de compute_day_index: index de jour -> 'YYYY-MM-DD'."""
+    days = DAY_INDEX_EPOCH + np.asarray(day_index).astype('timedelta64[D]')
+    return [str(d) for d in days]
+
+
+# ============================================================================
+# CACHE DISQUE DES FENÊTRES
+# ============================================================================
+
+def window_cache_path(symbol: str, start_date: date, end_date: date, cache_dir: Path = CACHE_DIR) -> Path:
+    """Chemin du parquet de cache pour une fenêtre (symbol, start, end)."""
+    key = hashlib.sha256(f"{symbol}|{start_date}|{end_date}".encode()).hexdigest()
+    return cache_dir / f"{key}.parquet"
+
+
+def load_cached_window(
+    symbol: str,
+    start_date: date,
+    end_date: date,
+    cache_dir: Path = CACHE_DIR,
+) -> Optional[pd.DataFrame]:
+    """
+    Relit une fenêtre depuis le cache disque si elle est encore valide.
+    
+    Les fenêtres terminées depuis plus de IMMUTABLE_AFTER_DAYS jours n'expirent
+    jamais; les fenêtres récentes expirent après RECENT_WINDOW_TTL_SECONDS.
+    
+    Returns:
+        DataFrame ou None si absent/expiré/illisible
+    """
+    path = window_cache_path(symbol, start_date, end_date, cache_dir)
+    if not path.exists():
+        return None
+    
+    immutable = end_date < date.today() - timedelta(days=IMMUTABLE_AFTER_DAYS)
+    if not immutable and time.time() - path.stat().st_mtime > RECENT_WINDOW_TTL_SECONDS:
+        return None
+    
+    try:
+        return pd.read_parquet(path)
+    except Exception as e:
+        logger.warning(f"  Cache illisible ({path.name}): {e}")
+        return None
+
+
+def store_cached_window(
+    df: pd.DataFrame,
+    symbol: str,
+    start_date: date,
+    end_date: date,
+    cache_dir: Path = CACHE_DIR,
+) -> None:
+    """Écrit une fenêtre dans le cache disque (écriture atomique via os.replace)."""
+    path = window_cache_path(symbol, start_date, end_date, cache_dir)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.warning(f"  Écriture cache échouée ({path.name}): {e}")
+
+
+def downcast_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    OHLC en float32 et volume en int32 (divise par 2 les octets lus en aval).
+    
+    Barres 1m actions: tick >= 0.01, float32 (~7 chiffres significatifs) suffit.
+    Le volume n'est converti que s'il est complet et tient dans un int32.
+    """
+    out = df.astype({col: 'float32' for col in ['open', 'high', 'low', 'close'] if col in df.columns})
+    if 'volume' in out.columns:
+        volume = out['volume']
+        if volume.notna().all() and volume.max() <= np.iinfo(np.int32).max:
+            out['volume'] = volume.astype('int32')
+    return out
+
+
+def write_parquet(df: pd.DataFrame, path: Path) -> None:
+    """
+    Écrit un DataFrame en parquet via pyarrow (snappy + dictionnaire + statistiques).
+    
+    Row groups de PARQUET_ROW_GROUP_SIZE lignes: le backtester peut sauter les
+    groupes hors période grâce aux statistiques min/max de 'datetime'.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pq.write_table(
+        table,
+        path,
+        compression='snappy',
+        use_dictionary=True,
+        row_group_size=PARQUET_ROW_GROUP_SIZE,
+        data_page_size=PARQUET_DATA_PAGE_SIZE,
+        write_statistics=True,
+    )
+
 
 # ============================================================================
 # DOWNLOADER WINDOWED
 # ============================================================================
 
+def build_http_session() -> requests.Session:
+    """
+    Session HTTP keep-alive partagée par toutes les fenêtres d'un symbole.
+    
+    Évite un handshake TCP+TLS par fenêtre; les erreurs transitoires
+    (429/5xx) sont rejouées par l'adapter avec backoff.
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+    )
+    session.mount('https://', HTTPAdapter(pool_connections=8, pool_maxsize=64, max_retries=retry))
+    return session
+
+
 def download_window(
     symbol: str,
     start_date: date,
     end_date: date,
-    retries: int = 3
+    retries: int = 3,
+    use_cache: bool = True,
+    ticker: Optional["yf.Ticker"] = None,
 ) -> Optional[pd.DataFrame]:
     """
     Télécharge une fenêtre de données 1m.
@@ -73,13 +233,23 @@ def download_window(
         start_date: Date de début
         end_date: Date de fin
         retries: Nombre de tentatives
+        use_cache: Lire/écrire le cache disque (CACHE_DIR) avant tout appel HTTP
+        ticker: yf.Ticker réutilisé entre fenêtres (créé à la volée si None)
     
     Returns:
         DataFrame ou None si échec
     """
+    if use_cache:
+        cached = load_cached_window(symbol, start_date, end_date)
+        if cached is not None:
+            _cache_stats(symbol)['hits'] += 1
+            return cached
+        _cache_stats(symbol)['misses'] += 1
+    
     for attempt in range(retries):
         try:
-            ticker = yf.Ticker(symbol)
+            if ticker is None:
+                ticker = yf.Ticker(symbol)
             df = ticker.history(
                 start=start_date.strftime('%Y-%m-%d'),
                 end=end_date.strftime('%Y-%m-%d'),
@@ -107,6 +277,9 @@ def download_window(
             available = [c for c in required if c in df.columns]
             df = df[available]
             
+            if use_cache:
+                store_cached_window(df, symbol, start_date, end_date)
+            
             return df
             
         except Exception as e:
@@ -122,6 +295,7 @@ def download_extended(
     date_from: date,
     date_to: date,
     output_path: Optional[Path] = None,
+    use_cache: bool = True,
 ) -> Tuple[Optional[pd.DataFrame], Dict[str, Any]]:
     """
     Télécharge des données 1m étendues par fenêtres de 7 jours.
@@ -131,6 +305,7 @@ def download_extended(
         date_from: Date de début
         date_to: Date de fin
         output_path: Chemin de sortie (optionnel)
+        use_cache: Réutiliser les fenêtres déjà téléchargées (cache disque)
     
     Returns:
         (DataFrame combiné, rapport de qualité)
@@ -144,6 +319,9 @@ def download_extended(
     all_chunks: List[pd.DataFrame] = []
     windows_info: List[Dict[str, Any]] = []
     
+    # Un seul Ticker (et une seule session keep-alive) pour toutes les fenêtres
+    ticker = yf.Ticker(symbol, session=build_http_session())
+    
     current_start = date_from
     window_num = 0
     
@@ -153,7 +331,9 @@ def download_extended(
         
         logger.info(f"\n📦 Fenêtre {window_num}: {current_start} -> {current_end}")
         
-        df = download_window(symbol, current_start, current_end)
+        hits_before = _cache_stats(symbol)['hits']
+        df = download_window(symbol, current_start, current_end, use_cache=use_cache, ticker=ticker)
+        from_cache = _cache_stats(symbol)['hits'] > hits_before
         
         window_info = {
             'window_num': window_num,
@@ -161,18 +341,21 @@ def download_extended(
             'end': str(current_end),
             'success': df is not None,
             'bars': len(df) if df is not None else 0,
+            'cached': from_cache,
         }
         
         if df is not None and len(df) > 0:
-            logger.info(f"   ✅ {len(df)} barres téléchargées")
+            source = "cache" if from_cache else "téléchargées"
+            logger.info(f"   ✅ {len(df)} barres ({source})")
             all_chunks.append(df)
         else:
             logger.warning(f"   ❌ Échec ou vide")
         
         windows_info.append(window_info)
         
-        # Pause pour éviter rate limiting
-        time.sleep(REQUEST_DELAY_SECONDS)
+        # Pause pour éviter rate limiting (inutile si servi depuis le cache)
+        if not from_cache:
+            time.sleep(REQUEST_DELAY_SECONDS)
         
         current_start = current_end
     
@@ -181,6 +364,10 @@ def download_extended(
         logger.error("Aucune donnée téléchargée!")
         return None, {'error': 'No data downloaded', 'windows': windows_info}
     
+    if use_cache:
+        stats = _cache_stats(symbol)
+        logger.info(f"\n🗄️ Cache fenêtres {symbol}: {stats['hits']} hits / {stats['misses']} misses")
+    
     logger.info(f"\n🔗 Combinaison de {len(all_chunks)} chunks...")
     
     combined = pd.concat(all_chunks, ignore_index=True)
@@ -194,14 +381,18 @@ def download_extended(
     logger.info(f"   Total: {len(combined)} barres ({duplicates_removed} doublons supprimés)")
     logger.info(f"   Range: {combined['datetime'].min()} -> {combined['datetime'].max()}")
     
+    # Clé de jour persistée avec les données (évite de la re-dériver en aval)
+    combined['day_index'] = compute_day_index(combined['datetime'])
+    
     # Quality gates
     quality_report = run_quality_gates(combined, symbol)
     quality_report['windows'] = windows_info
     quality_report['duplicates_removed'] = duplicates_removed
     
-    # Sauvegarder si chemin fourni
+    # Sauvegarder si chemin fourni (gates calculés en float64, stockage réduit)
     if output_path:
-        combined.to_parquet(output_path, index=False)
+        combined = downcast_ohlcv(combined)
+        write_parquet(combined, output_path)
         logger.info(f"\n💾 Sauvegardé: {output_path}")
         
         # Sauvegarder rapport qualité
@@ -217,6 +408,12 @@ def download_extended(
 # QUALITY GATES
 # ============================================================================
 
+def count_invalid_ohlc(o: np.ndarray, h: np.ndarray, l: np.ndarray, c: np.ndarray) -> int:
+    """Nombre de barres OHLC incohérentes (un seul masque numpy, sans dispatch pandas)."""
+    invalid = (h < l) | (c > h) | (c < l) | (o > h) | (o < l)
+    return int(np.count_nonzero(invalid))
+
+
 def run_quality_gates(df: pd.DataFrame, symbol: str) -> Dict[str, Any]:
     """
     Exécute les quality gates sur les données.
@@ -267,50 +464,38 @@ def run_quality_gates(df: pd.DataFrame, symbol: str) -> Dict[str, Any]:
         'missing': missing_cols,
     }
     
-    # Gate 4: Données OHLC valides
+    # Gate 4: Données OHLC valides (masque numpy sur les tableaux contigus)
     if gate_cols:
-        invalid_rows = (
-            (df['high'] < df['low']) |
-            (df['close'] > df['high']) |
-            (df['close'] < df['low']) |
-            (df['open'] > df['high']) |
-            (df['open'] < df['low'])
-        ).sum()
+        invalid_rows = count_invalid_ohlc(
+            df['open'].to_numpy(),
+            df['high'].to_numpy(),
+            df['low'].to_numpy(),
+            df['close'].to_numpy(),
+        )
         gate_ohlc = invalid_rows == 0
         report['gates']['valid_ohlc'] = {
             'passed': gate_ohlc,
             'invalid_rows': int(invalid_rows),
         }
     
-    # Gate 5: Analyse par jour
-    df['date'] = df['datetime'].dt.date
-    daily_stats = []
-    
-    for day, day_df in df.groupby('date'):
-        # Filtrer RTH seulement
-        day_df = day_df.copy()
-        day_df['time'] = day_df['datetime'].dt.time
-        
-        # Compter les barres
-        n_bars = len(day_df)
-        
-        # Calculer les barres attendues (390 min de session RTH)
-        expected_bars = 390
-        
-        # Calculer le % manquant
-        missing_pct = max(0, (expected_bars - n_bars) / expected_bars * 100)
-        
-        day_stat = {
-            'date': str(day),
-            'bars': n_bars,
+    # Gate 5: Analyse par jour (un seul groupby vectorisé, pas de boucle par jour)
+    # Barres attendues: 390 min de session RTH
+    expected_bars = 390
+    day_index = df['day_index'].to_numpy() if 'day_index' in df.columns else compute_day_index(df['datetime'])
+    days, n_bars = np.unique(day_index, return_counts=True)
+    missing_pct = np.clip((expected_bars - n_bars) / expected_bars * 100, 0, None)
+    
+    daily_stats = [
+        {
+            'date': day,
+            'bars': int(bars),
             'expected': expected_bars,
-            'missing_pct': round(missing_pct, 2),
-            'rejected': missing_pct > MAX_MISSING_BARS_PCT,
+            'missing_pct': round(float(pct), 2),
+            'rejected': bool(pct > MAX_MISSING_BARS_PCT),
         }
-        daily_stats.append(day_stat)
-        
-        if day_stat['rejected']:
-            report['rejected_days'].append(str(day))
+        for day, bars, pct in zip(day_index_to_str(days), n_bars, missing_pct)
+    ]
+    report['rejected_days'] = [d['date'] for d in daily_stats if d['rejected']]
     
     report['daily_stats'] = daily_stats
     
@@ -358,6 +543,7 @@ def main():
     parser.add_argument("--months", type=int, default=6, help="Nombre de mois à télécharger (défaut: 6)")
     parser.add_argument("--all", action="store_true", help="Télécharger tous les symboles")
     parser.add_argument("--output-dir", type=str, default=str(DATA_DIR), help="Répertoire de sortie")
+    parser.add_argument("--no-cache", action="store_true", help="Ignorer le cache disque des fenêtres")
     
     args = parser.parse_args()
     
@@ -385,19 +571,26 @@ def main():
     logger.info(f"Période: {date_from} -> {date_to}")
     logger.info(f"Sortie: {output_dir}")
     
-    all_reports = {}
+    # Symboles indépendants et I/O-bound: un thread par symbole
+    reports_by_symbol: Dict[str, Dict[str, Any]] = {}
+    
+    with ThreadPoolExecutor(max_workers=len(symbols)) as executor:
+        futures = {
+            executor.submit(
+                download_extended,
+                symbol=symbol,
+                date_from=date_from,
+                date_to=date_to,
+                output_path=output_dir / f"{symbol.lower()}_1m_extended.parquet",
+                use_cache=not args.no_cache,
+            ): symbol
+            for symbol in symbols
+        }
+        for future in as_completed(futures):
+            _, report = future.result()
+            reports_by_symbol[futures[future]] = report
     
-    for symbol in symbols:
-        output_path = output_dir / f"{symbol.lower()}_1m_extended.parquet"
-        
-        df, report = download_extended(
-            symbol=symbol,
-            date_from=date_from,
-            date_to=date_to,
-            output_path=output_path,
-        )
-        
-        all_reports[symbol] = report
+    all_reports = {symbol: reports_by_symbol[symbol] for symbol in symbols}
     
     # Rapport consolidé
     consolidated_path = output_dir / "data_quality_report.json"
@@ -5,9 +5,13 @@ Stratégie : 30 derniers jours complets → découpage en blocs de 6 jours
 import yfinance as yf
 import pandas as pd
 import numpy as np
+import pyarrow.parquet as pq
 from pathlib import Path
 from datetime import datetime, timedelta
+import hashlib
+import json
 import logging
+import os
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -17,11 +21,17 @@ DATA_DIR = Path("/app/data/historical")
 DATA_DIR_1M = DATA_DIR / "1m"
 DATA_DIR_5M = DATA_DIR / "5m"
 
+# Cache des métriques de blocs (clé: hash du contenu OHLC)
+ANALYTICS_CACHE_DIR = DATA_DIR_1M / ".analytics_cache"
+
 DATA_DIR_1M.mkdir(parents=True, exist_ok=True)
 DATA_DIR_5M.mkdir(parents=True, exist_ok=True)
 
 SYMBOLS = ["SPY", "QQQ"]
 
+REQUIRED_COLUMNS = ['datetime', 'open', 'high', 'low', 'close', 'volume']
+OHLC_COLUMNS = ['open', 'high', 'low', 'close']
+
 
 def download_last_n_days_1m(symbol: str, days: int = 7):
     """
@@ -132,16 +142,10 @@ def download_multiple_7day_blocks(symbol: str, num_blocks: int = 4):
     return all_dfs
 
 
-def analyze_block_characteristics(df: pd.DataFrame, block_name: str):
-    """
-    Analyse les caractéristiques d'un bloc de données
-    
-    Returns:
-        Dict avec métriques (volatilité, trend, range, etc.)
-    """
+def _compute_block_metrics(df: pd.DataFrame):
+    """Calcule les métriques d'un bloc (fonction pure du contenu OHLC)"""
     # Calculer ATR (Average True Range) simplifié
-    df['tr'] = df[['high', 'low']].apply(lambda x: x['high'] - x['low'], axis=1)
-    atr = df['tr'].mean()
+    atr = (df['high'] - df['low']).mean()
     
     # Calculer le range total
     price_range = df['high'].max() - df['low'].min()
@@ -162,23 +166,81 @@ def analyze_block_characteristics(df: pd.DataFrame, block_name: str):
     avg_price = df['close'].mean()
     volatility_pct = (atr / avg_price) * 100
     
+    return {
+        'atr': round(float(atr), 2),
+        'volatility_pct': round(float(volatility_pct), 3),
+        'price_range': round(float(price_range), 2),
+        'directional_move': round(float(directional_move), 2),
+        'directional_pct': round(float(directional_pct), 2),
+        'is_trend': bool(is_trend),
+        'trend_type': trend_type,
+        'first_close': round(float(first_close), 2),
+        'last_close': round(float(last_close), 2)
+    }
+
+
+def analyze_block_characteristics(df: pd.DataFrame, block_name: str):
+    """
+    Analyse les caractéristiques d'un bloc de données
+    
+    Les métriques sont mémoïsées sur disque (ANALYTICS_CACHE_DIR) par un hash
+    blake2b du contenu OHLC: un bloc identique n'est pas recalculé.
+    
+    Returns:
+        Dict avec métriques (volatilité, trend, range, etc.)
+    """
+    key = hashlib.blake2b(
+        df[OHLC_COLUMNS].to_numpy().tobytes(), digest_size=16
+    ).hexdigest()
+    cache_path = ANALYTICS_CACHE_DIR / f"{key}.json"
+    
+    metrics = None
+    if cache_path.exists():
+        try:
+            metrics = json.loads(cache_path.read_text())
+        except (OSError, ValueError):
+            metrics = None
+    
+    if metrics is None:
+        metrics = _compute_block_metrics(df)
+        ANALYTICS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(json.dumps(metrics))
+    
     return {
         'name': block_name,
         'start': df['datetime'].min(),
         'end': df['datetime'].max(),
         'bars': len(df),
-        'atr': round(atr, 2),
-        'volatility_pct': round(volatility_pct, 3),
-        'price_range': round(price_range, 2),
-        'directional_move': round(directional_move, 2),
-        'directional_pct': round(directional_pct, 2),
-        'is_trend': is_trend,
-        'trend_type': trend_type,
-        'first_close': round(first_close, 2),
-        'last_close': round(last_close, 2)
+        **metrics
     }
 
 
+def write_block_if_changed(block_df: pd.DataFrame, filepath: Path) -> bool:
+    """
+    Écrit un bloc parquet seulement si son contenu a changé
+    
+    L'empreinte (sha256 des timestamps + close) est stockée dans un fichier
+    compagnon `{filepath}.sha256`. L'écriture passe par un fichier temporaire
+    puis os.replace pour ne jamais laisser de parquet partiel.
+    
+    Returns:
+        True si le fichier a été (ré)écrit, False si inchangé
+    """
+    block_hash = hashlib.sha256(
+        block_df['datetime'].values.tobytes() + block_df['close'].values.tobytes()
+    ).hexdigest()
+    sidecar = filepath.with_name(filepath.name + ".sha256")
+    
+    if filepath.exists() and sidecar.exists() and sidecar.read_text().strip() == block_hash:
+        return False
+    
+    tmp_path = filepath.with_name(filepath.name + ".tmp")
+    block_df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, filepath)
+    sidecar.write_text(block_hash)
+    return True
+
+
 def split_into_6day_blocks(df: pd.DataFrame, symbol: str):
     """
     Découpe un DataFrame en blocs de 6 jours de trading consécutifs
@@ -192,9 +254,15 @@ def split_into_6day_blocks(df: pd.DataFrame, symbol: str):
     """
     logger.info(f"\n🔪 Découpage en blocs de 6 jours pour {symbol}")
     
-    # Grouper par jour
-    df['date'] = df['datetime'].dt.date
-    days = df['date'].unique()
+    # Grouper par jour: colonne int32 'day_index' si déjà persistée dans le
+    # parquet (download_1m_extended), sinon datetime64 normalisé.
+    # df trié => clés de jour triées => chaque bloc est une tranche contiguë.
+    df = df.sort_values('datetime').reset_index(drop=True)
+    if 'day_index' in df.columns:
+        day_values = df['day_index'].to_numpy()
+    else:
+        day_values = df['datetime'].dt.normalize().values
+    days = np.unique(day_values)
     
     logger.info(f"   Total jours de trading : {len(days)}")
     
@@ -209,9 +277,10 @@ def split_into_6day_blocks(df: pd.DataFrame, symbol: str):
             logger.info(f"   Bloc {block_num} ignoré (seulement {len(block_days)} jours)")
             continue
         
-        # Extraire les données de ce bloc
-        block_df = df[df['date'].isin(block_days)].copy()
-        block_df = block_df.drop('date', axis=1)
+        # Extraire les données de ce bloc (recherche dichotomique, pas de scan complet)
+        lo = np.searchsorted(day_values, block_days[0], side='left')
+        hi = np.searchsorted(day_values, block_days[-1], side='right')
+        block_df = df.iloc[lo:hi]
         
         # Nom du bloc
         start_date = block_df['datetime'].min().strftime('%Y%m%d')
@@ -221,10 +290,10 @@ def split_into_6day_blocks(df: pd.DataFrame, symbol: str):
         # Analyser les caractéristiques
         characteristics = analyze_block_characteristics(block_df, block_name)
         
-        # Sauvegarder le bloc
+        # Sauvegarder le bloc (ignoré si identique au fichier existant)
         filename = f"{symbol.lower()}_1m_{block_name}.parquet"
         filepath = DATA_DIR_1M / filename
-        block_df.to_parquet(filepath, index=False)
+        written = write_block_if_changed(block_df, filepath)
         
         blocks.append({
             'symbol': symbol,
@@ -234,7 +303,7 @@ def split_into_6day_blocks(df: pd.DataFrame, symbol: str):
             **characteristics
         })
         
-        logger.info(f"   ✅ Bloc {block_num} : {start_date} → {end_date}")
+        logger.info(f"   ✅ Bloc {block_num} : {start_date} → {end_date}{'' if written else ' (inchangé)'}")
         logger.info(f"      Bars: {len(block_df)}, Type: {characteristics['trend_type']}, Vol: {characteristics['volatility_pct']:.3f}%")
         
         block_num += 1
@@ -311,15 +380,20 @@ def verify_data_integrity():
     
     for filepath in files:
         try:
-            df = pd.read_parquet(filepath)
+            # Colonnes vérifiées sur le schéma (footer seul), puis lecture des
+            # 4 colonnes OHLC uniquement
+            schema_names = pq.read_schema(filepath).names
+            table = pq.read_table(filepath, columns=OHLC_COLUMNS, pre_buffer=True)
+            ohlc = {col: table.column(col).to_numpy() for col in OHLC_COLUMNS}
+            high, low, close = ohlc['high'], ohlc['low'], ohlc['close']
             
             # Vérifications
             checks = {
-                "Non vide": len(df) > 0,
-                "Colonnes OK": all(col in df.columns for col in ['datetime', 'open', 'high', 'low', 'close', 'volume']),
-                "Pas de NaN": not df[['open', 'high', 'low', 'close']].isnull().any().any(),
-                "High >= Low": (df['high'] >= df['low']).all(),
-                "Close dans range": ((df['close'] >= df['low']) & (df['close'] <= df['high'])).all()
+                "Non vide": table.num_rows > 0,
+                "Colonnes OK": all(col in schema_names for col in REQUIRED_COLUMNS),
+                "Pas de NaN": not any(np.isnan(values).any() for values in ohlc.values()),
+                "High >= Low": bool((high >= low).all()),
+                "Close dans range": bool(((close >= low) & (close <= high)).all())
             }
             
             all_checks_passed = all(checks.values())
@@ -26,17 +26,26 @@ Date convention:
 from __future__ import annotations
 
 import argparse
-import json
 import logging
+import multiprocessing
 import os
+import threading
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import date, datetime, timedelta
+from datetime import date, datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
+import orjson
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry, make_headers
 
 try:
     import yfinance as yf
@@ -49,6 +58,27 @@ from scripts.providers.polygon_provider import PolygonConfig, download_1m_aggreg
 
 logger = logging.getLogger(__name__)
 
+DATA_COLUMNS = ["datetime", "open", "high", "low", "close", "volume"]
+
+# Parquet layout: ~1 RTH week per row group so readers filtering on datetime
+# (pushdown on min/max statistics) only decode the row groups they need.
+PARQUET_ROW_GROUP_SIZE = 390 * 5
+PARQUET_DATA_PAGE_SIZE = 1 << 20
+
+# Stored layout (Parquet contract v1): float32 OHLC, int32 volume, UTC DatetimeIndex.
+STORAGE_SCHEMA = pa.schema(
+    [
+        ("open", pa.float32()),
+        ("high", pa.float32()),
+        ("low", pa.float32()),
+        ("close", pa.float32()),
+        ("volume", pa.int32()),
+        ("datetime", pa.timestamp("ns", tz="UTC")),
+    ]
+)
+# _downcast_ohlcv keeps a wider volume when it has NaN or exceeds int32.
+STORAGE_VOLUME_TYPES = (pa.int32(), pa.int64(), pa.float64())
+
 
 @dataclass
 class DownloadConfig:
@@ -61,15 +91,23 @@ class DownloadConfig:
 
     retries: int = 4
     backoff_seconds: float = 2.0
+    # Average spacing between window requests (token bucket, bursts up to max_concurrency)
     request_delay_seconds: float = 1.0
 
     # Polygon-specific throttling (optional)
     polygon_per_page_delay_seconds: float = 0.0
+    # Minimum backoff after a 429 without Retry-After (see RateLimitRetry)
     polygon_rate_limit_sleep_seconds: float = 60.0
 
     max_missing_pct: float = 5.0
     debug_chunks_dir: Optional[Path] = None
 
+    # Per-window response cache: a window already on disk is never re-downloaded.
+    cache_dir: Optional[Path] = None
+
+    # Windows fetched concurrently (I/O-bound; 1 = serial)
+    max_concurrency: int = 4
+
 
 def _download_window_once_yfinance(symbol: str, start: date, end: date) -> pd.DataFrame:
     if yf is None:
@@ -116,6 +154,17 @@ def _download_window_once_polygon(
     return download_1m_aggregates(session=session, symbol=symbol, start=start, end=end, cfg=cfg)
 
 
+def _retried_by_adapter(err: Exception) -> bool:
+    """Polygon errors already retried by the HTTPAdapter of build_http_session.
+
+    HTTP statuses come back as the provider's RuntimeError once the adapter gives
+    up (raise_on_status=False); connection errors surface as requests exceptions.
+    """
+    if isinstance(err, requests.RequestException):
+        return True
+    return isinstance(err, RuntimeError) and str(err).startswith(("polygon_rate_limited_429", "polygon_http_"))
+
+
 def download_window_with_retries(
     *,
     provider: str,
@@ -126,7 +175,6 @@ def download_window_with_retries(
     retries: int,
     backoff_seconds: float,
     polygon_per_page_delay_seconds: float,
-    polygon_rate_limit_sleep_seconds: float,
 ) -> Tuple[Optional[pd.DataFrame], Dict[str, Any]]:
     last_err: Optional[str] = None
 
@@ -157,65 +205,272 @@ def download_window_with_retries(
             last_err = repr(e)
             logger.warning("  tentative %d/%d échouée: %s", attempt, retries, last_err)
 
+            if provider == "polygon" and _retried_by_adapter(e):
+                # The session's Retry already backed off on this status/connection error
+                # (honouring Retry-After); retrying here would multiply the attempts.
+                return None, {"attempts": attempt, "success": False, "error": last_err}
+
             if attempt < retries:
-                # Polygon rate-limit handling: slow down aggressively.
-                if "polygon_rate_limited_429" in last_err:
-                    sleep_s = max(polygon_rate_limit_sleep_seconds, backoff_seconds * (2 ** (attempt - 1)))
-                    logger.warning("  polygon 429 -> sleep %.1fs then retry", sleep_s)
-                    time.sleep(sleep_s)
-                else:
-                    sleep_s = backoff_seconds * (2 ** (attempt - 1))
-                    time.sleep(sleep_s)
+                time.sleep(backoff_seconds * (2 ** (attempt - 1)))
 
     return None, {"attempts": retries, "success": False, "error": last_err}
 
 
+def window_cache_path(cache_dir: Path, provider: str, symbol: str, w_start: date, w_end: date) -> Path:
+    return cache_dir / f"{provider}_{symbol}_{w_start}_{w_end}.parquet"
+
+
+def _window_is_final(w_end: date) -> bool:
+    """True once the window's data can no longer change.
+
+    w_end is exclusive: a window ending today or later still covers the current
+    (or previous, still being finalized by the provider) session, so caching it
+    would freeze a partial day.
+    """
+    return w_end < date.today()
+
+
+def _store_cached_window(df: pd.DataFrame, path: Path) -> None:
+    """Atomic write (tmp + os.replace): a crash never leaves a truncated cache entry."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` requests/s on average, bursts up to `capacity`.
+
+    acquire() only sleeps when the budget is exhausted, unlike a fixed sleep after
+    every request. A bucket built with shared() keeps its state in shared memory,
+    so every process it is handed to draws from the same budget (one API key).
+    """
+
+    def __init__(self, rate: float, capacity: float, state: Optional[Any] = None) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        # state = [tokens, last refill (time.monotonic, system-wide on Linux)]
+        if state is None:
+            self._state: Any = [capacity, time.monotonic()]
+            self._lock: Any = threading.Lock()
+        else:
+            self._state = state
+            self._lock = state.get_lock()
+
+    @classmethod
+    def shared(cls, rate: float, capacity: float) -> "TokenBucket":
+        """Bucket usable across processes (pass it to workers at creation, e.g. initargs)."""
+        return cls(rate, capacity, state=multiprocessing.Array("d", [capacity, time.monotonic()]))
+
+    def acquire(self) -> None:
+        state = self._state
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens = min(self.capacity, state[0] + (now - state[1]) * self.rate)
+                state[1] = now
+                if tokens >= 1:
+                    state[0] = tokens - 1
+                    return
+                state[0] = tokens
+                wait_s = (1 - tokens) / self.rate
+            time.sleep(wait_s)
+
+
+# Set in worker processes by _init_worker: the request budget shared by all symbols.
+_SHARED_BUCKET: Optional[TokenBucket] = None
+
+
+def _init_worker(bucket: Optional[TokenBucket]) -> None:
+    global _SHARED_BUCKET
+    _SHARED_BUCKET = bucket
+
+
+def _fetch_window(
+    config: DownloadConfig,
+    session: Optional[requests.Session],
+    bucket: Optional[TokenBucket],
+    w_start: date,
+    w_end: date,
+) -> Tuple[Optional[pd.DataFrame], Dict[str, Any]]:
+    """Download one window (with retries) once the rate limiter grants a token.
+
+    Runs inside a worker thread; the bucket is shared by all workers of the run.
+    With config.cache_dir set, a cached window is returned as-is (no network,
+    no token) and every successful download is stored for the next run. Windows
+    that are not final yet (see _window_is_final) bypass the cache both ways.
+    """
+    cache_path: Optional[Path] = None
+    if config.cache_dir is not None and _window_is_final(w_end):
+        cache_path = window_cache_path(config.cache_dir, config.provider, config.symbol, w_start, w_end)
+        if cache_path.exists():
+            try:
+                cached = pd.read_parquet(cache_path)
+            except (OSError, pa.ArrowInvalid, ValueError) as e:
+                # Unreadable entry (disk error, partial copy, older writer): drop it and re-download.
+                logger.warning("  cache entry unreadable, re-downloading: %s (%r)", cache_path.name, e)
+                cache_path.unlink(missing_ok=True)
+            else:
+                logger.info("  cache hit: %s", cache_path.name)
+                return cached, {"attempts": 0, "success": True, "error": None, "cached": True}
+
+    if bucket is not None:
+        bucket.acquire()
+    df, meta = download_window_with_retries(
+        provider=config.provider,
+        session=session,
+        symbol=config.symbol,
+        start=w_start,
+        end=w_end,
+        retries=config.retries,
+        backoff_seconds=config.backoff_seconds,
+        polygon_per_page_delay_seconds=config.polygon_per_page_delay_seconds,
+    )
+    if cache_path is not None and df is not None and not df.empty:
+        _store_cached_window(df, cache_path)
+    return df, meta
+
+
+def _downcast_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
+    """Storage dtypes: float32 prices (1m equity ticks >= 0.01), int32 volume.
+
+    Volume is only narrowed when it is complete and fits in int32. Quality gates
+    run on the float64 frame before this step.
+    """
+    out = df.astype({c: "float32" for c in ("open", "high", "low", "close") if c in df.columns})
+    if "volume" in out.columns:
+        volume = out["volume"]
+        if volume.notna().all() and volume.max() <= np.iinfo(np.int32).max:
+            out["volume"] = volume.astype("int32")
+    return out
+
+
+def _merge_chunks(chunks: List[pd.DataFrame]) -> Tuple[pd.DataFrame, int]:
+    """Concat + sort + dedupe (keep last) with Arrow kernels, pandas only at the end.
+
+    Chunks are UTC with canonical columns. sort_indices is stable, so among equal
+    timestamps the later window stays last and is the one kept.
+    """
+    cols = [c for c in DATA_COLUMNS if all(c in ch.columns for ch in chunks)]
+    table = pa.concat_tables(
+        [pa.Table.from_pandas(ch[cols], preserve_index=False) for ch in chunks],
+        promote_options="permissive",
+    )
+    dt_idx = table.schema.get_field_index("datetime")
+    table = table.set_column(dt_idx, "datetime", table.column("datetime").cast(pa.timestamp("ns", tz="UTC")))
+    table = table.take(pc.sort_indices(table, sort_keys=[("datetime", "ascending")]))
+
+    ts = table.column("datetime").combine_chunks()
+    if len(ts) > 1:
+        keep = pa.concat_arrays([pc.not_equal(ts[:-1], ts[1:]), pa.array([True])])
+        table = table.filter(keep)
+    duplicates_removed = len(ts) - table.num_rows
+
+    return table.to_pandas(), int(duplicates_removed)
+
+
+def _check_storage_schema(table: pa.Table) -> None:
+    """Hard-fail (non-negotiable, also under python -O) if the table drifts from STORAGE_SCHEMA."""
+    volume_idx = STORAGE_SCHEMA.get_field_index("volume")
+    allowed = [STORAGE_SCHEMA.set(volume_idx, pa.field("volume", t)) for t in STORAGE_VOLUME_TYPES]
+    if not any(table.schema.equals(schema, check_metadata=False) for schema in allowed):
+        raise RuntimeError(f"Parquet schema mismatch: {table.schema}")
+
+
+class RateLimitRetry(Retry):
+    """urllib3 Retry whose backoff after a 429 is at least `rate_limit_sleep` seconds.
+
+    Applies when the response has no Retry-After header (that one is honoured as
+    sent): on free Polygon tiers (5 req/min) the plain exponential backoff is far
+    too short for the quota to refill.
+    """
+
+    def __init__(self, *args: Any, rate_limit_sleep: float = 0.0, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.rate_limit_sleep = rate_limit_sleep
+
+    def new(self, **kw: Any) -> "RateLimitRetry":
+        kw.setdefault("rate_limit_sleep", self.rate_limit_sleep)
+        return super().new(**kw)
+
+    def get_backoff_time(self) -> float:
+        backoff = super().get_backoff_time()
+        if self.history and self.history[-1].status == 429:
+            return max(self.rate_limit_sleep, backoff)
+        return backoff
+
+
+def build_http_session(config: DownloadConfig) -> requests.Session:
+    """Keep-alive session shared by all windows (and Polygon shards) of a run.
+
+    The adapter pools connections across worker threads and is the only retry
+    policy for HTTP: 429/5xx and connection errors are retried with backoff,
+    honouring Retry-After, and waiting at least polygon_rate_limit_sleep_seconds
+    after a 429 without one. raise_on_status=False hands the last response back
+    so provider-level errors (e.g. polygon_rate_limited_429) are unchanged;
+    download_window_with_retries does not retry those again.
+    """
+    session = requests.Session()
+    retry = RateLimitRetry(
+        total=config.retries,
+        backoff_factor=config.backoff_seconds,
+        rate_limit_sleep=config.polygon_rate_limit_sleep_seconds,
+        status_forcelist=[429, 500, 502, 503, 504],
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retry))
+    # gzip/deflate, plus br when a brotli decoder is installed
+    session.headers.update(make_headers(accept_encoding=True))
+    return session
+
+
 def build_windows(start: date, end: date, window_days: int) -> List[Tuple[date, date]]:
     if window_days <= 0:
         raise ValueError("window_days must be > 0")
 
-    windows: List[Tuple[date, date]] = []
-    cur = start
-    while cur < end:
-        nxt = min(cur + timedelta(days=window_days), end)
-        windows.append((cur, nxt))
-        cur = nxt
-    return windows
+    # Window bounds as day ordinals: arange/minimum do the arithmetic in numpy.
+    starts = np.arange(start.toordinal(), end.toordinal(), window_days)
+    ends = np.minimum(starts + window_days, end.toordinal())
+    return [(date.fromordinal(int(s)), date.fromordinal(int(e))) for s, e in zip(starts, ends)]
 
 
 def run(config: DownloadConfig) -> Dict[str, Any]:
     config.out.parent.mkdir(parents=True, exist_ok=True)
     if config.debug_chunks_dir is not None:
         config.debug_chunks_dir.mkdir(parents=True, exist_ok=True)
+    if config.cache_dir is not None:
+        config.cache_dir.mkdir(parents=True, exist_ok=True)
 
     session: Optional[requests.Session] = None
     if config.provider == "polygon":
-        session = requests.Session()
+        session = build_http_session(config)
 
     logger.info("=" * 88)
     logger.info("P0.6.3 WINDOWED DOWNLOADER | %s | provider=%s", config.symbol, config.provider)
-    logger.info("Range: %s → %s | window_days=%d", config.start, config.end, config.window_days)
+    logger.info(
+        "Range: %s → %s | window_days=%d | max_concurrency=%d",
+        config.start,
+        config.end,
+        config.window_days,
+        config.max_concurrency,
+    )
     logger.info("Out: %s", config.out)
     logger.info("=" * 88)
 
     windows = build_windows(config.start, config.end, config.window_days)
+    bucket: Optional[TokenBucket] = _SHARED_BUCKET
+    if bucket is None and config.request_delay_seconds > 0:
+        bucket = TokenBucket(rate=1.0 / config.request_delay_seconds, capacity=max(1, config.max_concurrency))
     all_chunks: List[pd.DataFrame] = []
     windows_log: List[Dict[str, Any]] = []
 
-    for i, (w_start, w_end) in enumerate(windows, start=1):
-        logger.info("[window %d/%d] %s → %s", i, len(windows), w_start, w_end)
+    # Windows are independent and I/O-bound: fetch them on a bounded thread pool.
+    # executor.map preserves window order, so logs and chunks stay chronological.
+    with ThreadPoolExecutor(max_workers=max(1, config.max_concurrency)) as executor:
+        results = list(executor.map(lambda w: _fetch_window(config, session, bucket, *w), windows))
 
-        df, meta = download_window_with_retries(
-            provider=config.provider,
-            session=session,
-            symbol=config.symbol,
-            start=w_start,
-            end=w_end,
-            retries=config.retries,
-            backoff_seconds=config.backoff_seconds,
-            polygon_per_page_delay_seconds=config.polygon_per_page_delay_seconds,
-            polygon_rate_limit_sleep_seconds=config.polygon_rate_limit_sleep_seconds,
-        )
+    for i, ((w_start, w_end), (df, meta)) in enumerate(zip(windows, results), start=1):
+        logger.info("[window %d/%d] %s → %s", i, len(windows), w_start, w_end)
 
         win_info = {
             "window": i,
@@ -223,13 +478,18 @@ def run(config: DownloadConfig) -> Dict[str, Any]:
             "end": w_end.isoformat(),
             "success": bool(meta.get("success")),
             "attempts": int(meta.get("attempts", 0)),
+            "cached": bool(meta.get("cached", False)),
             "bars": int(len(df)) if df is not None else 0,
             "error": meta.get("error"),
         }
         windows_log.append(win_info)
 
         if df is not None and not df.empty:
-            logger.info("  ok: %d bars (attempts=%d)", len(df), win_info["attempts"])
+            logger.info("  ok: %d bars (attempts=%d, cached=%s)", len(df), win_info["attempts"], win_info["cached"])
+            # Normalize each chunk to UTC + canonical column order so the merge
+            # below is a plain per-column concatenation of identical dtypes.
+            df = normalize_datetime_to_utc(df)
+            df = df[[c for c in DATA_COLUMNS if c in df.columns]]
             if config.debug_chunks_dir is not None:
                 chunk_path = config.debug_chunks_dir / f"{config.symbol}_chunk_{w_start}_{w_end}.parquet"
                 df.to_parquet(chunk_path, index=False)
@@ -237,25 +497,10 @@ def run(config: DownloadConfig) -> Dict[str, Any]:
         else:
             logger.warning("  skip: no data")
 
-        time.sleep(config.request_delay_seconds)
-
     if not all_chunks:
         raise RuntimeError("No data downloaded for any window")
 
-    combined = pd.concat(all_chunks, ignore_index=True)
-
-    # Normalize tz UTC *before* sorting/dedup to avoid mixed tz comparisons.
-    combined = normalize_datetime_to_utc(combined)
-
-    combined = combined.sort_values("datetime").reset_index(drop=True)
-
-    before = len(combined)
-    combined = combined.drop_duplicates(subset=["datetime"], keep="last").reset_index(drop=True)
-    duplicates_removed = before - len(combined)
-
-    # Final column ordering
-    cols = [c for c in ["datetime", "open", "high", "low", "close", "volume"] if c in combined.columns]
-    combined = combined[cols]
+    combined, duplicates_removed = _merge_chunks(all_chunks)
 
     # Quality gates
     quality = run_quality_gates(
@@ -285,29 +530,38 @@ def run(config: DownloadConfig) -> Dict[str, Any]:
 
     # Write outputs (Parquet contract v1): DatetimeIndex (UTC) as index.
     # We keep 'datetime' for gates, but the stored parquet uses the index as source of truth.
-    write_df = combined.copy()
-    write_df["datetime"] = pd.to_datetime(write_df["datetime"], utc=True)
-    write_df = write_df.set_index("datetime", drop=True)
-    write_df.index.name = "datetime"
-    write_df = write_df.sort_index()
-    write_df = write_df[~write_df.index.duplicated(keep="last")]
-
-    # Hard-fail asserts (non-negotiable)
-    assert isinstance(write_df.index, pd.DatetimeIndex)
-    assert write_df.index.tz is not None
-    assert str(write_df.index.tz) in ("UTC", "UTC+00:00")
-    assert write_df.index.is_monotonic_increasing
-    assert not write_df.index.has_duplicates
+    # No defensive copy: set_index already builds a new frame and `combined` is not used after the gates.
+    write_df = (
+        combined.assign(datetime=pd.to_datetime(combined["datetime"], utc=True))
+        .set_index("datetime", drop=True)
+        .sort_index()
+    )
+
+    # Hard-fail (non-negotiable): strictly increasing timestamps. Index type, tz and
+    # column dtypes are checked on the Arrow schema below.
+    if not (write_df.index.is_monotonic_increasing and write_df.index.is_unique):
+        raise RuntimeError("Parquet index must be sorted and free of duplicate timestamps")
 
     # Ensure only OHLCV columns are stored
     ohlcv_cols = [c for c in ["open", "high", "low", "close", "volume"] if c in write_df.columns]
-    write_df = write_df[ohlcv_cols]
-
-    write_df.to_parquet(config.out, index=True)
+    write_df = _downcast_ohlcv(write_df[ohlcv_cols])
+
+    # ZSTD + statistics; OHLCV floats are high-cardinality, so no dictionary.
+    table = pa.Table.from_pandas(write_df, preserve_index=True)
+    _check_storage_schema(table)
+    pq.write_table(
+        table,
+        config.out,
+        compression="zstd",
+        compression_level=3,
+        use_dictionary=False,
+        row_group_size=PARQUET_ROW_GROUP_SIZE,
+        data_page_size=PARQUET_DATA_PAGE_SIZE,
+        write_statistics=True,
+    )
 
     quality_path = config.out.parent / f"data_quality_{config.symbol.upper()}.json"
-    with quality_path.open("w", encoding="utf-8") as f:
-        json.dump(quality, f, indent=2)
+    quality_path.write_bytes(orjson.dumps(quality, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
 
     logger.info("\n✅ wrote parquet: %s", config.out)
     logger.info("✅ wrote quality report: %s", quality_path)
@@ -329,21 +583,30 @@ def main() -> None:
     parser = argparse.ArgumentParser(description="P0.6.3 Windowed downloader (1m)")
     parser.add_argument("--provider", type=str, default="yfinance", choices=["yfinance", "polygon"], help="Data provider")
 
-    parser.add_argument("--symbol", required=True, type=str, help="SPY or QQQ")
+    parser.add_argument("--symbol", "--symbols", dest="symbol", required=True, type=str, help="SPY, QQQ or a list: SPY,QQQ")
     parser.add_argument("--start", required=True, type=str, help="YYYY-MM-DD")
     parser.add_argument("--end", required=True, type=str, help="YYYY-MM-DD (exclusive)")
     parser.add_argument("--window-days", required=True, type=int, help="Window size in days (7 recommended)")
-    parser.add_argument("--out", required=True, type=str, help="Output Parquet path")
+    parser.add_argument(
+        "--out", required=True, type=str, help="Output Parquet path (a directory when several symbols: {dir}/{SYMBOL}.parquet)"
+    )
 
     parser.add_argument("--retries", type=int, default=4)
     parser.add_argument("--backoff-seconds", type=float, default=2.0)
-    parser.add_argument("--request-delay-seconds", type=float, default=1.0)
+    parser.add_argument("--request-delay-seconds", type=float, default=1.0, help="Average seconds between requests (0 = no limit)")
     parser.add_argument("--max-missing-pct", type=float, default=5.0)
     parser.add_argument("--debug-chunks-dir", type=str, default=None)
+    parser.add_argument("--cache-dir", type=str, default=None, help="Per-window download cache (re-runs skip the network)")
+    parser.add_argument("--max-concurrency", type=int, default=4, help="Windows downloaded in parallel (1 = serial)")
 
     # Polygon provider fine-tuning (optional)
     parser.add_argument("--polygon-per-page-delay-seconds", type=float, default=0.0)
-    parser.add_argument("--polygon-rate-limit-sleep-seconds", type=float, default=60.0)
+    parser.add_argument(
+        "--polygon-rate-limit-sleep-seconds",
+        type=float,
+        default=60.0,
+        help="Minimum wait before retrying a 429 without Retry-After (HTTP adapter retries)",
+    )
 
     parser.add_argument("--verbose", action="store_true")
 
@@ -352,25 +615,47 @@ def main() -> None:
     log_level = logging.DEBUG if args.verbose else logging.INFO
     logging.basicConfig(level=log_level, format="%(asctime)s - %(levelname)s - %(message)s")
 
-    symbol = args.symbol.strip().upper()
-
-    cfg = DownloadConfig(
-        symbol=symbol,
-        start=_parse_date(args.start),
-        end=_parse_date(args.end),
-        window_days=int(args.window_days),
-        out=Path(args.out),
-        provider=str(args.provider),
-        retries=int(args.retries),
-        backoff_seconds=float(args.backoff_seconds),
-        request_delay_seconds=float(args.request_delay_seconds),
-        max_missing_pct=float(args.max_missing_pct),
-        polygon_per_page_delay_seconds=float(args.polygon_per_page_delay_seconds),
-        polygon_rate_limit_sleep_seconds=float(args.polygon_rate_limit_sleep_seconds),
-        debug_chunks_dir=Path(args.debug_chunks_dir) if args.debug_chunks_dir else None,
-    )
-
-    run(cfg)
+    symbols = [s.strip().upper() for s in args.symbol.split(",") if s.strip()]
+    if not symbols:
+        parser.error("--symbol: at least one symbol is required")
+
+    configs = [
+        DownloadConfig(
+            symbol=symbol,
+            start=_parse_date(args.start),
+            end=_parse_date(args.end),
+            window_days=int(args.window_days),
+            out=Path(args.out) / f"{symbol}.parquet" if len(symbols) > 1 else Path(args.out),
+            provider=str(args.provider),
+            retries=int(args.retries),
+            backoff_seconds=float(args.backoff_seconds),
+            request_delay_seconds=float(args.request_delay_seconds),
+            max_missing_pct=float(args.max_missing_pct),
+            polygon_per_page_delay_seconds=float(args.polygon_per_page_delay_seconds),
+            polygon_rate_limit_sleep_seconds=float(args.polygon_rate_limit_sleep_seconds),
+            debug_chunks_dir=Path(args.debug_chunks_dir) if args.debug_chunks_dir else None,
+            cache_dir=Path(args.cache_dir) if args.cache_dir else None,
+            max_concurrency=int(args.max_concurrency),
+        )
+        for symbol in symbols
+    ]
+
+    if len(configs) == 1:
+        run(configs[0])
+        return
+
+    # One process per symbol: the quality-gate / merge CPU work is not serialized by
+    # the GIL. Polygon rate limits are per API key, so its processes share one bucket
+    # (otherwise N symbols would send N times the allowed rate).
+    shared_bucket: Optional[TokenBucket] = None
+    if args.provider == "polygon" and args.request_delay_seconds > 0:
+        shared_bucket = TokenBucket.shared(rate=1.0 / args.request_delay_seconds, capacity=max(1, args.max_concurrency))
+    with ProcessPoolExecutor(
+        max_workers=min(len(configs), os.cpu_count() or 1),
+        initializer=_init_worker,
+        initargs=(shared_bucket,),
+    ) as executor:
+        list(executor.map(run, configs))
 
 
 if __name__ == "__main__":
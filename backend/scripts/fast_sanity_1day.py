@@ -4,7 +4,6 @@ import sys
 import time
 import logging
 from pathlib import Path
-from datetime import datetime
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
@@ -22,8 +21,8 @@ from models.backtest import BacktestConfig
 # Test 1 JOUR (09:30-16:00 = 390 minutes)
 config = BacktestConfig(
     run_name='fast_test_1day',
-    start_date=datetime(2024, 6, 12, 9, 30, 0),
-    end_date=datetime(2024, 6, 12, 16, 0, 0),
+    start_date='2024-06-12',
+    end_date='2024-06-12',
     symbols=['SPY'],  # 1 symbole pour aller vite
     data_paths=['/app/data/historical/1m/SPY.parquet'],
     initial_capital=10000.0,
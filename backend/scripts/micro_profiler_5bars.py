@@ -5,16 +5,23 @@ Mesure temps par étape + call counts + cache behavior
 """
 import sys
 import time
+from functools import lru_cache
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import logging
 logging.basicConfig(level=logging.ERROR)
 
+import numpy as np
+import pandas as pd
+
 from backtest.engine import BacktestEngine
 from models.backtest import BacktestConfig
+from models.market_data import Candle
+from engines.setup_engine_v2 import filter_setups_by_mode
+from utils.timeframes import get_session_info
 
 # Monkey patch pour instrumenter _process_bar_optimized
 original_process_bar = BacktestEngine._process_bar_optimized
@@ -28,6 +35,13 @@ call_counts = {
 
 bar_timings = []
 
+
+@lru_cache(maxsize=1440)
+def _session_name_for_minute(minute: datetime) -> str:
+    """Session de la minute (ne change qu'aux bornes de session) : 1440 = une journée."""
+    return get_session_info(minute, debug_log=False).get('name', 'Unknown')
+
+
 def instrumented_process_bar(self, symbol, current_time, htf_events):
     """Version instrumentée qui mesure chaque étape"""
     t_start = time.perf_counter()
@@ -47,12 +61,9 @@ def instrumented_process_bar(self, symbol, current_time, htf_events):
     
     # 2. Market State (avec cache)
     t0 = time.perf_counter()
-    from utils.timeframes import get_session_info
     if current_time.tzinfo is None:
-        from datetime import timezone
         current_time = current_time.replace(tzinfo=timezone.utc)
-    session_info = get_session_info(current_time, debug_log=False)
-    current_session = session_info.get('session', 'Unknown')
+    current_session = _session_name_for_minute(current_time.replace(second=0, microsecond=0))
     
     last_1h_close = candles_1h[-1].timestamp if candles_1h else None
     last_4h_close = candles_4h[-1].timestamp if candles_4h else None
@@ -65,9 +76,9 @@ def instrumented_process_bar(self, symbol, current_time, htf_events):
     should_recalc = self.market_state_cache.should_recalculate(symbol, cache_key)
     cache_miss = should_recalc or htf_events.get("is_close_1h") or htf_events.get("is_close_4h") or htf_events.get("is_close_1d")
     
-    if cache_miss:
-        call_counts['create_market_state'] += 1
-        multi_tf_data = {
+    # Fenêtres copiées seulement si un market_state est (re)calculé, jamais par barre
+    def multi_tf_window():
+        return {
             "1m": candles_1m[-500:],
             "5m": candles_5m[-200:],
             "15m": candles_15m[-100:],
@@ -75,6 +86,10 @@ def instrumented_process_bar(self, symbol, current_time, htf_events):
             "4h": candles_4h[-20:],
             "1d": candles_1d[-10:]
         }
+    
+    if cache_miss:
+        call_counts['create_market_state'] += 1
+        multi_tf_data = multi_tf_window()
         
         market_state = self.market_state_engine.create_market_state(
             symbol,
@@ -92,14 +107,7 @@ def instrumented_process_bar(self, symbol, current_time, htf_events):
         if market_state is None:
             # Fallback
             call_counts['create_market_state'] += 1
-            multi_tf_data = {
-                "1m": candles_1m[-500:],
-                "5m": candles_5m[-200:],
-                "15m": candles_15m[-100:],
-                "1h": candles_1h[-50:],
-                "4h": candles_4h[-20:],
-                "1d": candles_1d[-10:]
-            }
+            multi_tf_data = multi_tf_window()
             market_state = self.market_state_engine.create_market_state(
                 symbol, multi_tf_data,
                 {"session": current_session, "current_time": current_time, "volatility": 0.0}
@@ -119,12 +127,11 @@ def instrumented_process_bar(self, symbol, current_time, htf_events):
         call_counts['detect_patterns_ict'] += 1
         
         if len(candles_5m) > 10:
-            raw_candle_patterns = self.candlestick_engine.detect_patterns(candles_5m[-100:], timeframe="5m")
+            recent_5m = candles_5m[-100:]  # une copie partagée par les 3 détecteurs 5m
+            raw_candle_patterns = self.candlestick_engine.detect_patterns(recent_5m, timeframe="5m")
             candle_patterns = self._convert_candlestick_patterns(raw_candle_patterns)
-        
-        if len(candles_5m) > 10:
-            ict_patterns.extend(self.ict_engine.detect_bos(candles_5m[-100:], timeframe="5m"))
-            ict_patterns.extend(self.ict_engine.detect_fvg(candles_5m[-100:], timeframe="5m"))
+            ict_patterns.extend(self.ict_engine.detect_bos(recent_5m, timeframe="5m"))
+            ict_patterns.extend(self.ict_engine.detect_fvg(recent_5m, timeframe="5m"))
         
         if len(candles_15m) > 10 and htf_events.get("is_close_15m"):
             ict_patterns.extend(self.ict_engine.detect_fvg(candles_15m[-100:], timeframe="15m"))
@@ -163,7 +170,6 @@ def instrumented_process_bar(self, symbol, current_time, htf_events):
         return None
     
     # 5. Filter setups
-    from engines.setup_engine_v2 import filter_setups_by_mode
     filtered_setups = filter_setups_by_mode(setups, self.risk_engine)
     
     if not filtered_setups:
@@ -244,20 +250,43 @@ def run_5_bars():
     engine.equity_curve_r = [0.0]
     engine.equity_curve_dollars = [config.initial_capital]
     
-    minutes = sorted(engine.combined_data["datetime"].unique())
+    minutes = engine.sorted_minutes()
     print(f"Total bars available: {len(minutes)}")
     print(f"Processing first 5 bars...\n")
     
-    for idx, current_time in enumerate(minutes[:100]):  # 100 bars pour avoir assez d'historique
+    minutes = minutes[:100]  # 100 bars pour avoir assez d'historique
+    minutes_ns = minutes.as_unit("ns").asi8
+    
+    # Position de chaque minute dans les colonnes numpy du symbole (un searchsorted
+    # vectorisé au lieu de deux lookups dict par barre et par symbole)
+    positions = {}
+    for symbol in engine.config.symbols:
+        arrays = engine.candle_arrays.get(symbol)
+        if arrays is None or len(arrays["ts"]) == 0:
+            continue
+        pos = np.minimum(np.searchsorted(arrays["ts"], minutes_ns), len(arrays["ts"]) - 1)
+        positions[symbol] = (arrays, np.where(arrays["ts"][pos] == minutes_ns, pos, -1))
+    
+    for idx, current_time in enumerate(minutes):
         if idx % 10 == 0:  # Log tous les 10 bars
             print(f"Bar {idx+1}/100: {current_time.isoformat()}")
         
         # Ajouter bougies à l'agrégateur
         htf_events = {}
-        for symbol in engine.config.symbols:
-            candle_1m = engine.candles_1m_by_timestamp.get(symbol, {}).get(current_time)
-            if candle_1m is None:
+        for symbol, (arrays, pos) in positions.items():
+            i = pos[idx]
+            if i < 0:
                 continue
+            candle_1m = Candle(
+                symbol=symbol,
+                timeframe="1m",
+                timestamp=current_time,
+                open=arrays["open"][i],
+                high=arrays["high"][i],
+                low=arrays["low"][i],
+                close=arrays["close"][i],
+                volume=arrays["volume"][i],
+            )
             events = engine.tf_aggregator.add_1m_candle(candle_1m)
             htf_events[symbol] = events
         
@@ -298,11 +327,9 @@ if len(bar_timings) == 0:
     print("\n⚠️  No bars were processed (all skipped due to insufficient history)")
     sys.exit(0)
 
-avg_agg = sum(t['t_agg_ms'] for t in bar_timings) / len(bar_timings)
-avg_market_state = sum(t['t_market_state_ms'] for t in bar_timings) / len(bar_timings)
-avg_patterns = sum(t['t_patterns_ms'] for t in bar_timings) / len(bar_timings)
-avg_playbooks = sum(t['t_playbooks_ms'] for t in bar_timings) / len(bar_timings)
-avg_total = sum(t['t_total_ms'] for t in bar_timings) / len(bar_timings)
+stats_df = pd.DataFrame(bar_timings)
+avgs = stats_df[['t_agg_ms', 't_market_state_ms', 't_patterns_ms', 't_playbooks_ms', 't_total_ms']].mean()
+avg_agg, avg_market_state, avg_patterns, avg_playbooks, avg_total = avgs.tolist()
 
 print(f"\nAVERAGES:")
 print(f"  Aggregator: {avg_agg:.1f}ms")
@@ -316,8 +343,7 @@ print(f"  create_market_state: {call_counts['create_market_state']}")
 print(f"  detect_patterns_ict: {call_counts['detect_patterns_ict']}")
 print(f"  evaluate_playbooks: {call_counts['evaluate_playbooks']}")
 
-cache_hits = sum(t['cache_hit'] for t in bar_timings)
-cache_misses = sum(t['cache_miss'] for t in bar_timings)
+cache_hits, cache_misses = stats_df[['cache_hit', 'cache_miss']].sum().tolist()
 cache_total = cache_hits + cache_misses
 hit_rate = (cache_hits / cache_total * 100) if cache_total > 0 else 0
 
@@ -4,38 +4,55 @@ import sys
 import time
 import logging
 from pathlib import Path
-from datetime import datetime
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from scripts._bench_common import make_config, make_engine, setup_logging  # noqa: E402
+
 # Logs WARNING seulement
-logging.basicConfig(level=logging.WARNING)
-logging.getLogger('engines').setLevel(logging.ERROR)
+setup_logging(logging.WARNING, engines_level=logging.ERROR)
+
+BASELINE_METRICS_PATH = Path('/tmp/baseline_metrics.txt')
+
+# Métriques baseline parsées, par (chemin, mtime) : pas de re-parse dans un sweep
+_baseline_cache = {}
 
-from backtest.engine import BacktestEngine
-from models.backtest import BacktestConfig
+def load_baseline(path: Path = BASELINE_METRICS_PATH) -> dict:
+    """Lit les lignes key=value écrites par baseline_measurement.py (FileNotFoundError si absent)."""
+    key = (path, path.stat().st_mtime_ns)
+    if key not in _baseline_cache:
+        _baseline_cache[key] = {
+            k: float(v)
+            for k, v in (line.split('=', 1) for line in path.read_text().splitlines() if line)
+        }
+    return _baseline_cache[key]
+
+# Moteur gardé entre appels dans un même process (sweep) : les runs suivants
+# repartent de reset() sans relire le parquet ni reconstruire les Candle.
+_cached_engine = None
 
 def run_optimized_test():
-    """Test optimisé sur 30 minutes (même que baseline)"""
-    config = BacktestConfig(
-        run_name='optimized_30min',
-        start_date=datetime(2024, 6, 12, 9, 30, 0),
-        end_date=datetime(2024, 6, 12, 10, 0, 0),
-        symbols=['SPY'],
-        data_paths=['/app/data/historical/1m/SPY.parquet'],
-        initial_capital=10000.0,
-        trading_mode='AGGRESSIVE',
-        trade_types=['DAILY', 'SCALP']
-    )
+    """Test optimisé sur une journée (même que baseline)"""
+    global _cached_engine
+    config_dict = {
+        'run_name': 'optimized_1day',
+        'start_date': '2024-06-12',
+        'end_date': '2024-06-12',
+    }
     
     print("Loading data...")
     t_start = time.time()
-    engine = BacktestEngine(config)
-    engine.load_data()
+    if _cached_engine is None:
+        _cached_engine = make_engine(config_dict)
+    else:
+        _cached_engine.reset(make_config(config_dict))
+        if _cached_engine.combined_data is None:
+            _cached_engine.load_data()
+    engine = _cached_engine
     t_load = time.time() - t_start
     
     print(f"Data loaded in {t_load:.2f}s")
-    print("Running OPTIMIZED (30 minutes with caching)...")
+    print("Running OPTIMIZED (1 day with caching)...")
     
     t_run_start = time.time()
     result = engine.run()
@@ -50,7 +67,7 @@ if __name__ == "__main__":
     
     result, t_load, t_run, engine = run_optimized_test()
     
-    bars = 30  # 30 minutes
+    bars = len(engine.sorted_minutes())
     total_time = t_load + t_run
     ms_per_bar = (t_run / bars) * 1000
     bars_per_sec = bars / t_run if t_run > 0 else 0
@@ -67,8 +84,8 @@ if __name__ == "__main__":
     
     print(f"\n📊 TRADES")
     print(f"Total: {result.total_trades}")
-    print(f"Total R: {result.total_r:+.2f}R")
-    print(f"Win Rate: {result.win_rate:.1f}%")
+    print(f"Total R: {result.total_pnl_r:+.2f}R")
+    print(f"Win Rate: {result.winrate:.1f}%")
     
     print(f"\n🛡️ ANTI-SPAM")
     print(f"Blocked by cooldown: {engine.blocked_by_cooldown}")
@@ -95,11 +112,7 @@ if __name__ == "__main__":
     
     # Comparer avec baseline
     try:
-        with open('/tmp/baseline_metrics.txt', 'r') as f:
-            baseline = {}
-            for line in f:
-                key, value = line.strip().split('=')
-                baseline[key] = float(value)
+        baseline = load_baseline()
         
         baseline_ms = baseline['ms_per_bar']
         speedup = baseline_ms / ms_per_bar
@@ -118,12 +131,12 @@ if __name__ == "__main__":
         baseline_trades = baseline.get('trades', 0)
         baseline_r = baseline.get('total_r', 0)
         
-        if abs(result.total_trades - baseline_trades) <= 1 and abs(result.total_r - baseline_r) < 1.0:
-            print(f"\n✅ VALIDATION: Results match baseline (trades: {result.total_trades} vs {baseline_trades:.0f}, R: {result.total_r:.2f} vs {baseline_r:.2f})")
+        if abs(result.total_trades - baseline_trades) <= 1 and abs(result.total_pnl_r - baseline_r) < 1.0:
+            print(f"\n✅ VALIDATION: Results match baseline (trades: {result.total_trades} vs {baseline_trades:.0f}, R: {result.total_pnl_r:.2f} vs {baseline_r:.2f})")
         else:
             print(f"\n⚠️ VALIDATION: Results differ from baseline!")
             print(f"   Trades: {result.total_trades} vs {baseline_trades:.0f}")
-            print(f"   Total R: {result.total_r:.2f} vs {baseline_r:.2f}")
+            print(f"   Total R: {result.total_pnl_r:.2f} vs {baseline_r:.2f}")
     
     except FileNotFoundError:
         print(f"\n⚠️ No baseline found - run baseline_measurement.py first")
@@ -133,7 +146,7 @@ if __name__ == "__main__":
         f.write(f"ms_per_bar={ms_per_bar}\n")
         f.write(f"bars_per_sec={bars_per_sec}\n")
         f.write(f"trades={result.total_trades}\n")
-        f.write(f"total_r={result.total_r}\n")
+        f.write(f"total_r={result.total_pnl_r}\n")
         f.write(f"cache_hits={cache_stats['hits']}\n")
         f.write(f"cache_misses={cache_stats['misses']}\n")
         f.write(f"cache_hit_rate={cache_stats['hit_rate']}\n")
@@ -5,101 +5,119 @@ P05B - Run RÉEL avec create_market_state() + breakdown interne
 """
 import sys
 import time
-import json
 from pathlib import Path
-from datetime import datetime
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-import logging
-logging.basicConfig(level=logging.ERROR)
+import numpy as np
+import orjson
+
+from engines.timeframe_aggregator import close_events  # noqa: E402
+from models.market_data import Candle  # noqa: E402
+from scripts._bench_common import make_engine, miss_reasons, setup_logging  # noqa: E402
 
-from backtest.engine import BacktestEngine
-from models.backtest import BacktestConfig
+setup_logging()
 
 print("="*80)
 print("P05B - RUN RÉEL 500 BARS PROCESSED")
 print("="*80)
 
-config = BacktestConfig(
-    run_name='p05b_real_flow',
-    start_date=datetime(2024, 6, 2, 8, 0, 0),
-    end_date=datetime(2024, 6, 12, 16, 0, 0),
-    symbols=['SPY'],
-    data_paths=['/app/data/historical/1m/SPY.parquet'],
-    initial_capital=10000.0,
-    trading_mode='AGGRESSIVE',
-    trade_types=['DAILY', 'SCALP']
-)
-
 print("\nLoading data...")
 t_load = time.time()
-engine = BacktestEngine(config)
-engine.load_data()
+engine = make_engine({
+    'run_name': 'p05b_real_flow',
+    'start_date': '2024-06-02',
+    'end_date': '2024-06-12',
+})
 print(f"Load: {time.time()-t_load:.2f}s")
 
-# ACTIVER instrumentation interne
-engine.market_state_engine._instrumentation_log = []
+# ACTIVER instrumentation interne (tableau structuré, une ligne par create_market_state)
+engine.market_state_engine.enable_instrumentation_array()
+# Moyenne / P95 par étape en flux (pas de tri des échantillons en fin de run)
+engine.market_state_engine.enable_timing_summary()
 
 # Run jusqu'à 500 bars processed
 print("\nRunning until 500 bars processed...")
 
-minutes = sorted(engine.combined_data["datetime"].unique())
+minutes = engine.sorted_minutes()  # DatetimeIndex trié, pas de sorted() sur des Timestamps boxés
 bars_processed = 0
 TARGET = 500
-cache_miss_log = []
-
-t_run_start = time.time()
+# Un enregistrement par appel à create_market_state (au plus un par symbole et par bar)
+MISS_DTYPE = np.dtype([('bar_idx', 'i4'), ('ts', 'i8'), ('flags', 'u1')])
+miss_buf = np.empty(TARGET * len(engine.config.symbols), dtype=MISS_DTYPE)
+miss_n = 0
+
+# Position de chaque minute dans les colonnes numpy (engine.candle_arrays) :
+# un searchsorted par symbole au lieu de deux lookups dict par barre
+minutes_ns = minutes.as_unit("ns").asi8
+positions = []
+for symbol in engine.config.symbols:
+    arrays = engine.candle_arrays.get(symbol)
+    if arrays is None or len(arrays["ts"]) == 0:
+        continue
+    pos = np.minimum(np.searchsorted(arrays["ts"], minutes_ns), len(arrays["ts"]) - 1)
+    positions.append((
+        symbol,
+        np.where(arrays["ts"][pos] == minutes_ns, pos, -1),
+        arrays["open"], arrays["high"], arrays["low"], arrays["close"], arrays["volume"],
+    ))
+
+# Noms locaux pour la boucle chaude
+add_1m_candle_flags = engine.tf_aggregator.add_1m_candle_flags
+
+warmed_up = False  # une fois l'historique minimum atteint, il le reste
+
+t_run_start = time.perf_counter_ns()
 
 for idx, current_time in enumerate(minutes):
     if bars_processed >= TARGET:
         break
     
     # Ajouter à l'agrégateur
-    htf_events = {}
-    for symbol in engine.config.symbols:
-        candle_1m = engine.candles_1m_by_timestamp.get(symbol, {}).get(current_time)
-        if candle_1m is None:
+    htf_flags = {}
+    for symbol, pos, o, h, l, c, v in positions:
+        i = pos[idx]
+        if i < 0:
             continue
-        events = engine.tf_aggregator.add_1m_candle(candle_1m)
-        htf_events[symbol] = events
+        candle_1m = Candle(
+            symbol=symbol, timeframe="1m", timestamp=current_time,
+            open=o[i], high=h[i], low=l[i], close=c[i], volume=v[i],
+        )
+        htf_flags[symbol] = add_1m_candle_flags(candle_1m)
     
-    # Check warmup
-    candles_1m = engine.tf_aggregator.get_candles('SPY', '1m')
-    candles_5m = engine.tf_aggregator.get_candles('SPY', '5m')
-    candles_1h = engine.tf_aggregator.get_candles('SPY', '1h')
-    
-    if len(candles_1m) < 50 or len(candles_5m) < 5 or len(candles_1h) < 2:
-        continue  # Skip warmup
+    # Check warmup (seulement tant qu'il n'est pas atteint)
+    if not warmed_up:
+        c1 = len(engine.tf_aggregator.get_candles('SPY', '1m'))
+        c5 = len(engine.tf_aggregator.get_candles('SPY', '5m'))
+        c1h = len(engine.tf_aggregator.get_candles('SPY', '1h'))
+        if c1 < 50 or c5 < 5 or c1h < 2:
+            continue  # Skip warmup
+        warmed_up = True
     
     # APPEL RÉEL _process_bar_optimized (flow réel)
     for symbol in engine.config.symbols:
-        events = htf_events.get(symbol, {})
+        flags = htf_flags.get(symbol, 0)
+        events = close_events(flags) if symbol in htf_flags else {}
         
         # Track cache miss AVANT l'appel
-        cache_misses_before = len(engine.market_state_engine._instrumentation_log)
+        cache_misses_before = engine.market_state_engine._instrumentation_n
         
         setup = engine._process_bar_optimized(symbol, current_time, events)
         
         # Track cache miss APRÈS l'appel
-        cache_misses_after = len(engine.market_state_engine._instrumentation_log)
+        cache_misses_after = engine.market_state_engine._instrumentation_n
         
         if cache_misses_after > cache_misses_before:
             # create_market_state a été appelé
-            cache_miss_log.append({
-                'bar_idx': bars_processed,
-                'ts': current_time.isoformat(),
-                'is_close_1h': events.get('is_close_1h', False),
-                'is_close_4h': events.get('is_close_4h', False),
-                'is_close_1d': events.get('is_close_1d', False)
-            })
+            miss_buf[miss_n] = (bars_processed, current_time.value, flags)
+            miss_n += 1
     
     bars_processed += 1
     
     if bars_processed % 100 == 0:
         print(f"  {bars_processed}/{TARGET} bars processed...")
 
-t_run = time.time() - t_run_start
+t_run = (time.perf_counter_ns() - t_run_start) / 1e9
 
 print(f"\n{'='*80}")
 print(f"RÉSULTATS - {bars_processed} BARS PROCESSED")
@@ -108,44 +126,43 @@ print(f"Run time: {t_run:.2f}s")
 print(f"Avg per bar: {t_run/bars_processed*1000:.1f}ms")
 
 # ANALYSE INSTRUMENTATION INTERNE
-instrumentation = engine.market_state_engine._instrumentation_log
+instrumentation = engine.market_state_engine.instrumentation_array()
 
 print(f"\n{'='*80}")
 print(f"CREATE_MARKET_STATE CALLS")
 print(f"{'='*80}")
 print(f"Total calls: {len(instrumentation)}")
-print(f"Cache misses logged: {len(cache_miss_log)}")
+print(f"Cache misses logged: {miss_n}")
 
 # ASSERT cohérence
-if len(instrumentation) != len(cache_miss_log):
-    print(f"⚠️  WARNING: instrumentation ({len(instrumentation)}) != cache_miss_log ({len(cache_miss_log)})")
+if len(instrumentation) != miss_n:
+    print(f"⚠️  WARNING: instrumentation ({len(instrumentation)}) != misses ({miss_n})")
 
 if len(instrumentation) == 0:
     print("\n❌ NO create_market_state CALLS - Flow not working")
     sys.exit(1)
 
-# BREAKDOWN (moyenne + P95)
-import numpy as np
-
-t_detect = [i['t_detect_structure_ms'] for i in instrumentation]
-t_bias = [i['t_bias_calc_ms'] for i in instrumentation]
-t_profile = [i['t_profile_confluence_ms'] for i in instrumentation]
-t_finalize = [i['t_finalize_ms'] for i in instrumentation]
-t_total = [i['t_total_ms'] for i in instrumentation]
+# BREAKDOWN (moyenne + P95, résumé en flux)
+timing = engine.market_state_engine.get_timing_summary()
+t_detect = timing['detect']
+t_bias = timing['bias']
+t_profile = timing['profile']
+t_finalize = timing['finalize']
+t_total = timing['total']
 
 print(f"\n{'='*80}")
 print(f"BREAKDOWN (moyenne / P95)")
 print(f"{'='*80}")
-print(f"detect_structure:   {np.mean(t_detect):.2f}ms / {np.percentile(t_detect, 95):.2f}ms")
-print(f"bias_calc:          {np.mean(t_bias):.2f}ms / {np.percentile(t_bias, 95):.2f}ms")
-print(f"profile_confluence: {np.mean(t_profile):.2f}ms / {np.percentile(t_profile, 95):.2f}ms")
-print(f"finalize:           {np.mean(t_finalize):.2f}ms / {np.percentile(t_finalize, 95):.2f}ms")
-print(f"TOTAL:              {np.mean(t_total):.2f}ms / {np.percentile(t_total, 95):.2f}ms")
+print(f"detect_structure:   {t_detect['mean_ms']:.2f}ms / {t_detect['p95_ms']:.2f}ms")
+print(f"bias_calc:          {t_bias['mean_ms']:.2f}ms / {t_bias['p95_ms']:.2f}ms")
+print(f"profile_confluence: {t_profile['mean_ms']:.2f}ms / {t_profile['p95_ms']:.2f}ms")
+print(f"finalize:           {t_finalize['mean_ms']:.2f}ms / {t_finalize['p95_ms']:.2f}ms")
+print(f"TOTAL:              {t_total['mean_ms']:.2f}ms / {t_total['p95_ms']:.2f}ms")
 
 # Pourcentages
-pct_detect = np.mean(t_detect) / np.mean(t_total) * 100
-pct_bias = np.mean(t_bias) / np.mean(t_total) * 100
-pct_profile = np.mean(t_profile) / np.mean(t_total) * 100
+pct_detect = t_detect['mean_ms'] / t_total['mean_ms'] * 100
+pct_bias = t_bias['mean_ms'] / t_total['mean_ms'] * 100
+pct_profile = t_profile['mean_ms'] / t_total['mean_ms'] * 100
 
 print(f"\nPourcentages:")
 print(f"  detect_structure: {pct_detect:.1f}%")
@@ -161,9 +178,9 @@ else:
     print(f"\n🚨 GOULOT: profile_confluence ({pct_profile:.0f}%)")
 
 # Candles analyzed
-avg_daily = np.mean([i['daily_candles'] for i in instrumentation])
-avg_h4 = np.mean([i['h4_candles'] for i in instrumentation])
-avg_h1 = np.mean([i['h1_candles'] for i in instrumentation])
+avg_daily = np.mean(instrumentation['daily'])
+avg_h4 = np.mean(instrumentation['h4'])
+avg_h1 = np.mean(instrumentation['h1'])
 
 print(f"\nCandles analyzed (avg):")
 print(f"  Daily: {avg_daily:.1f}")
@@ -171,22 +188,18 @@ print(f"  4H: {avg_h4:.1f}")
 print(f"  1H: {avg_h1:.1f}")
 
 # Cache miss reasons
-miss_reasons = {
-    '1h_close': sum(1 for m in cache_miss_log if m['is_close_1h']),
-    '4h_close': sum(1 for m in cache_miss_log if m['is_close_4h']),
-    '1d_close': sum(1 for m in cache_miss_log if m['is_close_1d']),
-}
+misses_by_reason = miss_reasons(miss_buf[:miss_n]['flags'])
 
 print(f"\n{'='*80}")
 print(f"CACHE MISS ANALYSIS")
 print(f"{'='*80}")
-print(f"Total misses: {len(cache_miss_log)}")
-print(f"Miss rate: {len(cache_miss_log)/bars_processed*100:.1f}%")
-print(f"Miss frequency: 1 every {bars_processed/len(cache_miss_log):.1f} bars")
+print(f"Total misses: {miss_n}")
+print(f"Miss rate: {miss_n/bars_processed*100:.1f}%")
+print(f"Miss frequency: 1 every {bars_processed/miss_n:.1f} bars")
 
 print(f"\nMiss causes:")
-for reason, count in miss_reasons.items():
-    pct = count / len(cache_miss_log) * 100 if cache_miss_log else 0
+for reason, count in misses_by_reason.items():
+    pct = count / miss_n * 100 if miss_n else 0
     print(f"  {reason}: {count} ({pct:.1f}%)")
 
 # EXTRAPOLATION 1 JOUR (390 bars)
@@ -194,9 +207,9 @@ print(f"\n{'='*80}")
 print(f"EXTRAPOLATION 1 JOUR (390 bars)")
 print(f"{'='*80}")
 
-miss_rate = len(cache_miss_log) / bars_processed
+miss_rate = miss_n / bars_processed
 est_misses_1day = int(390 * miss_rate)
-cost_per_miss = np.mean(t_total)
+cost_per_miss = t_total['mean_ms']
 total_cost_misses_sec = est_misses_1day * cost_per_miss / 1000
 
 # Reste du code (patterns, playbooks, etc)
@@ -222,25 +235,27 @@ summary = {
     'processed_bars': bars_processed,
     'create_market_state_calls': len(instrumentation),
     'breakdown_avg': {
-        'detect_structure_ms': np.mean(t_detect),
-        'bias_calc_ms': np.mean(t_bias),
-        'profile_confluence_ms': np.mean(t_profile),
-        'finalize_ms': np.mean(t_finalize),
-        'total_ms': np.mean(t_total)
+        'detect_structure_ms': t_detect['mean_ms'],
+        'bias_calc_ms': t_bias['mean_ms'],
+        'profile_confluence_ms': t_profile['mean_ms'],
+        'finalize_ms': t_finalize['mean_ms'],
+        'total_ms': t_total['mean_ms']
     },
     'breakdown_p95': {
-        'detect_structure_ms': np.percentile(t_detect, 95),
-        'bias_calc_ms': np.percentile(t_bias, 95),
-        'profile_confluence_ms': np.percentile(t_profile, 95),
-        'finalize_ms': np.percentile(t_finalize, 95),
-        'total_ms': np.percentile(t_total, 95)
+        'detect_structure_ms': t_detect['p95_ms'],
+        'bias_calc_ms': t_bias['p95_ms'],
+        'profile_confluence_ms': t_profile['p95_ms'],
+        'finalize_ms': t_finalize['p95_ms'],
+        'total_ms': t_total['p95_ms']
     },
     'cache_miss_rate': miss_rate,
     'est_1day_sec': total_1day_sec
 }
 
-with open('/tmp/p05b_summary.json', 'w') as f:
-    json.dump(summary, f, indent=2)
+# orjson sérialise directement les scalaires numpy
+Path('/tmp/p05b_summary.json').write_bytes(
+    orjson.dumps(summary, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2)
+)
 
 print(f"\n✅ Summary saved to /tmp/p05b_summary.json")
 
@@ -249,8 +264,13 @@ print(f"\n{'='*80}")
 print(f"TOP 20 MOST EXPENSIVE CALLS")
 print(f"{'='*80}")
 
-sorted_instr = sorted(instrumentation, key=lambda x: x['t_total_ms'], reverse=True)[:20]
+# Sélection partielle O(N) des 20 plus coûteux, puis tri de ces 20 seulement
+t_total_calls = instrumentation['t_total']
+top_k = min(20, len(t_total_calls))
+idx_top = np.argpartition(t_total_calls, len(t_total_calls) - top_k)[-top_k:]
+idx_top = idx_top[np.argsort(-t_total_calls[idx_top], kind='stable')]
+sorted_instr = instrumentation[idx_top]
 for i, entry in enumerate(sorted_instr, 1):
-    print(f"{i:2d}. {entry['t_total_ms']:.1f}ms (detect={entry['t_detect_structure_ms']:.1f}ms, bias={entry['t_bias_calc_ms']:.1f}ms)")
+    print(f"{i:2d}. {entry['t_total']:.1f}ms (detect={entry['t_detect']:.1f}ms, bias={entry['t_bias']:.1f}ms)")
 
 print(f"\n{'='*80}")
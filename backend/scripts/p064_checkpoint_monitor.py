@@ -10,7 +10,7 @@ Fields:
 - scenario
 - progress_pct / minutes_done / minutes_total
 - current_timestamp (approximate last processed candle timestamp)
-- trades_cum (grepped from main log)
+- trades_cum (counted incrementally from main log)
 - rss_mb (runner RSS)
 
 Notes:
@@ -20,131 +20,236 @@ Notes:
 
 from __future__ import annotations
 
-import json
+import atexit
 import os
 import re
-import subprocess
 import time
+from datetime import datetime, timezone
 from pathlib import Path
 
+import numpy as np
+import orjson
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 
 
 LOG_PATH = Path("/app/data/backtest_results/p064_ablation_6m.log")
 OUT_PATH = Path("/app/data/backtest_results/p064_checkpoint.log")
+DATA_DIR = Path("/app/data/historical/1m")
+TIMELINE_CACHE = DATA_DIR / "_timeline.npy"
+TIMELINE_SYMBOLS = ("SPY", "QQQ")
 
-TOTAL_RE = re.compile(r"Processed\s+(\d+)/(\d+)\s+minutes\s+\(([^%]+)%\)")
-SCEN_RE = re.compile(r"ABLATION:\s+([a-zA-Z0-9_\-]+)")
+# Matched on raw bytes (ASCII classes, no decode). Each pattern has a literal
+# prefix checked with `in` first, so the regex only runs on candidate lines.
+TOTAL_PREFIX = b"Processed"
+TOTAL_RE = re.compile(rb"Processed\s+(\d+)/(\d+)\s+minutes\s+\(([^%]+)%\)")
+SCEN_PREFIX = b"ABLATION:"
+SCEN_RE = re.compile(rb"ABLATION:\s+([a-zA-Z0-9_\-]+)")
+
+_PS = os.sysconf("SC_PAGE_SIZE")
+
+# Poll fast while the log is moving, slowly once it has been quiet for a minute.
+POLL_ACTIVE_S = 5
+POLL_IDLE_S = 60
+ACTIVE_WINDOW_S = 60
+# We don't strictly rely on the runner PID (command line can differ). Instead, we stop when:
+# - no ablation process is found AND
+# - the log file hasn't been updated for a while.
+STOP_IF_NO_UPDATE_FOR_S = 900
+
+# Checkpoint timestamps: UTC, "Z" suffix, second resolution.
+CHECKPOINT_OPTS = orjson.OPT_UTC_Z | orjson.OPT_OMIT_MICROSECONDS
+
+
+RUNNER_NEEDLE = b"backtest.ablation_runner"
+_runner_pid: int | None = None
 
 
 def _get_runner_pid() -> int | None:
-    try:
-        out = subprocess.check_output(["pgrep", "-af", "python -m backtest.ablation_runner"], text=True).strip().splitlines()
-        if out:
-            return int(out[0].split()[0])
-    except Exception:
-        return None
-    return None
+    """Ablation runner PID from a /proc/*/cmdline scan, cached while /proc/<pid> exists."""
+    global _runner_pid
+    if _runner_pid is not None and os.path.exists(f"/proc/{_runner_pid}"):
+        return _runner_pid
+    _runner_pid = None
+    me = os.getpid()
+    for entry in os.scandir("/proc"):
+        if not entry.name.isdigit() or int(entry.name) == me:
+            continue
+        try:
+            with open(f"/proc/{entry.name}/cmdline", "rb") as f:
+                if RUNNER_NEEDLE in f.read():
+                    _runner_pid = int(entry.name)
+                    break
+        except OSError:
+            continue
+    return _runner_pid
 
 
 def _get_rss_mb(pid: int | None) -> float | None:
     if not pid:
         return None
     try:
-        rss_kb = int(subprocess.check_output(["bash", "-lc", f"ps -o rss= -p {pid} | tr -d ' '"], text=True).strip())
-        return round(rss_kb / 1024.0, 1)
-    except Exception:
+        # /proc/<pid>/statm: size resident shared ... (in pages)
+        with open(f"/proc/{pid}/statm") as f:
+            rss_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
         return None
+    return round(rss_pages * _PS / 1048576.0, 1)
 
 
-def _count_trades(log_path: Path) -> int | None:
+def _count_trades(log_path: Path, state: dict) -> int | None:
+    """Cumulative 'Trade closed' count, reading only what was appended since the last call."""
     try:
-        return int(subprocess.check_output(["bash", "-lc", f"grep -c 'Trade closed' {log_path} || true"], text=True).strip() or "0")
-    except Exception:
+        with log_path.open("rb") as f:
+            if f.seek(0, os.SEEK_END) < state["trades_offset"]:
+                # Log truncated / rotated: start over.
+                state["trades_offset"] = 0
+                state["trades_count"] = 0
+            f.seek(state["trades_offset"])
+            chunk = f.read()
+    except OSError:
         return None
+    # Only consume complete lines so a marker split by a partial write is not missed.
+    end = chunk.rfind(b"\n") + 1
+    state["trades_count"] += chunk.count(b"Trade closed", 0, end)
+    state["trades_offset"] += end
+    return state["trades_count"]
 
 
-def _build_timeline(data_dir: Path) -> list[pd.Timestamp]:
-    # Union of SPY/QQQ timestamps (should match minutes_total).
-    ts = []
-    for sym in ["SPY", "QQQ"]:
+def _tail_bytes(path: Path, max_bytes: int = 131072, max_lines: int = 600) -> list[bytes]:
+    """Last raw lines of `path`, read with a single pread of at most `max_bytes` from the end."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        start = max(0, size - max_bytes)
+        data = os.pread(fd, size - start, start)
+    finally:
+        os.close(fd)
+    lines = data.split(b"\n")
+    if start:
+        lines = lines[1:]  # first line is cut mid-way
+    return lines[-max_lines:]
+
+
+def _scan_tail(lines: list[bytes]) -> tuple[str | None, tuple[int, int, float] | None]:
+    """Last scenario name and last (done, total, pct) progress, in one reverse pass."""
+    scen = None
+    prog = None
+    for line in reversed(lines):
+        if scen is None and SCEN_PREFIX in line:
+            m = SCEN_RE.search(line)
+            if m:
+                scen = m.group(1).decode("ascii")
+        if prog is None and TOTAL_PREFIX in line:
+            m = TOTAL_RE.search(line)
+            if m:
+                prog = (int(m.group(1)), int(m.group(2)), float(m.group(3)))
+        if scen is not None and prog is not None:
+            break
+    return scen, prog
+
+
+def _poll_interval(idle_s: float) -> float:
+    """Seconds to sleep given how long the log has been idle.
+
+    Before the stale deadline, never sleeps past it; once it has passed (runner still
+    alive through a long silent phase), back to the idle cadence.
+    """
+    sleep_s = POLL_ACTIVE_S if idle_s < ACTIVE_WINDOW_S else POLL_IDLE_S
+    remaining_s = STOP_IF_NO_UPDATE_FOR_S - idle_s
+    if remaining_s <= 0:
+        return POLL_IDLE_S
+    return max(1.0, min(sleep_s, remaining_s))
+
+
+def _build_timeline(data_dir: Path) -> np.ndarray:
+    """Sorted union of SPY/QQQ timestamps as UTC int64 ns (should match minutes_total)."""
+    cols = []
+    for sym in TIMELINE_SYMBOLS:
         p = data_dir / f"{sym}.parquet"
         if p.exists():
-            df = pd.read_parquet(p, columns=["datetime"])
-            ts.append(pd.to_datetime(df["datetime"], utc=True))
-    if not ts:
-        return []
-    all_ts = pd.concat(ts, ignore_index=True).drop_duplicates().sort_values()
-    return list(all_ts)
+            col = pq.read_table(p, columns=["datetime"]).column(0)
+            # Naive timestamps are taken as UTC (like pd.to_datetime(utc=True)).
+            col = col.cast(pa.timestamp("ns", tz=col.type.tz)).cast(pa.int64())
+            cols.extend(col.chunks)
+    if not cols:
+        return np.empty(0, dtype=np.int64)
+    uniq = pc.unique(pa.chunked_array(cols, type=pa.int64()))
+    return np.sort(uniq.to_numpy())
+
+
+def _load_timeline(data_dir: Path = DATA_DIR, cache: Path = TIMELINE_CACHE) -> np.ndarray:
+    """Timeline memory-mapped from `cache`, rebuilt when older than any source parquet."""
+    sources = [data_dir / f"{sym}.parquet" for sym in TIMELINE_SYMBOLS]
+    newest = max((p.stat().st_mtime_ns for p in sources if p.exists()), default=0)
+    try:
+        if cache.stat().st_mtime_ns >= newest:
+            return np.load(cache, mmap_mode="r")
+    except (OSError, ValueError):
+        pass
+    timeline = _build_timeline(data_dir)
+    tmp = cache.with_suffix(".tmp.npy")
+    try:
+        np.save(tmp, timeline)
+        os.replace(tmp, cache)
+    except OSError:
+        return timeline  # read-only data dir: keep the in-memory copy
+    return np.load(cache, mmap_mode="r")
 
 
 def main() -> None:
     OUT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    # One handle for the monitor's lifetime; unbuffered so each checkpoint line is one write.
+    out_fh = OUT_PATH.open("ab", buffering=0)
+    atexit.register(out_fh.close)
 
-    # Build once (lightweight: ~116k items)
-    timeline = _build_timeline(Path("/app/data/historical/1m"))
+    # Cached on disk, memory-mapped (~116k int64)
+    timeline = _load_timeline()
 
     state = {
         "current_scenario": None,
         "next_threshold": 10,
         "last_pct": None,
         "last_trades": None,
+        "trades_offset": 0,
+        "trades_count": 0,
         "last_log_mtime": None,
-        "no_update_seconds": 0,
+        "last_activity_ts": time.monotonic(),
+        "no_update_seconds": 0.0,
     }
 
-    # We don't strictly rely on pgrep (command line can differ). Instead, we stop when:
-    # - no ablation process is found AND
-    # - the log file hasn't been updated for a while.
-    STOP_IF_NO_UPDATE_FOR_S = 900
-
     while True:
-        # Track log freshness
+        # Track log freshness (elapsed wall clock since the log last changed)
         if LOG_PATH.exists():
             mtime = LOG_PATH.stat().st_mtime
-            if state["last_log_mtime"] is None:
-                state["last_log_mtime"] = mtime
-            elif mtime == state["last_log_mtime"]:
-                state["no_update_seconds"] += 30
-            else:
+            if mtime != state["last_log_mtime"]:
                 state["last_log_mtime"] = mtime
-                state["no_update_seconds"] = 0
+                state["last_activity_ts"] = time.monotonic()
+        state["no_update_seconds"] = time.monotonic() - state["last_activity_ts"]
 
         # Continue until stop condition above triggers (log stale + no process).
+        if state["no_update_seconds"] >= STOP_IF_NO_UPDATE_FOR_S and _get_runner_pid() is None:
+            break
 
         if not LOG_PATH.exists():
             time.sleep(10)
             continue
 
         try:
-            tail = subprocess.check_output(["tail", "-n", "600", str(LOG_PATH)], text=True, stderr=subprocess.DEVNULL)
-        except Exception:
+            tail = _tail_bytes(LOG_PATH)
+        except OSError:
             time.sleep(10)
             continue
 
-        # Scenario detection
-        scen = None
-        for line in reversed(tail.splitlines()):
-            m = SCEN_RE.search(line)
-            if m:
-                scen = m.group(1)
-                break
+        # Scenario + progress detection (last match of each)
+        scen, prog = _scan_tail(tail)
         if scen and scen != state["current_scenario"]:
             state["current_scenario"] = scen
             state["next_threshold"] = 10
             state["last_pct"] = None
 
-        # Progress detection (use last match)
-        prog = None
-        for line in reversed(tail.splitlines()):
-            m = TOTAL_RE.search(line)
-            if m:
-                done = int(m.group(1))
-                total = int(m.group(2))
-                pct = float(m.group(3))
-                prog = (done, total, pct)
-                break
-
         if prog:
             done, total, pct = prog
 
@@ -155,19 +260,19 @@ def main() -> None:
 
             if pct >= state["next_threshold"]:
                 pid = _get_runner_pid()
-                trades = _count_trades(LOG_PATH)
+                trades = _count_trades(LOG_PATH, state)
                 trades_delta = None
                 if trades is not None and state["last_trades"] is not None:
                     trades_delta = trades - state["last_trades"]
                 state["last_trades"] = trades
 
                 current_ts = None
-                if timeline:
+                if len(timeline):
                     idx = min(max(done - 1, 0), len(timeline) - 1)
-                    current_ts = timeline[idx].isoformat()
+                    current_ts = pd.Timestamp(int(timeline[idx]), unit="ns", tz="UTC").isoformat()
 
                 checkpoint = {
-                    "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "timestamp": datetime.now(tz=timezone.utc),
                     "scenario": state["current_scenario"],
                     "progress_pct": pct,
                     "minutes_done": done,
@@ -179,13 +284,12 @@ def main() -> None:
                     "rss_mb": _get_rss_mb(pid),
                 }
 
-                with OUT_PATH.open("a", encoding="utf-8") as f:
-                    f.write(json.dumps(checkpoint) + "\n")
+                out_fh.write(orjson.dumps(checkpoint, option=CHECKPOINT_OPTS) + b"\n")
 
                 while state["next_threshold"] <= pct:
                     state["next_threshold"] += 10
 
-        time.sleep(30)
+        time.sleep(_poll_interval(state["no_update_seconds"]))
 
 
 if __name__ == "__main__":
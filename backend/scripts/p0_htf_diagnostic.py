@@ -6,7 +6,7 @@ import sys
 import logging
 from pathlib import Path
 import pandas as pd
-from datetime import datetime
+import pyarrow.parquet as pq
 
 # Setup path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -38,20 +38,18 @@ def main():
         logger.error(f"❌ Data file not found: {data_path}")
         return
     
-    # Charger et limiter à 200 bars
-    df_full = pd.read_parquet(data_path)
+    # Prendre 2000 bars à partir d'une date où il y a déjà de l'historique
+    # (pour éviter le warmup initial). Le contrat parquet garantit un fichier trié :
+    # on tranche la table Arrow (zero-copy) avant toute conversion pandas.
+    start_idx = 500  # Skip les premières 500 bars (warmup)
+    df_test = pq.read_table(data_path).slice(start_idx, 2000).to_pandas()
     
     # Support Parquet contract: datetime is in index
-    if 'datetime' not in df_full.columns:
-        df_full = df_full.reset_index()  # Convertir l'index en colonne
-    
-    df_full['datetime'] = pd.to_datetime(df_full['datetime'], utc=True, errors='coerce')
-    df_full = df_full.sort_values('datetime').reset_index(drop=True)
+    if 'datetime' not in df_test.columns:
+        df_test = df_test.reset_index()  # Convertir l'index en colonne
     
-    # Prendre 2000 bars à partir d'une date où il y a déjà de l'historique
-    # (pour éviter le warmup initial)
-    start_idx = 500  # Skip les premières 500 bars (warmup)
-    df_test = df_full.iloc[start_idx:start_idx+2000].copy()
+    df_test['datetime'] = pd.to_datetime(df_test['datetime'], utc=True, errors='coerce')
+    df_test = df_test.sort_values('datetime').reset_index(drop=True)
     
     # Sauvegarder temporairement
     temp_path = Path("/tmp/spy_200bars_diagnostic.parquet")
@@ -64,8 +62,8 @@ def main():
     config = BacktestConfig(
         data_paths=[str(temp_path)],
         symbols=['SPY'],
-        start_date=df_test['datetime'].min(),
-        end_date=df_test['datetime'].max(),
+        start_date=df_test['datetime'].min().strftime('%Y-%m-%d'),
+        end_date=df_test['datetime'].max().strftime('%Y-%m-%d'),
         initial_capital=100000.0,
         trading_mode='AGGRESSIVE',
         trade_types=['SCALP', 'DAILY'],
@@ -1,51 +1,26 @@
 #!/usr/bin/env python3
 """Profiling du backtest pour identifier les goulots"""
 import sys
-import cProfile
-import pstats
-import io
 from pathlib import Path
-from datetime import datetime
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from backtest.engine import BacktestEngine
-from models.backtest import BacktestConfig
+from scripts._profile_configs import CFG_PROFILE_DAY, cached_engine  # noqa: E402
+from scripts._profile_util import sampling_profiler  # noqa: E402
 
 def profile_backtest():
-    # Test ultra-court : 30 minutes (09:30-10:00)
-    config = BacktestConfig(
-        run_name='profile_test',
-        start_date=datetime(2024, 6, 12, 9, 30, 0),
-        end_date=datetime(2024, 6, 12, 10, 0, 0),
-        symbols=['SPY'],
-        data_paths=['/app/data/historical/1m/SPY.parquet'],
-        initial_capital=10000.0,
-        trading_mode='AGGRESSIVE',
-        trade_types=['DAILY', 'SCALP']
-    )
-    
-    engine = BacktestEngine(config)
-    engine.load_data()
+    # Test court : 1 journée (end_date inclusif à la journée)
+    engine = cached_engine(CFG_PROFILE_DAY)
     result = engine.run()
     
-    print(f"\nCompleted: {result.total_trades} trades, {result.total_r:.2f}R")
+    print(f"\nCompleted: {result.total_trades} trades, {result.total_pnl_r:.2f}R")
     return result
 
 if __name__ == "__main__":
-    profiler = cProfile.Profile()
-    profiler.enable()
-    
-    result = profile_backtest()
-    
-    profiler.disable()
-    
-    # Générer stats
-    s = io.StringIO()
-    ps = pstats.Stats(profiler, stream=s).sort_stats('cumulative')
-    ps.print_stats(20)  # Top 20
+    with sampling_profiler('/tmp/profile_backtest') as prof:
+        result = profile_backtest()
     
     print("\n" + "="*80)
     print("TOP 20 FUNCTIONS BY CUMULATIVE TIME")
     print("="*80)
-    print(s.getvalue())
+    print(prof.text(20))
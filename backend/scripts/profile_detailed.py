@@ -1,38 +1,23 @@
 #!/usr/bin/env python3
-"""Profiling cProfile détaillé sur 10 minutes (logique complète réactivée)"""
+"""Profiling détaillé sur 1 journée (logique complète réactivée, --cprofile pour cProfile)"""
 import sys
-import cProfile
-import pstats
-import io
 import time
+import logging
 from pathlib import Path
-from datetime import datetime
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-# Garder logs WARNING seulement
-import logging
-logging.basicConfig(level=logging.WARNING)
+from scripts._bench_common import setup_logging  # noqa: E402
+from scripts._profile_configs import CFG_PROFILE_DAY, cached_engine  # noqa: E402
+from scripts._profile_util import sampling_profiler  # noqa: E402
 
-from backtest.engine import BacktestEngine
-from models.backtest import BacktestConfig
+# Garder logs WARNING seulement
+setup_logging(logging.WARNING)
 
-def run_backtest_10min():
-    """Test 10 minutes avec logique complète"""
-    config = BacktestConfig(
-        run_name='profile_full_logic',
-        start_date=datetime(2024, 6, 12, 9, 30, 0),
-        end_date=datetime(2024, 6, 12, 9, 40, 0),
-        symbols=['SPY'],  # 1 symbole pour profiling clair
-        data_paths=['/app/data/historical/1m/SPY.parquet'],
-        initial_capital=10000.0,
-        trading_mode='AGGRESSIVE',
-        trade_types=['DAILY', 'SCALP']
-    )
-    
+def run_backtest_day():
+    """Test 1 journée avec logique complète (1 symbole pour profiling clair)"""
     t_start = time.time()
-    engine = BacktestEngine(config)
-    engine.load_data()
+    engine = cached_engine(CFG_PROFILE_DAY)
     result = engine.run()
     t_total = time.time() - t_start
     
@@ -40,18 +25,14 @@ def run_backtest_10min():
 
 if __name__ == "__main__":
     print("="*80)
-    print("PROFILING - 10 minutes (logique complète)")
+    print("PROFILING - 1 journée (logique complète)")
     print("="*80)
     
-    profiler = cProfile.Profile()
-    profiler.enable()
-    
-    result, total_time, engine = run_backtest_10min()
-    
-    profiler.disable()
+    with sampling_profiler('/tmp/profile_stats', full_limit=50) as prof:
+        result, total_time, engine = run_backtest_day()
     
     # Métriques de base
-    bars_processed = 10  # 10 minutes
+    bars_processed = len(engine.sorted_minutes())
     ms_per_bar = (total_time / bars_processed) * 1000
     bars_per_sec = bars_processed / total_time if total_time > 0 else 0
     
@@ -62,7 +43,7 @@ if __name__ == "__main__":
     print(f"Bars processed: {bars_processed}")
     print(f"Bars/sec: {bars_per_sec:.2f}")
     print(f"ms/bar: {ms_per_bar:.1f}ms")
-    print(f"\nTrades: {result.total_trades}, Total R: {result.total_r:+.2f}R")
+    print(f"\nTrades: {result.total_trades}, Total R: {result.total_pnl_r:+.2f}R")
     print(f"Blocked by cooldown: {engine.blocked_by_cooldown}")
     print(f"Blocked by session limit: {engine.blocked_by_session_limit}")
     
@@ -78,17 +59,8 @@ if __name__ == "__main__":
         print(f"   ❌ Need {needed_speedup:.1f}x speedup to reach 15min target")
     
     # Top 15 fonctions par cumulative time
-    s = io.StringIO()
-    ps = pstats.Stats(profiler, stream=s).sort_stats('cumulative')
-    ps.print_stats(15)
-    
     print(f"\n{'='*80}")
     print(f"TOP 15 FUNCTIONS BY CUMULATIVE TIME")
     print(f"{'='*80}")
-    print(s.getvalue())
-    
-    # Sauvegarder stats complètes
-    with open('/tmp/profile_stats.txt', 'w') as f:
-        ps = pstats.Stats(profiler, stream=f).sort_stats('cumulative')
-        ps.print_stats(50)
-    print(f"\nFull stats saved to /tmp/profile_stats.txt")
+    print(prof.text(15))
+    print(f"\nFull stats saved to {prof.path}")
@@ -3,7 +3,9 @@
 Contract:
 - Input: symbol, start_date (inclusive), end_date (exclusive)
 - Output DataFrame columns: datetime (tz-aware UTC), open, high, low, close, volume
-- Handles pagination via `next_url`.
+  (download_1m_aggregates_arrow returns the same columns as a pyarrow.Table)
+- The range is split into shards that each fit in one page (`limit` bars),
+  fetched concurrently; `next_url` pagination is still followed as a fallback.
 
 API endpoint used:
 - GET /v2/aggs/ticker/{ticker}/range/1/minute/{from}/{to}
@@ -16,12 +18,19 @@ Notes:
 
 from __future__ import annotations
 
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import date, datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
 
+import numpy as np
+import orjson
 import pandas as pd
+import pyarrow as pa
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 
 
 @dataclass
@@ -31,6 +40,33 @@ class PolygonConfig:
     sort: str = "asc"
     limit: int = 50000
     per_page_delay_seconds: float = 0.0
+    # Shards requested in parallel (I/O-bound; 1 = serial)
+    concurrency: int = 4
+
+
+# At most one 1m bar per minute: a shard of `limit // MINUTES_PER_DAY` calendar
+# days (34 days for limit=50000) never needs a second page.
+MINUTES_PER_DAY = 24 * 60
+
+
+def _build_session(cfg: PolygonConfig) -> requests.Session:
+    """Keep-alive session for one download: pooled connections, 429/5xx retried with backoff.
+
+    raise_on_status=False hands the last response back, so _fetch_page still reports
+    polygon_rate_limited_429 once retries are exhausted.
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=5,
+        backoff_factor=0.2,
+        status_forcelist=(429, 500, 502, 503, 504),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    pool = max(8, cfg.concurrency)
+    session.mount("https://", HTTPAdapter(pool_connections=pool, pool_maxsize=2 * pool, max_retries=retry))
+    session.headers["Accept-Encoding"] = "gzip"
+    return session
 
 
 def _to_inclusive_to_date(end_exclusive: date) -> Optional[date]:
@@ -45,6 +81,19 @@ def _build_first_url(symbol: str, start_inclusive: date, end_exclusive: date) ->
     return f"https://api.polygon.io/v2/aggs/ticker/{symbol}/range/1/minute/{start_inclusive.isoformat()}/{to_date.isoformat()}"
 
 
+def _build_shard_urls(symbol: str, start_inclusive: date, end_exclusive: date, limit: int) -> List[str]:
+    shard_days = max(1, limit // MINUTES_PER_DAY)
+    urls: List[str] = []
+    cur = start_inclusive
+    while cur < end_exclusive:
+        nxt = min(cur + timedelta(days=shard_days), end_exclusive)
+        url = _build_first_url(symbol, cur, nxt)
+        if url:
+            urls.append(url)
+        cur = nxt
+    return urls
+
+
 def _fetch_page(session: requests.Session, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
     resp = session.get(url, params=params, timeout=60)
     if resp.status_code == 429:
@@ -52,26 +101,12 @@ def _fetch_page(session: requests.Session, url: str, params: Dict[str, Any]) ->
         raise RuntimeError("polygon_rate_limited_429")
     if resp.status_code >= 400:
         raise RuntimeError(f"polygon_http_{resp.status_code}: {resp.text[:200]}")
-    return resp.json()
+    # orjson: pages are up to 50k bars of numbers, stdlib json parse dominates otherwise.
+    return orjson.loads(resp.content)
 
 
-def download_1m_aggregates(
-    *,
-    session: requests.Session,
-    symbol: str,
-    start: date,
-    end: date,
-    cfg: PolygonConfig,
-) -> pd.DataFrame:
-    """Download aggregates and return a normalized DataFrame."""
-
-    first_url = _build_first_url(symbol, start, end)
-    if not first_url:
-        return pd.DataFrame(columns=["datetime", "open", "high", "low", "close", "volume"])
-
-    url: Optional[str] = first_url
-    all_rows: List[Dict[str, Any]] = []
-
+def _fetch_shard(session: requests.Session, first_url: str, cfg: PolygonConfig) -> List[Dict[str, Any]]:
+    """Raw results of one shard; follows `next_url` if Polygon still paginates."""
     # First request uses standard params. Follow-up requests use `next_url`.
     first_params: Dict[str, Any] = {
         "adjusted": "true" if cfg.adjusted else "false",
@@ -80,42 +115,113 @@ def download_1m_aggregates(
         "apiKey": cfg.api_key,
     }
 
+    results: List[Dict[str, Any]] = []
+    url: Optional[str] = first_url
     while url:
         # Polygon requires apiKey even on next_url calls.
         params = first_params if url == first_url else {"apiKey": cfg.api_key}
         payload = _fetch_page(session, url, params=params)
-
-        results = payload.get("results") or []
-        for r in results:
-            # t: unix ms timestamp
-            ts_ms = r.get("t")
-            if ts_ms is None:
-                continue
-            dt = datetime.fromtimestamp(ts_ms / 1000.0, tz=timezone.utc)
-            all_rows.append(
-                {
-                    "datetime": dt,
-                    "open": r.get("o"),
-                    "high": r.get("h"),
-                    "low": r.get("l"),
-                    "close": r.get("c"),
-                    "volume": r.get("v"),
-                }
-            )
+        results.extend(payload.get("results") or [])
 
         url = payload.get("next_url")
         if url and cfg.per_page_delay_seconds:
-            import time
-
             time.sleep(cfg.per_page_delay_seconds)
+    return results
+
+
+PRICE_KEYS = (("open", "o"), ("high", "h"), ("low", "l"), ("close", "c"), ("volume", "v"))
+
+AGGREGATES_SCHEMA = pa.schema(
+    [("datetime", pa.timestamp("ns", tz="UTC"))] + [(name, pa.float64()) for name, _ in PRICE_KEYS]
+)
+
+
+def _results_to_columns(results: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """One shard's raw results as column arrays (t in unix ms); rows without `t` are dropped.
+
+    A missing or null price/volume field becomes NaN.
+    """
+    n = len(results)
+    ts = np.empty(n, dtype=np.int64)
+    cols = {name: np.empty(n, dtype=np.float64) for name, _ in PRICE_KEYS}
+    op, hi, lo, cl, vol = cols.values()
+    nan = float("nan")
+    i = 0
+    for r in results:
+        t = r.get("t")
+        if t is None:
+            continue
+        ts[i] = t
+        v = r.get("o")
+        op[i] = nan if v is None else v
+        v = r.get("h")
+        hi[i] = nan if v is None else v
+        v = r.get("l")
+        lo[i] = nan if v is None else v
+        v = r.get("c")
+        cl[i] = nan if v is None else v
+        v = r.get("v")
+        vol[i] = nan if v is None else v
+        i += 1
+    out = {"t": ts[:i]}
+    out.update((name, arr[:i]) for name, arr in cols.items())
+    return out
+
+
+def _columns_to_batch(cols: Dict[str, np.ndarray]) -> pa.RecordBatch:
+    arrays = [pa.array(cols["t"] * 1_000_000, type=AGGREGATES_SCHEMA.field("datetime").type)]
+    arrays += [pa.array(cols[name]) for name, _ in PRICE_KEYS]
+    return pa.RecordBatch.from_arrays(arrays, schema=AGGREGATES_SCHEMA)
+
+
+def download_1m_aggregates_arrow(
+    *,
+    session: Optional[requests.Session] = None,
+    symbol: str,
+    start: date,
+    end: date,
+    cfg: PolygonConfig,
+) -> pa.Table:
+    """Download aggregates as a pyarrow.Table (one record batch per shard), sorted by datetime.
 
-    if not all_rows:
-        return pd.DataFrame(columns=["datetime", "open", "high", "low", "close", "volume"])
+    Without `session`, a pooled keep-alive one is built (see _build_session) and closed on return.
+    """
+
+    shard_urls = _build_shard_urls(symbol, start, end, cfg.limit)
+    if not shard_urls:
+        return AGGREGATES_SCHEMA.empty_table()
+    if session is None:
+        with _build_session(cfg) as own_session:
+            return download_1m_aggregates_arrow(session=own_session, symbol=symbol, start=start, end=end, cfg=cfg)
+
+    # Shards are independent: fetch them concurrently. map() keeps shard order.
+    workers = max(1, min(cfg.concurrency, len(shard_urls)))
+    if workers == 1:
+        shard_results = [_fetch_shard(session, url, cfg) for url in shard_urls]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            shard_results = list(executor.map(lambda url: _fetch_shard(session, url, cfg), shard_urls))
 
-    df = pd.DataFrame(all_rows)
-    df["datetime"] = pd.to_datetime(df["datetime"], utc=True)
+    shard_cols = [_results_to_columns(results) for results in shard_results]
+    table = pa.Table.from_batches([_columns_to_batch(cols) for cols in shard_cols], schema=AGGREGATES_SCHEMA)
 
-    # Ensure correct ordering and types
-    df = df.sort_values("datetime").reset_index(drop=True)
+    # Shards are disjoint and fetched in order: with sort=asc this is already sorted.
+    ts_ms = np.concatenate([cols["t"] for cols in shard_cols])
+    if len(ts_ms) > 1 and (np.diff(ts_ms) < 0).any():
+        table = table.sort_by("datetime")
+    return table
 
-    return df
+
+def download_1m_aggregates(
+    *,
+    session: Optional[requests.Session] = None,
+    symbol: str,
+    start: date,
+    end: date,
+    cfg: PolygonConfig,
+) -> pd.DataFrame:
+    """Download aggregates and return a normalized DataFrame."""
+    table = download_1m_aggregates_arrow(session=session, symbol=symbol, start=start, end=end, cfg=cfg)
+    if table.num_rows == 0:
+        return pd.DataFrame(columns=["datetime", "open", "high", "low", "close", "volume"])
+    return table.to_pandas()
@@ -12,15 +12,19 @@ This module is intentionally dependency-light and can be imported by scripts.
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import date, datetime, time
+from datetime import date, datetime, time, timezone
 from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
-import pytz
+from zoneinfo import ZoneInfo
 
 
-ET_TZ = pytz.timezone("US/Eastern")
-UTC_TZ = pytz.UTC
+ET_TZ = ZoneInfo("America/New_York")
+UTC_TZ = timezone.utc
+
+
+OHLCV_COLS = ("open", "high", "low", "close", "volume")
 
 
 @dataclass(frozen=True)
@@ -31,12 +35,12 @@ class RTHSpec:
 
 
 def normalize_datetime_to_utc(df: pd.DataFrame) -> pd.DataFrame:
-    """Return a copy with a timezone-aware UTC 'datetime' column."""
+    """Return a new frame with a timezone-aware UTC 'datetime' column (df is left untouched)."""
     if "datetime" not in df.columns:
         raise ValueError("Missing required column: datetime")
 
-    out = df.copy()
-    out["datetime"] = pd.to_datetime(out["datetime"], errors="coerce")
+    # assign() copies only the rewritten column; the other columns are shared with df.
+    out = df.assign(datetime=pd.to_datetime(df["datetime"], errors="coerce"))
 
     if out["datetime"].isna().any():
         raise ValueError("Found NaT values in datetime column")
@@ -50,11 +54,42 @@ def normalize_datetime_to_utc(df: pd.DataFrame) -> pd.DataFrame:
     return out
 
 
+def _minute_of_day(hm: time) -> int:
+    return hm.hour * 60 + hm.minute
+
+
 def _rth_filter_et(dt_series_utc: pd.Series, rth: RTHSpec) -> pd.Series:
-    dt_et = dt_series_utc.dt.tz_convert(ET_TZ)
-    t = dt_et.dt.time
+    # ET wall clock (DST-aware) as int64 minutes since midnight: no per-row time objects.
+    local = dt_series_utc.dt.tz_convert(ET_TZ).dt.tz_localize(None).to_numpy()
+    minutes = local.astype("datetime64[m]").astype(np.int64) % 1440
     # End exclusive to yield exactly 390 expected minutes.
-    return (t >= rth.start_hm) & (t < rth.end_hm)
+    mask = (minutes >= _minute_of_day(rth.start_hm)) & (minutes < _minute_of_day(rth.end_hm))
+    return pd.Series(mask, index=dt_series_utc.index)
+
+
+def _expected_rth_minutes(days: pd.DatetimeIndex, rth: RTHSpec, unit: str = "ns") -> np.ndarray:
+    """UTC epoch (in `unit`) of every expected RTH minute, one row per day (shape: days x RTH minutes).
+
+    Built from the ET wall clock, so DST days get the right UTC offsets; the RTH
+    window never contains a DST switch (02:00 ET), hence no ambiguous local times.
+    """
+    start_min, end_min = _minute_of_day(rth.start_hm), _minute_of_day(rth.end_hm)
+    offsets = np.arange(start_min, end_min, dtype=np.int64) * 60_000_000_000
+    local = days.as_unit("ns").asi8[:, None] + offsets[None, :]
+    utc = pd.DatetimeIndex(local.ravel()).tz_localize(ET_TZ).as_unit(unit).asi8
+    return utc.reshape(local.shape)
+
+
+def _isin_bars(targets: np.ndarray, bars: pd.DatetimeIndex) -> np.ndarray:
+    """targets (epoch in bars.unit) present among the bar timestamps (duplicates allowed)."""
+    values = bars.asi8
+    if len(values) == 0:
+        return np.zeros(len(targets), dtype=bool)
+    if bars.is_monotonic_increasing:
+        # Usual case (files written in time order): binary search, no hashing or sort.
+        pos = np.minimum(np.searchsorted(values, targets), len(values) - 1)
+        return values[pos] == targets
+    return pd.Index(targets).isin(values)
 
 
 def compute_daily_missing_bars(
@@ -64,12 +99,15 @@ def compute_daily_missing_bars(
     *,
     max_missing_pct: float = 5.0,
     rth: RTHSpec = RTHSpec(),
+    row_has_nan: Optional[np.ndarray] = None,
 ) -> Tuple[List[Dict[str, Any]], List[str]]:
     """Compute per-day missing bars % during RTH.
 
     We iterate over the *calendar days* in [start, end) (end exclusive).
     Only weekdays are considered; weekends are skipped.
 
+    row_has_nan: per-row "any OHLCV NaN" flags, if the caller already computed them.
+
     Note: market holidays are not filtered out (no external calendar). They will
     typically appear as 100% missing if weekday.
     """
@@ -77,56 +115,89 @@ def compute_daily_missing_bars(
     if df_utc.empty:
         return [], []
 
-    df_utc = df_utc.copy()
-    df_utc["datetime"] = pd.to_datetime(df_utc["datetime"])
-
-    # Precompute RTH-only view in ET so date boundaries are correct.
-    dt_et = df_utc["datetime"].dt.tz_convert(ET_TZ)
-    df_utc["date_et"] = dt_et.dt.date
-    df_utc["is_rth"] = _rth_filter_et(df_utc["datetime"], rth)
-
-    daily_rows: List[Dict[str, Any]] = []
-    corrupted_days: List[str] = []
-
-    cur = start
-    while cur < end:
-        if cur.weekday() >= 5:  # weekend
-            cur = date.fromordinal(cur.toordinal() + 1)
-            continue
-
-        day_df = df_utc[(df_utc["date_et"] == cur) & (df_utc["is_rth"])].copy()
-        actual = int(day_df["datetime"].nunique())
-        expected = int(rth.expected_bars)
-        missing = max(0, expected - actual)
-        missing_pct = (missing / expected) * 100.0 if expected else 0.0
-
-        # OHLCV non-NaN on RTH
-        ohlcv_cols = [c for c in ["open", "high", "low", "close", "volume"] if c in day_df.columns]
-        non_nan_ok = True
-        if ohlcv_cols:
-            non_nan_ok = not day_df[ohlcv_cols].isna().any().any()
-
-        corrupted = (missing_pct > max_missing_pct) or (not non_nan_ok)
-        if corrupted:
-            corrupted_days.append(cur.isoformat())
-
-        daily_rows.append(
-            {
-                "date_et": cur.isoformat(),
-                "expected_bars": expected,
-                "actual_bars": actual,
-                "missing_bars": missing,
-                "missing_pct": round(missing_pct, 3),
-                "ohlcv_non_nan_rth": bool(non_nan_ok),
-                "corrupted": bool(corrupted),
-            }
+    # Local series only: the input frame is neither copied nor given extra columns.
+    # tz-aware columns (the run_quality_gates case) are used as they are; anything else
+    # (naive, strings) goes through the same normalization as normalize_datetime_to_utc.
+    dt = df_utc["datetime"]
+    if not isinstance(dt.dtype, pd.DatetimeTZDtype):
+        dt = normalize_datetime_to_utc(df_utc[["datetime"]])["datetime"]
+
+    # RTH-only timestamps keyed by ET calendar day (naive ET midnight) so date boundaries are correct.
+    is_rth = _rth_filter_et(dt, rth)
+    dt_rth = dt[is_rth]
+    date_key = dt_rth.dt.tz_convert(ET_TZ).dt.tz_localize(None).dt.normalize()
+
+    # Expected RTH minutes of the weekdays of [start, end) vs the distinct bar timestamps:
+    # one sorted membership pass, counted per day.
+    days = pd.bdate_range(start, end, inclusive="left")
+    bars = pd.DatetimeIndex(dt)
+    expected_ts = _expected_rth_minutes(days, rth, bars.unit)  # same unit as the bars: no column conversion
+    actual = _isin_bars(expected_ts.ravel(), bars).reshape(expected_ts.shape).sum(axis=1)
+
+    # OHLCV non-NaN on RTH
+    if row_has_nan is None:
+        row_has_nan = _row_has_nan(df_utc, [c for c in OHLCV_COLS if c in df_utc.columns])
+    if row_has_nan is not None:
+        day_has_nan = pd.Series(row_has_nan[is_rth.to_numpy()], index=dt_rth.index).groupby(date_key).any()
+        non_nan_ok = ~day_has_nan.reindex(days, fill_value=False).to_numpy(dtype=bool)
+    else:
+        non_nan_ok = np.ones(len(days), dtype=bool)
+
+    expected = int(rth.expected_bars)
+    missing = np.maximum(0, expected - actual)
+    missing_pct = (missing / expected) * 100.0 if expected else np.zeros(len(days))
+    corrupted = (missing_pct > max_missing_pct) | ~non_nan_ok
+
+    daily_rows: List[Dict[str, Any]] = [
+        {
+            "date_et": day.isoformat(),
+            "expected_bars": expected,
+            "actual_bars": n_actual,
+            "missing_bars": n_missing,
+            "missing_pct": round(pct, 3),
+            "ohlcv_non_nan_rth": ok,
+            "corrupted": bad,
+        }
+        for day, n_actual, n_missing, pct, ok, bad in zip(
+            days.date, actual.tolist(), missing.tolist(), missing_pct.tolist(), non_nan_ok.tolist(), corrupted.tolist()
         )
-
-        cur = date.fromordinal(cur.toordinal() + 1)
+    ]
+    corrupted_days = [row["date_et"] for row in daily_rows if row["corrupted"]]
 
     return daily_rows, corrupted_days
 
 
+def _row_has_nan(df: pd.DataFrame, cols: List[str]) -> Optional[np.ndarray]:
+    """One columnar sweep: True where any of cols is NaN (None if no such column)."""
+    if not cols:
+        return None
+    return df[cols].isna().to_numpy().any(axis=1)
+
+
+def _timezone_values(dt_series: pd.Series) -> List[str]:
+    """Distinct timezones of a datetime column ("naive" if none).
+
+    A datetime64 column carries one tz for all rows (read from the dtype); only an
+    object column (mixed tz / raw Python datetimes) needs a per-row look.
+    """
+    if isinstance(dt_series.dtype, pd.DatetimeTZDtype):
+        return [str(dt_series.dt.tz)]
+    if pd.api.types.is_datetime64_dtype(dt_series):
+        return ["naive"]
+    # Distinct tzinfo objects first (rows parsed together share one instance), then stringify only those.
+    tzinfos = dict.fromkeys(getattr(x, "tzinfo", None) for x in dt_series.to_numpy())
+    return list(dict.fromkeys(str(tz) if tz else "naive" for tz in tzinfos))
+
+
+def _duplicate_count(dt_series: pd.Series) -> int:
+    """Number of rows repeating an earlier timestamp (same as duplicated().sum())."""
+    if pd.api.types.is_datetime64_any_dtype(dt_series) and dt_series.is_monotonic_increasing:
+        # Sorted: duplicates are equal neighbours, one pass over the int64 buffer, no hashing.
+        values = pd.DatetimeIndex(dt_series).asi8
+        return int(np.count_nonzero(values[1:] == values[:-1]))
+    return int(dt_series.duplicated().sum())
+
+
 def run_quality_gates(
     df: pd.DataFrame,
     *,
@@ -157,24 +228,25 @@ def run_quality_gates(
         return report
 
     # Gate (1): tz unique (UTC)
-    tz_values = df["datetime"].apply(lambda x: str(x.tzinfo) if getattr(x, "tzinfo", None) else "naive").unique()
+    tz_values = _timezone_values(df["datetime"])
     tz_gate = (len(tz_values) == 1) and ("UTC" in str(tz_values[0]))
     report["gates"]["timezone_utc"] = {"passed": bool(tz_gate), "values": [str(v) for v in tz_values]}
 
     # Gate (2): 0 duplicates
-    dup_count = int(df["datetime"].duplicated().sum())
+    dup_count = _duplicate_count(df["datetime"])
     report["gates"]["no_duplicate_timestamps"] = {"passed": dup_count == 0, "duplicates": dup_count}
 
     # Gate (3): OHLCV non-NaN sur RTH
-    required_cols = ["open", "high", "low", "close", "volume"]
+    required_cols = list(OHLCV_COLS)
     missing_cols = [c for c in required_cols if c not in df.columns]
+    row_has_nan = None
     if missing_cols:
         report["gates"]["required_ohlcv_columns"] = {"passed": False, "missing": missing_cols}
     else:
-        # Check non-NaN on RTH only
-        rth_mask = _rth_filter_et(df["datetime"], RTHSpec())
-        rth_df = df.loc[rth_mask, required_cols]
-        any_nan_rth = bool(rth_df.isna().any().any()) if not rth_df.empty else True
+        # Check non-NaN on RTH only; the per-row flags are reused by gate (4).
+        row_has_nan = _row_has_nan(df, required_cols)
+        rth_mask = _rth_filter_et(df["datetime"], RTHSpec()).to_numpy()
+        any_nan_rth = bool(row_has_nan[rth_mask].any()) if rth_mask.any() else True
         report["gates"]["ohlcv_non_nan_rth"] = {"passed": not any_nan_rth, "nan_in_rth": any_nan_rth}
 
     # Gate (4): missing bars report + corrupted tagging
@@ -183,6 +255,7 @@ def run_quality_gates(
         start=start,
         end=end,
         max_missing_pct=max_missing_pct,
+        row_has_nan=row_has_nan,
     )
     report["daily_missing"] = daily_missing
     report["corrupted_days"] = corrupted_days
@@ -3,76 +3,69 @@
 import sys
 import time
 from pathlib import Path
-from datetime import datetime
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
+import numpy as np
+
+backend_dir = Path(__file__).resolve().parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
 
 from backtest.engine import BacktestEngine
-from models.backtest import BacktestConfig
+from scripts._bench_common import make_engine
 
-# Monkey patch pour timer les fonctions clés
-original_process_bar = BacktestEngine._process_bar
-original_build_market_state = None
-original_detect_patterns = None
+# Monkey patch pour timer les fonctions clés.
+# La boucle du moteur appelle _process_bar_optimized (_process_bar n'est plus utilisé).
+original_process_bar = BacktestEngine._process_bar_optimized
 
-timings = {
-    'process_bar': [],
-    'market_state': [],
-    'ict_patterns': [],
-    'candle_patterns': [],
-    'liquidity': [],
-    'setup_generation': [],
-    'risk_filtering': []
-}
+# Durée de chaque appel en ns (entiers, pas de float alloué par appel)
+MAX_CALLS = 1_000_000
+timings_pb = np.empty(MAX_CALLS, dtype=np.int64)
+n_calls = [0]
 
-def timed_process_bar(self, symbol, current_time):
-    t0 = time.time()
-    result = original_process_bar(self, symbol, current_time)
-    timings['process_bar'].append(time.time() - t0)
+def timed_process_bar(self, *args, **kwargs):
+    t0 = time.perf_counter_ns()
+    result = original_process_bar(self, *args, **kwargs)
+    timings_pb[n_calls[0]] = time.perf_counter_ns() - t0
+    n_calls[0] += 1
     return result
 
-BacktestEngine._process_bar = timed_process_bar
+BacktestEngine._process_bar_optimized = timed_process_bar
 
-# Test ultra-court : 10 minutes seulement
-config = BacktestConfig(
-    run_name='timing_test',
-    start_date=datetime(2024, 6, 12, 9, 30, 0),
-    end_date=datetime(2024, 6, 12, 9, 40, 0),
-    symbols=['SPY'],
-    data_paths=['/app/data/historical/1m/SPY.parquet'],
-    initial_capital=10000.0,
-    trading_mode='AGGRESSIVE',
-    trade_types=['DAILY', 'SCALP']
-)
+# Test court : 1 journée (dates en str, fin de journée incluse)
+engine = make_engine({'run_name': 'timing_test', 'start_date': '2024-06-12', 'end_date': '2024-06-12'}, load=False)
 
 print("Loading data...")
 t0 = time.time()
-engine = BacktestEngine(config)
 engine.load_data()
 t_load = time.time() - t0
+n_minutes = len(engine.sorted_minutes())
 
 print(f"Data loaded in {t_load:.2f}s")
-print("Running backtest (10 minutes)...")
+print(f"Running backtest (1 day, {n_minutes} minutes)...")
 
 t0 = time.time()
 result = engine.run()
 t_run = time.time() - t0
 
 print(f"\n{'='*80}")
-print(f"TIMING ANALYSIS (10 minutes of data)")
+print(f"TIMING ANALYSIS (1 day, {n_minutes} minutes of data)")
 print(f"{'='*80}")
 print(f"Data Load: {t_load:.2f}s")
 print(f"Total Run: {t_run:.2f}s")
-print(f"Speed: {t_run / 10:.2f}s per minute")
+print(f"Speed: {t_run / max(n_minutes, 1):.3f}s per minute")
 print(f"\nTrades: {result.total_trades}")
-print(f"Total R: {result.total_r:.2f}R")
+print(f"Total R: {result.total_pnl_r:.2f}R")
 
-if timings['process_bar']:
-    avg_process_bar = sum(timings['process_bar']) / len(timings['process_bar'])
-    total_process_bar = sum(timings['process_bar'])
-    print(f"\n_process_bar calls: {len(timings['process_bar'])}")
+pb_ns = timings_pb[:n_calls[0]]
+if pb_ns.size:
+    pb_ms = pb_ns / 1e6
+    avg_process_bar = pb_ms.mean() / 1000
+    total_process_bar = pb_ns.sum() / 1e9
+    p50, p95, p99 = np.percentile(pb_ms, [50, 95, 99])
+    print(f"\n_process_bar_optimized calls: {pb_ns.size}")
     print(f"  Total time: {total_process_bar:.2f}s ({total_process_bar/t_run*100:.1f}% of run)")
     print(f"  Avg per call: {avg_process_bar*1000:.1f}ms")
+    print(f"  P50 / P95 / P99: {p50:.1f}ms / {p95:.1f}ms / {p99:.1f}ms")
     print(f"  Estimated 1 day (390 bars): {avg_process_bar * 390:.1f}s = {avg_process_bar * 390 / 60:.1f}min")
 
 print(f"\n{'='*80}")
@@ -14,12 +14,17 @@ import time
 from pathlib import Path
 from datetime import datetime, timedelta
 import argparse
+from typing import Any, Dict, List
+
+import pandas as pd
 
 # Add backend to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+backend_dir = Path(__file__).resolve().parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
 
 from backtest.engine import BacktestEngine
-from models.backtest import BacktestConfig
+from models.backtest import BacktestConfig, TradeResult
 
 logging.basicConfig(
     level=logging.INFO,
@@ -27,6 +32,57 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+SPAM_MIN_GAP_MINUTES = 15.0
+
+
+def trades_frame(trades: List[TradeResult]) -> pd.DataFrame:
+    """Une ligne par trade, colonnes utiles au rapport (construit une seule fois)."""
+    return pd.DataFrame(
+        {
+            'symbol': [t.symbol for t in trades],
+            'playbook_name': [t.playbook or "UNKNOWN" for t in trades],
+            'entry_time': pd.to_datetime([t.timestamp_entry for t in trades]),
+            'pnl_r': [t.pnl_r for t in trades],
+        }
+    )
+
+
+def group_stats(trades_df: pd.DataFrame, key: str) -> Dict[str, Dict[str, Any]]:
+    """{valeur de key: {'count', 'r', 'wins'}} en un groupby."""
+    if trades_df.empty:
+        return {}
+    agg = (
+        trades_df.assign(win=trades_df['pnl_r'] > 0)
+        .groupby(key, sort=False)
+        .agg(count=('pnl_r', 'size'), r=('pnl_r', 'sum'), wins=('win', 'sum'))
+    )
+    return {
+        name: {'count': int(count), 'r': float(r), 'wins': int(wins)}
+        for name, count, r, wins in zip(agg.index, agg['count'], agg['r'], agg['wins'])
+    }
+
+
+def detect_spam(trades_df: pd.DataFrame, min_gap_minutes: float = SPAM_MIN_GAP_MINUTES) -> List[Dict[str, Any]]:
+    """Trades d'un même (symbol, playbook) entrés moins de min_gap_minutes après le précédent.
+
+    Un tri + un diff par groupe, sans boucle Python par trade.
+    """
+    if trades_df.empty:
+        return []
+    keys = ['symbol', 'playbook_name']
+    ordered = trades_df.sort_values([*keys, 'entry_time'], kind='stable')
+    prev_entry = ordered.groupby(keys, sort=False)['entry_time'].shift()
+    gap_minutes = (ordered['entry_time'] - prev_entry).dt.total_seconds() / 60.0
+
+    spam = pd.DataFrame({
+        'symbol': ordered['symbol'],
+        'playbook': ordered['playbook_name'],
+        'time_diff_minutes': gap_minutes,
+        'prev_entry': prev_entry,
+        'curr_entry': ordered['entry_time'],
+    })[gap_minutes < min_gap_minutes]
+    return spam.to_dict('records')
+
 
 def run_sanity_check(duration: str = "5d"):
     """
@@ -105,17 +161,12 @@ def run_sanity_check(duration: str = "5d"):
     logger.info(f"   Expectancy (R/trade): {result.expectancy_r:.2f}R")
     logger.info(f"   Max Drawdown: {result.max_drawdown_r:.2f}R")
     
+    # Trades matérialisés une fois ; les sections 2 à 4 lisent ce même DataFrame
+    trades_df = trades_frame(result.trades)
+    
     # 2. Trades par playbook
     logger.info("\n📝 TRADES BY PLAYBOOK")
-    playbook_stats = {}
-    for trade in result.trades:
-        pb_name = trade.playbook_name or "UNKNOWN"
-        if pb_name not in playbook_stats:
-            playbook_stats[pb_name] = {'count': 0, 'r': 0.0, 'wins': 0}
-        playbook_stats[pb_name]['count'] += 1
-        playbook_stats[pb_name]['r'] += trade.pnl_r
-        if trade.pnl_r > 0:
-            playbook_stats[pb_name]['wins'] += 1
+    playbook_stats = group_stats(trades_df, 'playbook_name')
     
     # Sort by R descending
     sorted_playbooks = sorted(playbook_stats.items(), key=lambda x: x[1]['r'], reverse=True)
@@ -126,13 +177,7 @@ def run_sanity_check(duration: str = "5d"):
     
     # 3. Trades par symbole
     logger.info("\n📈 TRADES BY SYMBOL")
-    symbol_stats = {}
-    for trade in result.trades:
-        sym = trade.symbol
-        if sym not in symbol_stats:
-            symbol_stats[sym] = {'count': 0, 'r': 0.0}
-        symbol_stats[sym]['count'] += 1
-        symbol_stats[sym]['r'] += trade.pnl_r
+    symbol_stats = group_stats(trades_df, 'symbol')
     
     for sym, stats in symbol_stats.items():
         logger.info(f"   {sym}: {stats['count']} trades, {stats['r']:+.2f}R")
@@ -155,29 +200,7 @@ def run_sanity_check(duration: str = "5d"):
             logger.info(f"      {pb}: {count}")
     
     # Vérifier doublons résiduels (ne devrait pas exister si anti-spam fonctionne)
-    trades_by_pb_sym = {}
-    spam_detected = []
-    
-    for trade in result.trades:
-        key = (trade.symbol, trade.playbook_name)
-        if key not in trades_by_pb_sym:
-            trades_by_pb_sym[key] = []
-        trades_by_pb_sym[key].append(trade)
-    
-    for (sym, pb), trades in trades_by_pb_sym.items():
-        trades_sorted = sorted(trades, key=lambda t: t.entry_time)
-        for i in range(1, len(trades_sorted)):
-            prev_trade = trades_sorted[i-1]
-            curr_trade = trades_sorted[i]
-            time_diff = (curr_trade.entry_time - prev_trade.entry_time).total_seconds() / 60.0
-            if time_diff < 15:
-                spam_detected.append({
-                    'symbol': sym,
-                    'playbook': pb,
-                    'time_diff_minutes': time_diff,
-                    'prev_entry': prev_trade.entry_time,
-                    'curr_entry': curr_trade.entry_time
-                })
+    spam_detected = detect_spam(trades_df)
     
     if spam_detected:
         logger.warning(f"   ⚠️ {len(spam_detected)} residual spam trade(s) detected (< 15min cooldown):")
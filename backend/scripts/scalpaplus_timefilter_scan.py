@@ -12,58 +12,73 @@ Outputs:
 
 from __future__ import annotations
 
-from datetime import time
+from typing import Optional
 
+import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
 from zoneinfo import ZoneInfo
 
-from utils.timeframes import get_session_info
+from utils.timeframes import SESSION_NAMES, session_codes
 
 NY = ZoneInfo("America/New_York")
+SPY_PATH = "/app/data/historical/1m/SPY.parquet"
 
+# 09:30-10:00 ET (both ends inclusive), as ns since ET midnight
+START_ET_NS = (9 * 3600 + 30 * 60) * 1_000_000_000
+END_ET_NS = 10 * 3600 * 1_000_000_000
+NY_CODE = SESSION_NAMES.index("ny")
 
-def main() -> None:
+
+def read_timeline(
+    path: str, start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None
+) -> pd.DatetimeIndex:
+    """Timestamp column only (the pandas index stored in the parquet), optionally [start, end).
+
+    The bounds are pushed down to pyarrow, so row groups outside the range are skipped
+    through their min/max statistics.
+    """
+    schema = pq.read_schema(path)
+    index_cols = [c for c in (schema.pandas_metadata or {}).get("index_columns", []) if isinstance(c, str)]
+    ts_col = index_cols[0] if index_cols else "datetime"
+
+    filters = []
+    if start is not None:
+        filters.append((ts_col, ">=", pd.Timestamp(start)))
+    if end is not None:
+        filters.append((ts_col, "<", pd.Timestamp(end)))
+    table = pq.read_table(path, columns=[ts_col], filters=filters or None)
+    return pd.DatetimeIndex(table.column(ts_col).to_pandas())
+
+
+def main(start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None) -> None:
     # Use SPY as timeline reference (1m index in UTC)
-    df = pd.read_parquet("/app/data/historical/1m/SPY.parquet", columns=["open"])
-    idx = pd.to_datetime(df.index)
+    idx = read_timeline(SPY_PATH, start, end)
+    if idx.tz is None:
+        idx = idx.tz_localize("UTC")
+
+    # Whole index at once: session codes (vectorized get_session_info) + ET wall clock.
+    idx_et = idx.tz_convert(NY)
+    tod_ns = idx_et.as_unit("ns").asi8 - idx_et.normalize().as_unit("ns").asi8
+
+    pass_session = session_codes(idx) == NY_CODE
+    pass_time_range = (tod_ns >= START_ET_NS) & (tod_ns <= END_ET_NS)
+    pass_both = pass_session & pass_time_range
 
     n_total = len(idx)
-    n_pass_session = 0
-    n_pass_time_range = 0
-    n_pass_both = 0
-
-    start_et = time(9, 30)
-    end_et = time(10, 0)
-
-    samples = []
-
-    for ts in idx:
-        ts_utc = ts.to_pydatetime()
-        sess = get_session_info(ts_utc)
-        session_norm = str(sess.get("name", "")).upper()
-
-        ts_et = ts.to_pydatetime().astimezone(NY)
-        cur_t = ts_et.timetz().replace(tzinfo=None)
-
-        pass_session = session_norm == "NY"
-        pass_time_range = (start_et <= cur_t <= end_et)
-        pass_both = pass_session and pass_time_range
-
-        if pass_session:
-            n_pass_session += 1
-        if pass_time_range:
-            n_pass_time_range += 1
-        if pass_both:
-            n_pass_both += 1
-            if len(samples) < 10:
-                samples.append(
-                    {
-                        "ts_utc": ts.isoformat(),
-                        "ts_et": ts_et.isoformat(),
-                        "session_norm": session_norm,
-                        "within_0930_1000": True,
-                    }
-                )
+    n_pass_session = int(np.count_nonzero(pass_session))
+    n_pass_time_range = int(np.count_nonzero(pass_time_range))
+    n_pass_both = int(np.count_nonzero(pass_both))
+
+    samples = [
+        {
+            "ts_utc": idx[i].isoformat(),
+            "ts_et": idx_et[i].isoformat(),
+            "session_norm": "NY",
+            "within_0930_1000": True,
+        }
+        for i in np.flatnonzero(pass_both)[:10]
+    ]
 
     out = {
         "N_total_bars_checked": n_total,
@@ -9,11 +9,14 @@ import sys
 import time
 import json
 import pandas as pd
+import pyarrow.parquet as pq
 from pathlib import Path
 from datetime import datetime
 import logging
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
+backend_dir = Path(__file__).resolve().parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
 
 # Logging minimal (erreurs uniquement pour perf)
 logging.basicConfig(level=logging.ERROR)
@@ -30,29 +33,30 @@ print("="*80)
 # ============================================================================
 print("\n[PREP] Extracting 3-day dataset...")
 source_path = Path('/app/data/historical/1m/SPY.parquet')
-df = pd.read_parquet(source_path)
-
-# Reset index to get datetime column
-if 'datetime' not in df.columns:
-    df = df.reset_index()
-
-df['datetime'] = pd.to_datetime(df['datetime'], utc=True)
-df = df.sort_values('datetime').reset_index(drop=True)
 
 # Extraire 3 jours (juin 2025, 2-4)
 start_date = pd.Timestamp('2025-06-02 08:00:00', tz='UTC')
 end_date = pd.Timestamp('2025-06-04 20:00:00', tz='UTC')
 
-df_3days = df[(df['datetime'] >= start_date) & (df['datetime'] <= end_date)].copy()
+# Lecture filtrée par pyarrow (row groups hors fenêtre ignorés via leurs stats min/max) :
+# seuls les 3 jours sont décodés, au lieu du parquet complet filtré en pandas.
+dt_type = pq.read_schema(source_path).field('datetime').type
+lo, hi = (start_date, end_date) if dt_type.tz else (start_date.tz_localize(None), end_date.tz_localize(None))
+df_3days = pq.read_table(
+    source_path, filters=[('datetime', '>=', lo), ('datetime', '<=', hi)]
+).to_pandas()
+
+# Reset index to get datetime column
+if 'datetime' not in df_3days.columns:
+    df_3days = df_3days.reset_index()
+
+df_3days['datetime'] = pd.to_datetime(df_3days['datetime'], utc=True)
+df_3days = df_3days.sort_values('datetime').reset_index(drop=True)
 
 if len(df_3days) == 0:
     print(f"❌ No data found in range {start_date} to {end_date}")
     sys.exit(1)
 
-# Sauvegarder temporairement
-temp_path = Path('/tmp/spy_3days_task2.parquet')
-df_3days.to_parquet(temp_path, index=False)
-
 print(f"✅ Dataset prepared: {len(df_3days)} bars")
 print(f"   Period: {df_3days['datetime'].min()} → {df_3days['datetime'].max()}")
 print(f"   Duration: {(df_3days['datetime'].max() - df_3days['datetime'].min()).total_seconds() / 3600:.1f} hours")
@@ -61,7 +65,7 @@ print(f"   Duration: {(df_3days['datetime'].max() - df_3days['datetime'].min()).
 config = BacktestConfig(
     run_name='task2_perf_validation',
     symbols=['SPY'],
-    data_paths=[str(temp_path)],
+    data_paths=[str(source_path)],
     initial_capital=100000.0,
     trading_mode='AGGRESSIVE',
     trade_types=['DAILY', 'SCALP'],
@@ -78,7 +82,8 @@ print("\n" + "="*80)
 print("\n[PHASE 1] Initialisation + Load data...")
 t_init_start = time.time()
 
-engine = BacktestEngine(config)
+# Fenêtre déjà en mémoire : passée au moteur sans fichier temporaire
+engine = BacktestEngine(config, preloaded_data={str(source_path): df_3days})
 engine.load_data()
 
 t_init = time.time() - t_init_start
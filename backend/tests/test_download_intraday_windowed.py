@@ -0,0 +1,266 @@
+import json
+import time
+from datetime import date
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+import scripts.download_intraday_windowed as dl
+
+
+def _fake_yfinance(symbol, start, end):
+    """Full RTH sessions (UTC, EDT) for each weekday in [start, end)."""
+    days = pd.bdate_range(start, end, inclusive="left")
+    if len(days) == 0:
+        return pd.DataFrame()
+    frames = [
+        pd.DataFrame(
+            {
+                "datetime": pd.date_range(d + pd.Timedelta("13h30min"), periods=390, freq="min", tz="UTC"),
+                "open": 1.0,
+                "high": 1.5,
+                "low": 0.5,
+                "close": 1.2,
+                "volume": 100,
+            }
+        )
+        for d in days
+    ]
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_run_writes_sorted_utc_parquet_in_window_order(tmp_path, monkeypatch):
+    monkeypatch.setattr(dl, "_download_window_once_yfinance", _fake_yfinance)
+
+    cfg = dl.DownloadConfig(
+        symbol="SPY",
+        start=date(2025, 6, 2),
+        end=date(2025, 6, 16),
+        window_days=7,
+        out=tmp_path / "SPY.parquet",
+        request_delay_seconds=0.0,
+        max_concurrency=4,
+    )
+    result = dl.run(cfg)
+    assert result["passed"] is True
+
+    df = pd.read_parquet(cfg.out)
+    assert isinstance(df.index, pd.DatetimeIndex)
+    assert str(df.index.tz) == "UTC"
+    assert df.index.is_monotonic_increasing
+    assert not df.index.has_duplicates
+    assert list(df.columns) == ["open", "high", "low", "close", "volume"]
+    assert df["close"].dtype == "float32"
+    assert df["volume"].dtype == "int32"
+    assert len(df) == 10 * 390
+
+    quality = json.loads((tmp_path / "data_quality_SPY.json").read_text())
+    starts = [w["start"] for w in quality["windows"]]
+    assert starts == sorted(starts)
+    assert quality["duplicates_removed"] == 0
+
+
+def test_run_reuses_cached_windows_without_network(tmp_path, monkeypatch):
+    calls = []
+
+    def _counting_yfinance(symbol, start, end):
+        calls.append((start, end))
+        return _fake_yfinance(symbol, start, end)
+
+    monkeypatch.setattr(dl, "_download_window_once_yfinance", _counting_yfinance)
+
+    cfg = dl.DownloadConfig(
+        symbol="SPY",
+        start=date(2025, 6, 2),
+        end=date(2025, 6, 16),
+        window_days=7,
+        out=tmp_path / "SPY.parquet",
+        request_delay_seconds=0.0,
+        cache_dir=tmp_path / "cache",
+    )
+    dl.run(cfg)
+    assert len(calls) == 2
+    first = pd.read_parquet(cfg.out)
+
+    dl.run(cfg)
+    assert len(calls) == 2
+    pd.testing.assert_frame_equal(pd.read_parquet(cfg.out), first)
+
+    quality = json.loads((tmp_path / "data_quality_SPY.json").read_text())
+    assert all(w["cached"] for w in quality["windows"])
+
+
+def test_corrupt_cache_entry_is_dropped_and_window_refetched(tmp_path, monkeypatch):
+    calls = []
+
+    def _counting_yfinance(symbol, start, end):
+        calls.append((start, end))
+        return _fake_yfinance(symbol, start, end)
+
+    monkeypatch.setattr(dl, "_download_window_once_yfinance", _counting_yfinance)
+
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    cfg = dl.DownloadConfig(
+        symbol="SPY",
+        start=date(2025, 6, 2),
+        end=date(2025, 6, 9),
+        window_days=7,
+        out=tmp_path / "SPY.parquet",
+        request_delay_seconds=0.0,
+        cache_dir=cache_dir,
+    )
+    path = dl.window_cache_path(cache_dir, "yfinance", "SPY", date(2025, 6, 2), date(2025, 6, 9))
+    path.write_bytes(b"not a parquet file")
+
+    df, meta = dl._fetch_window(cfg, None, None, date(2025, 6, 2), date(2025, 6, 9))
+
+    assert calls == [(date(2025, 6, 2), date(2025, 6, 9))]
+    assert len(df) == 5 * 390 and not meta.get("cached")
+    pd.testing.assert_frame_equal(pd.read_parquet(path), df)  # replaced by the fresh download
+
+
+def test_open_window_is_neither_cached_nor_read_from_cache(tmp_path, monkeypatch):
+    from datetime import timedelta
+
+    calls = []
+
+    def _counting_yfinance(symbol, start, end):
+        calls.append((start, end))
+        return _fake_yfinance(symbol, date(2025, 6, 2), date(2025, 6, 3))
+
+    monkeypatch.setattr(dl, "_download_window_once_yfinance", _counting_yfinance)
+
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    cfg = dl.DownloadConfig(
+        symbol="SPY",
+        start=date(2025, 6, 2),
+        end=date(2025, 6, 16),
+        window_days=7,
+        out=tmp_path / "SPY.parquet",
+        request_delay_seconds=0.0,
+        cache_dir=cache_dir,
+    )
+    today = date.today()
+    w_start, w_end = today - timedelta(days=3), today + timedelta(days=1)
+    # Stale entry written before the day was complete: must not be served.
+    _fake_yfinance("SPY", date(2025, 6, 2), date(2025, 6, 3)).iloc[:10].to_parquet(
+        dl.window_cache_path(cache_dir, "yfinance", "SPY", w_start, w_end), index=False
+    )
+
+    df, meta = dl._fetch_window(cfg, None, None, w_start, w_end)
+    assert len(calls) == 1 and len(df) == 390 and not meta.get("cached")
+
+    dl._fetch_window(cfg, None, None, w_start, today)  # ends today: still open
+    assert len(calls) == 2
+    assert not dl.window_cache_path(cache_dir, "yfinance", "SPY", w_start, today).exists()
+
+    dl._fetch_window(cfg, None, None, w_start, today - timedelta(days=1))
+    assert dl.window_cache_path(cache_dir, "yfinance", "SPY", w_start, today - timedelta(days=1)).exists()
+
+
+def test_polygon_http_errors_are_not_retried_on_top_of_the_adapter(monkeypatch):
+    calls = []
+    sleeps = []
+
+    def _rate_limited(**kwargs):
+        calls.append(kwargs["start"])
+        raise RuntimeError("polygon_rate_limited_429")
+
+    monkeypatch.setattr(dl, "_download_window_once_polygon", _rate_limited)
+    monkeypatch.setattr(dl.time, "sleep", sleeps.append)
+    kwargs = dict(
+        session=object(), symbol="SPY", start=date(2025, 6, 2), end=date(2025, 6, 9),
+        retries=4, backoff_seconds=2.0, polygon_per_page_delay_seconds=0.0,
+    )
+
+    df, meta = dl.download_window_with_retries(provider="polygon", **kwargs)
+    assert df is None and meta["attempts"] == 1 and "429" in meta["error"]
+    assert len(calls) == 1 and sleeps == []
+
+    def _flaky_yfinance(symbol, start, end):
+        calls.append(start)
+        raise ConnectionError("reset")
+
+    monkeypatch.setattr(dl, "_download_window_once_yfinance", _flaky_yfinance)
+    df, meta = dl.download_window_with_retries(provider="yfinance", **kwargs)
+    assert meta["attempts"] == 4 and len(calls) == 5
+    assert sleeps == [2.0, 4.0, 8.0]
+
+
+def test_session_waits_rate_limit_floor_after_429_without_retry_after(tmp_path, monkeypatch):
+    import urllib3.util.retry as urllib3_retry
+    from urllib3 import HTTPResponse
+
+    sleeps = []
+    monkeypatch.setattr(urllib3_retry.time, "sleep", sleeps.append)
+    cfg = dl.DownloadConfig(
+        symbol="SPY", start=date(2025, 6, 2), end=date(2025, 6, 9), window_days=7,
+        out=tmp_path / "SPY.parquet", provider="polygon",
+        retries=4, backoff_seconds=2.0, polygon_rate_limit_sleep_seconds=60.0,
+    )
+    retry = dl.build_http_session(cfg).get_adapter("https://api.polygon.io").max_retries
+
+    for status in (429, 429, 503):
+        response = HTTPResponse(status=status, headers={})
+        retry = retry.increment(method="GET", url="/v2/aggs", response=response)
+        retry.sleep(response)
+
+    # 429s: at least the floor; 5xx: plain exponential backoff (backoff_factor * 2**(n-1)).
+    assert sleeps == [60.0, 60.0, 8.0]
+    assert retry.rate_limit_sleep == 60.0
+
+
+def test_build_windows_covers_range_with_partial_last_window():
+    assert dl.build_windows(date(2025, 6, 1), date(2025, 6, 17), 7) == [
+        (date(2025, 6, 1), date(2025, 6, 8)),
+        (date(2025, 6, 8), date(2025, 6, 15)),
+        (date(2025, 6, 15), date(2025, 6, 17)),
+    ]
+    assert dl.build_windows(date(2025, 6, 1), date(2025, 6, 1), 7) == []
+
+
+def test_token_bucket_allows_burst_then_waits_for_refill(monkeypatch):
+    clock = {"now": 100.0}
+    sleeps = []
+
+    def fake_sleep(seconds):
+        sleeps.append(seconds)
+        clock["now"] += seconds
+
+    monkeypatch.setattr(dl.time, "monotonic", lambda: clock["now"])
+    monkeypatch.setattr(dl.time, "sleep", fake_sleep)
+
+    bucket = dl.TokenBucket(rate=0.5, capacity=2)
+    for _ in range(3):
+        bucket.acquire()
+
+    assert len(sleeps) == 1
+    assert abs(sleeps[0] - 2.0) < 1e-9
+
+
+def _acquire_shared_token(_):
+    dl._SHARED_BUCKET.acquire()
+    return time.monotonic()
+
+
+def test_shared_token_bucket_spans_worker_processes():
+    from concurrent.futures import ProcessPoolExecutor
+
+    bucket = dl.TokenBucket.shared(rate=4.0, capacity=1)
+    with ProcessPoolExecutor(max_workers=3, initializer=dl._init_worker, initargs=(bucket,)) as executor:
+        granted = sorted(executor.map(_acquire_shared_token, range(3)))
+
+    # One budget for all processes: 1 burst token, then one every 0.25s.
+    assert granted[-1] - granted[0] >= 0.45
+
+
+def test_storage_schema_check_rejects_float64_prices():
+    idx = pd.date_range("2025-06-02 13:30", periods=3, freq="min", tz="UTC", name="datetime").as_unit("ns")
+    df = pd.DataFrame({"open": 1.0, "high": 1.5, "low": 0.5, "close": 1.2, "volume": 100}, index=idx)
+
+    dl._check_storage_schema(pa.Table.from_pandas(dl._downcast_ohlcv(df), preserve_index=True))
+    with pytest.raises(RuntimeError, match="schema mismatch"):
+        dl._check_storage_schema(pa.Table.from_pandas(df, preserve_index=True))
@@ -0,0 +1,35 @@
+"""BacktestEngine.load_data : lecture parquet limitée à la fenêtre du run (pushdown sur 'datetime')."""
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from backtest.engine import BacktestEngine
+from models.backtest import BacktestConfig
+
+
+def test_read_only_materializes_run_window_plus_warmup(tmp_path):
+    idx = pd.date_range("2025-05-01", periods=60 * 1440, freq="min", tz="UTC", name="datetime")
+    df = pd.DataFrame({"open": 1.0, "high": 1.5, "low": 0.5, "close": 1.2, "volume": 100}, index=idx)
+    path = tmp_path / "SPY.parquet"
+    pq.write_table(pa.Table.from_pandas(df), path, row_group_size=390 * 5)
+
+    config = BacktestConfig(
+        run_name="pushdown",
+        symbols=["SPY"],
+        data_paths=[str(path)],
+        trading_mode="AGGRESSIVE",
+        start_date="2025-06-04",
+        end_date="2025-06-05",
+        htf_warmup_days=2,
+    )
+    engine = BacktestEngine(config)
+
+    raw = engine._read_data_file(Path(path))
+    assert len(raw) == 4 * 1440  # 2025-06-02 → 2025-06-06 (exclusive)
+
+    engine.load_data()
+    assert len(engine.combined_data) == 2 * 1440
+    assert engine.combined_data["datetime"].min() == pd.Timestamp("2025-06-04", tz="UTC")
+    assert len(engine.htf_warmup_data["SPY"]) == 2 * 1440
@@ -0,0 +1,109 @@
+"""BacktestEngine(preloaded_data=...) : données déjà décodées, sans relire le parquet."""
+import pandas as pd
+
+from backtest.engine import BacktestEngine
+from models.backtest import BacktestConfig
+
+
+def _minute_frame(start: str, periods: int) -> pd.DataFrame:
+    idx = pd.date_range(start, periods=periods, freq="min", tz="UTC", name="datetime")
+    return pd.DataFrame(
+        {"open": 1.0, "high": 1.5, "low": 0.5, "close": 1.2, "volume": 100},
+        index=idx,
+    )
+
+
+def test_load_data_uses_preloaded_frame_without_file(tmp_path):
+    path = str(tmp_path / "SPY.parquet")  # never written
+    df = _minute_frame("2025-06-02", 3 * 1440)
+    config = BacktestConfig(
+        run_name="preloaded",
+        symbols=["SPY"],
+        data_paths=[path],
+        trading_mode="AGGRESSIVE",
+        start_date="2025-06-04",
+        end_date="2025-06-04",
+        htf_warmup_days=1,
+    )
+
+    engine = BacktestEngine(config, preloaded_data={path: df})
+    engine.load_data()
+
+    assert len(engine.combined_data) == 1440
+    assert len(engine.htf_warmup_data["SPY"]) == 1440
+    arrays = engine.candle_arrays["SPY"]
+    assert len(arrays["ts"]) == 1440
+    assert arrays["ts"][0] == pd.Timestamp("2025-06-04", tz="UTC").value
+    assert (arrays["close"] == 1.2).all()
+    # The caller's frame is reused across runs: it must not be mutated.
+    assert list(df.columns) == ["open", "high", "low", "close", "volume"]
+    assert isinstance(df.index, pd.DatetimeIndex)
+
+
+def test_reset_keeps_loaded_data_only_for_same_period(tmp_path):
+    path = str(tmp_path / "SPY.parquet")  # never written
+    df = _minute_frame("2025-06-02", 3 * 1440)
+    config = BacktestConfig(
+        run_name="reset",
+        symbols=["SPY"],
+        data_paths=[path],
+        trading_mode="AGGRESSIVE",
+        start_date="2025-06-04",
+        end_date="2025-06-04",
+        htf_warmup_days=1,
+    )
+
+    engine = BacktestEngine(config, preloaded_data={path: df})
+    engine.load_data()
+    combined = engine.combined_data
+    aggregator = engine.tf_aggregator
+    engine.blocked_by_cooldown = 3
+
+    engine.reset()
+    assert engine.combined_data is combined
+    assert engine.tf_aggregator is not aggregator
+    assert engine.blocked_by_cooldown == 0
+    assert engine.debug_counts["candles_loaded_1m"] == 1440
+
+    engine.reset(config.model_copy(update={"start_date": "2025-06-03"}))
+    assert engine.combined_data is None
+    engine.load_data()
+    assert len(engine.combined_data) == 2 * 1440
+
+
+def test_bench_make_engine_shared_reads_parquet_once(tmp_path):
+    from scripts import _bench_common as bench
+
+    path = str(tmp_path / "SPY.parquet")
+    _minute_frame("2025-06-02", 3 * 1440).to_parquet(path)
+    cfg = {"run_name": "shared", "data_paths": [path], "start_date": "2025-06-04",
+           "end_date": "2025-06-04", "htf_warmup_days": 1}
+
+    bench._shared_table.cache_clear()
+    engine = bench.make_engine(cfg, shared=True)
+    assert len(engine.preloaded_data[path]) == 2 * 1440  # warmup + run window only
+    assert len(engine.combined_data) == 1440
+    bench.make_engine(cfg, shared=True)
+    assert bench._shared_table.cache_info().hits == 1
+
+
+def test_profile_cached_engine_restores_loaded_data_without_load(tmp_path, monkeypatch):
+    from scripts import _profile_configs as profile_configs
+
+    path = str(tmp_path / "SPY.parquet")
+    _minute_frame("2025-06-02", 3 * 1440).to_parquet(path)
+    cfg = BacktestConfig(run_name="cached", symbols=["SPY"], data_paths=[path], trading_mode="AGGRESSIVE",
+                         start_date="2025-06-04", end_date="2025-06-04", htf_warmup_days=1)
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(profile_configs, "CACHE_DIR", cache_dir)
+
+    first = profile_configs.cached_engine(cfg)
+    assert profile_configs.cache_path(cfg).exists()
+    assert profile_configs.cache_path(cfg).parent == cache_dir
+    assert cache_dir.stat().st_mode & 0o777 == 0o700
+
+    monkeypatch.setattr(BacktestEngine, "load_data", lambda self: (_ for _ in ()).throw(AssertionError("reloaded")))
+    engine = profile_configs.cached_engine(cfg)
+    assert len(engine.combined_data) == len(first.combined_data) == 1440
+    assert len(engine.candles_1m_by_timestamp["SPY"]) == 1440
+    assert engine.debug_counts["candles_loaded_1m"] == 1440
@@ -0,0 +1,35 @@
+"""MarketStateEngine : instrumentation en tableau structuré (une ligne par appel)."""
+from engines.market_state import MarketStateEngine
+
+EMPTY_TF = {"1m": [], "5m": [], "15m": [], "1h": [], "4h": [], "1d": []}
+
+
+def test_instrumentation_array_grows_past_capacity():
+    engine = MarketStateEngine()
+    assert len(engine.instrumentation_array()) == 0
+
+    engine.enable_instrumentation_array(capacity=1)
+    for _ in range(3):
+        engine.create_market_state("SPY", EMPTY_TF, {})
+
+    arr = engine.instrumentation_array()
+    assert len(arr) == 3
+    assert (arr["t_total"] >= arr["t_detect"]).all()
+    assert (arr["daily"] == 0).all()
+    # Le journal dict historique reste opt-in et indépendant
+    assert not hasattr(engine, "_instrumentation_log")
+
+
+def test_timing_summary_streams_mean_and_p95_per_stage():
+    engine = MarketStateEngine()
+    assert engine.get_timing_summary() == {}
+
+    engine.enable_timing_summary()
+    for _ in range(10):
+        engine.create_market_state("SPY", EMPTY_TF, {})
+
+    summary = engine.get_timing_summary()
+    assert set(summary) == {"prepare", "detect", "bias", "profile", "finalize", "total"}
+    assert summary["total"]["n"] == 10
+    assert summary["total"]["mean_ms"] >= summary["detect"]["mean_ms"] >= 0
+    assert summary["total"]["p95_ms"] > 0
@@ -0,0 +1,122 @@
+import scripts.p064_checkpoint_monitor as mon
+
+
+def test_scan_tail_returns_last_scenario_and_progress():
+    lines = [
+        b"INFO ABLATION: baseline",
+        b"INFO Processed 10/100 minutes (10.0%)",
+        b"INFO ABLATION: no_news-fade",
+        b"INFO Processed 20/100 minutes (20.0%)",
+        b"INFO Processed a batch",
+        b"INFO Trade closed",
+    ]
+    assert mon._scan_tail(lines) == ("no_news-fade", (20, 100, 20.0))
+    assert mon._scan_tail([b"nothing here"]) == (None, None)
+
+
+def test_count_trades_reads_only_appended_complete_lines(tmp_path):
+    log = tmp_path / "run.log"
+    log.write_bytes(b"Trade closed A\nother\nTrade clo")
+    state = {"trades_offset": 0, "trades_count": 0}
+    assert mon._count_trades(log, state) == 1
+
+    with log.open("ab") as f:
+        f.write(b"sed B\nTrade closed C\n")
+    assert mon._count_trades(log, state) == 3
+    assert state["trades_offset"] == log.stat().st_size
+
+    log.write_bytes(b"Trade closed D\n")
+    assert mon._count_trades(log, state) == 1
+
+
+def test_tail_bytes_drops_partial_first_line(tmp_path):
+    log = tmp_path / "run.log"
+    log.write_text("".join(f"line {i}\n" for i in range(1000)))
+
+    lines = mon._tail_bytes(log, max_bytes=40)
+    assert lines[0].startswith(b"line 99")
+    assert lines[-2:] == [b"line 999", b""]
+    assert len(mon._tail_bytes(log)) == 600
+
+
+def test_get_rss_mb_reads_own_statm():
+    import os
+
+    rss = mon._get_rss_mb(os.getpid())
+    assert rss is not None and rss > 0
+    assert mon._get_rss_mb(None) is None
+
+
+def test_build_timeline_is_sorted_utc_ns_union(tmp_path):
+    import pandas as pd
+
+    spy = pd.date_range("2025-06-02 13:30", periods=3, freq="min", tz="UTC")
+    qqq = pd.date_range("2025-06-02 09:31", periods=3, freq="min", tz="America/New_York")
+    pd.DataFrame({"datetime": spy, "close": 1.0}).to_parquet(tmp_path / "SPY.parquet")
+    pd.DataFrame({"datetime": qqq, "close": 1.0}).to_parquet(tmp_path / "QQQ.parquet")
+
+    timeline = mon._build_timeline(tmp_path)
+    assert timeline.dtype == "int64"
+    expected = pd.date_range("2025-06-02 13:30", periods=4, freq="min", tz="UTC")
+    assert timeline.tolist() == expected.as_unit("ns").asi8.tolist()
+    assert len(mon._build_timeline(tmp_path / "missing")) == 0
+
+
+def test_load_timeline_reuses_cache_until_parquet_changes(tmp_path, monkeypatch):
+    import os
+
+    import pandas as pd
+
+    spy = tmp_path / "SPY.parquet"
+    pd.DataFrame({"datetime": pd.date_range("2025-06-02 13:30", periods=3, freq="min", tz="UTC")}).to_parquet(spy)
+    cache = tmp_path / "_timeline.npy"
+    first = mon._load_timeline(tmp_path, cache)
+    assert len(first) == 3 and cache.exists()
+
+    calls = []
+    build = mon._build_timeline
+    monkeypatch.setattr(mon, "_build_timeline", lambda d: calls.append(d) or build(d))
+    assert mon._load_timeline(tmp_path, cache).tolist() == first.tolist()
+    assert calls == []
+
+    pd.DataFrame({"datetime": pd.date_range("2025-06-02 13:30", periods=5, freq="min", tz="UTC")}).to_parquet(spy)
+    os.utime(spy, ns=(cache.stat().st_mtime_ns + 10**9,) * 2)
+    assert len(mon._load_timeline(tmp_path, cache)) == 5
+    assert len(calls) == 1
+
+
+def test_poll_interval_backs_off_when_log_is_idle():
+    assert mon._poll_interval(0) == mon.POLL_ACTIVE_S
+    assert mon._poll_interval(120) == mon.POLL_IDLE_S
+    assert mon._poll_interval(mon.STOP_IF_NO_UPDATE_FOR_S - 10) == 10
+    assert mon._poll_interval(mon.STOP_IF_NO_UPDATE_FOR_S - 0.5) == 1.0
+    # Past the deadline with the runner still alive: idle cadence, not a 1s busy poll.
+    assert mon._poll_interval(mon.STOP_IF_NO_UPDATE_FOR_S) == mon.POLL_IDLE_S
+    assert mon._poll_interval(mon.STOP_IF_NO_UPDATE_FOR_S + 5) == mon.POLL_IDLE_S
+
+
+def test_get_runner_pid_scans_proc_and_caches(monkeypatch):
+    import subprocess
+    import sys
+    import time
+
+    import uuid
+
+    needle = f"runner-{uuid.uuid4().hex}"
+    monkeypatch.setattr(mon, "RUNNER_NEEDLE", needle.encode())
+    monkeypatch.setattr(mon, "_runner_pid", None)
+    assert mon._get_runner_pid() is None
+
+    proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)", needle])
+    try:
+        # cmdline is only filled once the child has exec'd.
+        for _ in range(100):
+            if mon._get_runner_pid() is not None:
+                break
+            time.sleep(0.05)
+        assert mon._get_runner_pid() == proc.pid
+        assert mon._runner_pid == proc.pid
+    finally:
+        proc.kill()
+        proc.wait()
+    assert mon._get_runner_pid() is None
@@ -1,5 +1,6 @@
 from datetime import date
 
+import orjson
 import pandas as pd
 import requests
 
@@ -23,20 +24,21 @@ def test_polygon_provider_dataframe_shape_smoke(monkeypatch):
         class Resp:
             status_code = 200
 
-            def json(self_inner):
+            @property
+            def content(self_inner):
                 if calls["n"] == 1:
-                    return {
+                    return orjson.dumps({
                         "results": [
                             {"t": 1732113000000, "o": 1, "h": 2, "l": 0.5, "c": 1.5, "v": 10},
                         ],
                         "next_url": "https://api.polygon.io/v2/aggs/ticker/SPY/range/1/minute/2025-11-20/2025-11-21?cursor=abc",
-                    }
-                return {
+                    })
+                return orjson.dumps({
                     "results": [
                         {"t": 1732113060000, "o": 1.5, "h": 2.5, "l": 1.0, "c": 2.0, "v": 12},
                     ],
                     "next_url": None,
-                }
+                })
 
             def raise_for_status(self_inner):
                 return None
@@ -61,3 +63,115 @@ def test_polygon_provider_dataframe_shape_smoke(monkeypatch):
     assert list(df.columns) == ["datetime", "open", "high", "low", "close", "volume"]
     assert len(df) == 2
     assert pd.api.types.is_datetime64_any_dtype(df["datetime"])
+
+
+def test_polygon_provider_shards_long_range_into_single_page_requests(monkeypatch):
+    # 90 days > limit // 1440 days: one request per shard, no pagination needed.
+    sess = requests.Session()
+    urls = []
+
+    def fake_get(url, params=None, timeout=None):
+        urls.append(url)
+        day_from = url.rsplit("/", 2)[-2]
+        ts_ms = int(pd.Timestamp(day_from, tz="UTC").value // 1_000_000)
+
+        class Resp:
+            status_code = 200
+            text = ""
+
+            @property
+            def content(self_inner):
+                # The February shard carries JSON nulls: they must come back as NaN.
+                volume = None if day_from.startswith("2025-02") else 10
+                return orjson.dumps({"results": [{"t": ts_ms, "o": 1, "h": 2, "l": 0.5, "c": 1.5, "v": volume}]})
+
+        return Resp()
+
+    monkeypatch.setattr(sess, "get", fake_get)
+
+    cfg = PolygonConfig(api_key="dummy", concurrency=3)
+    df = download_1m_aggregates(
+        session=sess,
+        symbol="SPY",
+        start=date(2025, 1, 1),
+        end=date(2025, 4, 1),
+        cfg=cfg,
+    )
+
+    assert len(urls) == 3
+    assert sorted(urls) == sorted(set(urls))
+    assert df["datetime"].dt.strftime("%Y-%m-%d").tolist() == ["2025-01-01", "2025-02-04", "2025-03-10"]
+    assert df["volume"].isna().tolist() == [False, True, False]
+
+
+def test_polygon_results_to_columns_drops_rows_without_timestamp():
+    from scripts.providers.polygon_provider import _results_to_columns
+
+    cols = _results_to_columns(
+        [
+            {"t": 1732113000000, "o": 1, "h": 2, "l": 0.5, "c": 1.5, "v": 10},
+            {"o": 9, "h": 9, "l": 9, "c": 9, "v": 9},
+            {"t": 1732113060000, "o": 1.5, "h": 2.5, "l": 1.0, "c": 2.0},
+            {"t": 1732113120000, "o": None, "h": 2.5, "l": 1.0, "c": 2.0, "v": None},
+        ]
+    )
+
+    assert cols["t"].tolist() == [1732113000000, 1732113060000, 1732113120000]
+    assert cols["close"].tolist() == [1.5, 2.0, 2.0]
+    assert pd.isna(cols["open"][2]) and pd.isna(cols["volume"][2])
+    assert cols["volume"][0] == 10 and pd.isna(cols["volume"][1])
+
+
+def test_polygon_arrow_path_returns_sorted_utc_table(monkeypatch):
+    from scripts.providers.polygon_provider import download_1m_aggregates_arrow
+
+    sess = requests.Session()
+
+    class Resp:
+        status_code = 200
+        text = ""
+        content = orjson.dumps(
+            {
+                "results": [
+                    {"t": 1732113060000, "o": 1.5, "h": 2.5, "l": 1.0, "c": 2.0, "v": 12},
+                    {"t": 1732113000000, "o": 1, "h": 2, "l": 0.5, "c": 1.5, "v": 10},
+                ]
+            }
+        )
+
+    monkeypatch.setattr(sess, "get", lambda url, params=None, timeout=None: Resp())
+
+    cfg = PolygonConfig(api_key="dummy", sort="desc")
+    table = download_1m_aggregates_arrow(
+        session=sess, symbol="SPY", start=date(2025, 11, 20), end=date(2025, 11, 21), cfg=cfg
+    )
+
+    assert table.column_names == ["datetime", "open", "high", "low", "close", "volume"]
+    assert str(table.schema.field("datetime").type) == "timestamp[ns, tz=UTC]"
+    assert table.column("close").to_pylist() == [1.5, 2.0]
+
+
+def test_polygon_builds_pooled_gzip_session_when_none_given(monkeypatch):
+    from scripts.providers import polygon_provider as pp
+
+    built = []
+
+    class Resp:
+        status_code = 200
+        text = ""
+        content = orjson.dumps({"results": [{"t": 1732113000000, "o": 1, "h": 2, "l": 0.5, "c": 1.5, "v": 10}]})
+
+    def fake_build(cfg):
+        sess = build(cfg)
+        monkeypatch.setattr(sess, "get", lambda url, params=None, timeout=None: Resp())
+        built.append(sess)
+        return sess
+
+    build = pp._build_session
+    monkeypatch.setattr(pp, "_build_session", fake_build)
+
+    df = download_1m_aggregates(symbol="SPY", start=date(2025, 11, 20), end=date(2025, 11, 21), cfg=PolygonConfig(api_key="dummy"))
+
+    assert len(df) == 1 and len(built) == 1
+    assert built[0].headers["Accept-Encoding"] == "gzip"
+    assert built[0].get_adapter("https://api.polygon.io").max_retries.total == 5
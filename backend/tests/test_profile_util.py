@@ -0,0 +1,21 @@
+import scripts._profile_util as pu
+
+
+def _work():
+    return sum(i * i for i in range(1000))
+
+
+def test_cprofile_fallback_writes_text_report(tmp_path):
+    with pu.sampling_profiler(str(tmp_path / "prof"), cprofile=True) as prof:
+        _work()
+
+    assert prof.is_cprofile
+    assert prof.path.endswith(".txt")
+    assert "_work" in (tmp_path / "prof.txt").read_text()
+    assert "_work" in prof.text(None, "_work")
+
+
+def test_wants_cprofile_flag_or_missing_pyinstrument(monkeypatch):
+    assert pu.wants_cprofile(["--cprofile"])
+    monkeypatch.setattr(pu, "_SamplingProfiler", None)
+    assert pu.wants_cprofile([])
@@ -0,0 +1,132 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from scripts.quality_gates import RTHSpec, _rth_filter_et, compute_daily_missing_bars, run_quality_gates
+
+
+def _rth_frame():
+    """RTH bars 2025-03-06 → 03-12 (US DST starts 03-09), plus pre-market bars.
+
+    03-07 is cut to 300 bars, 03-11 has one NaN close inside RTH.
+    """
+    parts = []
+    for d in pd.bdate_range("2025-03-06", "2025-03-12"):
+        rth = pd.date_range(d + pd.Timedelta("9h30min"), periods=390, freq="min", tz="America/New_York")
+        parts.append(rth[:300] if d == pd.Timestamp("2025-03-07") else rth)
+        parts.append(pd.date_range(d + pd.Timedelta("7h"), periods=30, freq="min", tz="America/New_York"))
+    idx = parts[0].append(parts[1:]).tz_convert("UTC")
+    df = pd.DataFrame({"datetime": idx, "open": 1.0, "high": 1.5, "low": 0.5, "close": 1.2, "volume": 100})
+    df.loc[df["datetime"] == pd.Timestamp("2025-03-11 14:00", tz="UTC"), "close"] = np.nan
+    return df
+
+
+def test_daily_missing_bars_per_weekday_across_dst():
+    daily, corrupted = compute_daily_missing_bars(_rth_frame(), date(2025, 3, 6), date(2025, 3, 14))
+
+    assert [r["date_et"] for r in daily] == [
+        "2025-03-06", "2025-03-07", "2025-03-10", "2025-03-11", "2025-03-12", "2025-03-13",
+    ]
+    assert [r["actual_bars"] for r in daily] == [390, 300, 390, 390, 390, 0]
+    assert daily[1]["missing_pct"] == round(90 / 390 * 100, 3)
+    assert [r["ohlcv_non_nan_rth"] for r in daily] == [True, True, True, False, True, True]
+    assert corrupted == ["2025-03-07", "2025-03-11", "2025-03-13"]
+    assert compute_daily_missing_bars(_rth_frame(), date(2025, 3, 8), date(2025, 3, 10)) == ([], [])
+
+
+def test_rth_filter_is_dst_aware():
+    df = _rth_frame()
+    mask = _rth_filter_et(df["datetime"], RTHSpec())
+    et = df["datetime"].dt.tz_convert("America/New_York")
+    assert mask.sum() == 4 * 390 + 300
+    assert not mask[et.dt.hour < 9].any()
+
+
+def test_run_quality_gates_flags_nan_in_rth():
+    report = run_quality_gates(_rth_frame(), symbol="SPY", start=date(2025, 3, 6), end=date(2025, 3, 13))
+
+    assert report["gates"]["timezone_utc"] == {"passed": True, "values": ["UTC"]}
+    assert report["gates"]["no_duplicate_timestamps"] == {"passed": True, "duplicates": 0}
+    assert report["gates"]["ohlcv_non_nan_rth"]["nan_in_rth"] is True
+    assert report["corrupted_days"] == ["2025-03-07", "2025-03-11"]
+    assert report["passed"] is False
+
+
+def test_timezone_gate_reads_dtype_and_falls_back_for_object_columns():
+    from scripts.quality_gates import _timezone_values
+
+    utc = pd.Series(pd.date_range("2025-03-06", periods=3, freq="min", tz="UTC"))
+    assert _timezone_values(utc) == ["UTC"]
+    assert _timezone_values(utc.dt.tz_localize(None)) == ["naive"]
+    mixed = pd.Series([utc[0], utc[1].tz_convert("America/New_York"), utc[2]], dtype=object)
+    assert sorted(_timezone_values(mixed)) == ["America/New_York", "UTC"]
+
+
+def test_normalize_and_daily_missing_leave_input_frame_untouched():
+    from scripts.quality_gates import normalize_datetime_to_utc
+
+    df = _rth_frame()
+    df["datetime"] = df["datetime"].dt.tz_convert("America/New_York")
+    out = normalize_datetime_to_utc(df)
+    assert str(out["datetime"].dt.tz) == "UTC"
+    assert str(df["datetime"].dt.tz) == "America/New_York"
+
+    compute_daily_missing_bars(df, date(2025, 3, 6), date(2025, 3, 13))
+    assert list(df.columns) == ["datetime", "open", "high", "low", "close", "volume"]
+
+
+def test_rth_filter_matches_wall_clock_time_comparison():
+    # Every 30s across the 2025-03-09 DST switch, seconds included.
+    dt = pd.Series(pd.date_range("2025-03-07 13:00", "2025-03-11 22:00", freq="30s", tz="UTC"))
+    t = dt.dt.tz_convert("America/New_York").dt.time
+    spec = RTHSpec()
+    expected = (t >= spec.start_hm) & (t < spec.end_hm)
+    pd.testing.assert_series_equal(_rth_filter_et(dt, spec), expected, check_names=False)
+
+
+def test_daily_missing_bars_reuses_precomputed_nan_flags():
+    df = _rth_frame()
+    flags = np.zeros(len(df), dtype=bool)
+    daily, _ = compute_daily_missing_bars(df, date(2025, 3, 6), date(2025, 3, 13), row_has_nan=flags)
+    assert all(r["ohlcv_non_nan_rth"] for r in daily)
+
+
+def test_timezone_values_dedupes_equal_zones_from_distinct_objects():
+    from datetime import datetime, timezone
+    from zoneinfo import ZoneInfo
+
+    from scripts.quality_gates import _timezone_values
+
+    col = pd.Series(
+        [datetime(2025, 3, 6, tzinfo=timezone.utc), datetime(2025, 3, 7), None,
+         datetime(2025, 3, 6, tzinfo=ZoneInfo("UTC"))],
+        dtype=object,
+    )
+    assert _timezone_values(col) == ["UTC", "naive"]
+
+
+def test_daily_missing_bars_same_for_unsorted_and_duplicated_bars():
+    df = _rth_frame()
+    shuffled = pd.concat([df, df.iloc[:50]]).sample(frac=1, random_state=0)
+    assert compute_daily_missing_bars(shuffled, date(2025, 3, 6), date(2025, 3, 14)) == compute_daily_missing_bars(
+        df, date(2025, 3, 6), date(2025, 3, 14)
+    )
+
+
+def test_duplicate_count_sorted_fast_path_matches_duplicated():
+    from scripts.quality_gates import _duplicate_count
+
+    dt = _rth_frame()["datetime"]
+    dups = pd.concat([dt, dt.iloc[:3], dt.iloc[:1]])
+    assert _duplicate_count(dt) == 0
+    assert _duplicate_count(dups.sort_values()) == 4 == int(dups.duplicated().sum())
+    assert _duplicate_count(dups) == 4  # unsorted: hash fallback
+
+
+def test_daily_missing_bars_accepts_naive_utc_datetimes():
+    df = _rth_frame()
+    naive = df.assign(datetime=df["datetime"].dt.tz_localize(None))
+    assert compute_daily_missing_bars(naive, date(2025, 3, 6), date(2025, 3, 14)) == compute_daily_missing_bars(
+        df, date(2025, 3, 6), date(2025, 3, 14)
+    )
@@ -0,0 +1,47 @@
+import pandas as pd
+
+from scripts.sanity_check import detect_spam
+
+
+def _trades(rows):
+    df = pd.DataFrame(rows, columns=["symbol", "playbook_name", "entry_time", "pnl_r"])
+    df["entry_time"] = pd.to_datetime(df["entry_time"], utc=True)
+    return df
+
+
+def test_detect_spam_flags_close_entries_per_symbol_and_playbook():
+    df = _trades([
+        ("SPY", "A", "2025-06-02 14:20", 1.0),
+        ("SPY", "A", "2025-06-02 14:00", -1.0),
+        ("SPY", "A", "2025-06-02 14:10", 0.5),  # 10 min after 14:00
+        ("SPY", "B", "2025-06-02 14:05", 0.0),  # other playbook: not a repeat
+        ("QQQ", "A", "2025-06-02 14:01", 0.0),  # other symbol
+        ("QQQ", "A", "2025-06-02 15:01", 0.0),
+    ])
+
+    spam = detect_spam(df)
+
+    assert [(s["symbol"], s["playbook"], s["time_diff_minutes"]) for s in spam] == [
+        ("SPY", "A", 10.0),
+        ("SPY", "A", 10.0),
+    ]
+    assert spam[0]["prev_entry"] == pd.Timestamp("2025-06-02 14:00", tz="UTC")
+    assert spam[1]["curr_entry"] == pd.Timestamp("2025-06-02 14:20", tz="UTC")
+    assert detect_spam(df.iloc[:0]) == []
+
+
+def test_group_stats_counts_r_and_wins_per_key():
+    from scripts.sanity_check import group_stats
+
+    df = _trades([
+        ("SPY", "A", "2025-06-02 14:00", 1.5),
+        ("QQQ", "A", "2025-06-02 14:30", -1.0),
+        ("SPY", "B", "2025-06-02 15:00", 0.0),
+    ])
+
+    assert group_stats(df, "playbook_name") == {
+        "A": {"count": 2, "r": 0.5, "wins": 1},
+        "B": {"count": 1, "r": 0.0, "wins": 0},
+    }
+    assert group_stats(df, "symbol")["SPY"] == {"count": 2, "r": 1.5, "wins": 1}
+    assert group_stats(df.iloc[:0], "symbol") == {}
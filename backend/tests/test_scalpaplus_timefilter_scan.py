@@ -0,0 +1,13 @@
+import pandas as pd
+
+from scripts.scalpaplus_timefilter_scan import read_timeline
+
+
+def test_read_timeline_returns_index_only_within_bounds(tmp_path):
+    path = str(tmp_path / "SPY.parquet")
+    idx = pd.date_range("2025-06-02", periods=3 * 1440, freq="min", tz="UTC", name="datetime")
+    pd.DataFrame({"open": 1.0, "close": 1.2}, index=idx).to_parquet(path, row_group_size=1440)
+
+    assert read_timeline(path).equals(idx)
+    day = read_timeline(path, pd.Timestamp("2025-06-03", tz="UTC"), pd.Timestamp("2025-06-04", tz="UTC"))
+    assert day.equals(idx[1440:2880])
@@ -0,0 +1,14 @@
+"""session_codes : version vectorisée de get_session_info()['name']."""
+import pandas as pd
+
+from utils.timeframes import SESSION_NAMES, get_session_info, session_codes
+
+
+def test_session_codes_match_get_session_info_across_dst_switch():
+    # Inclut la bascule EST -> EDT du 10/03/2024 et des timestamps naïfs (UTC)
+    idx = pd.date_range("2024-03-08", "2024-03-12", freq="7min")
+    codes = session_codes(idx)
+
+    assert codes.dtype == "int8"
+    expected = [get_session_info(ts.to_pydatetime())["name"] for ts in idx]
+    assert [SESSION_NAMES[c] for c in codes] == expected
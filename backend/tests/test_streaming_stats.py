@@ -0,0 +1,23 @@
+"""StreamingStat : moyenne exacte + P95 P² proche de np.percentile."""
+import numpy as np
+
+from utils.streaming_stats import StreamingStat
+
+
+def test_streaming_stat_tracks_mean_and_p95():
+    samples = np.random.default_rng(0).exponential(2.0, 20_000)
+    stat = StreamingStat(0.95)
+    for x in samples:
+        stat.add(float(x))
+
+    assert stat.n == len(samples)
+    assert abs(stat.mean - samples.mean()) < 1e-9
+    assert abs(stat.quantile - np.percentile(samples, 95)) / np.percentile(samples, 95) < 0.02
+
+
+def test_streaming_stat_is_exact_for_few_samples():
+    stat = StreamingStat(0.95)
+    assert np.isnan(stat.quantile)
+    for x in (3.0, 1.0, 2.0):
+        stat.add(x)
+    assert stat.quantile == np.percentile([3.0, 1.0, 2.0], 95)
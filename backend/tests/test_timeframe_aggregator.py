@@ -206,3 +206,33 @@ class TestFloorTimestamp:
         floored = agg._floor_timestamp(utc_ts, "4h")
         expected = _et_to_utc_naive(2025, 1, 15, 9, 30)
         assert floored == expected
+
+
+def test_last_close_ts_tracks_last_completed_htf_candle():
+    agg = TimeframeAggregator()
+    assert agg.last_close_ts("SPY", "1h") is None
+
+    start = datetime(2025, 6, 2, 13, 30)
+    for i in range(95):
+        agg.add_1m_candle(_make_1m_candle(start + timedelta(minutes=i)))
+
+    for tf in ("5m", "15m", "1h"):
+        assert agg.last_close_ts("SPY", tf) == agg.get_candles("SPY", tf)[-1].timestamp
+    assert agg.last_close_ts("SPY", "1h") == datetime(2025, 6, 2, 14, 0)
+    assert agg.last_close_ts("SPY", "1d") is None
+    assert agg.last_close_ns("SPY", "1h") == int(datetime(2025, 6, 2, 14, 0, tzinfo=timezone.utc).timestamp()) * 10**9
+    assert agg.last_close_ns("SPY", "1d") == -1
+
+
+def test_add_1m_candle_flags_matches_dict_events():
+    from engines.timeframe_aggregator import CLOSE_1H, CLOSE_5M, CLOSE_10M, CLOSE_15M, close_events
+
+    agg_dict, agg_flags = TimeframeAggregator(), TimeframeAggregator()
+    start = datetime(2025, 6, 2, 13, 30)
+    for i in range(90):
+        candle = _make_1m_candle(start + timedelta(minutes=i))
+        flags = agg_flags.add_1m_candle_flags(candle)
+        assert close_events(flags) == agg_dict.add_1m_candle(candle)
+
+    # 14:59 UTC : clôture 5m + 10m + 15m + 1h
+    assert flags == CLOSE_5M | CLOSE_10M | CLOSE_15M | CLOSE_1H
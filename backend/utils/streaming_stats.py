@@ -0,0 +1,82 @@
+"""Statistiques en flux (mémoire O(1)) : moyenne + quantile P² (Jain & Chlamtac, 1985)"""
+import math
+from typing import List
+
+
+class StreamingStat:
+    """
+    Moyenne et quantile estimés au fil de l'eau, sans garder les échantillons.
+
+    Le quantile suit l'algorithme P² : 5 marqueurs dont les hauteurs sont
+    ajustées (interpolation parabolique) à chaque nouvel échantillon.
+    Exact tant qu'il y a au plus 5 échantillons.
+    """
+
+    def __init__(self, p: float = 0.95):
+        self.p = p
+        self.n = 0
+        self.total = 0.0
+        self._q: List[float] = []  # hauteurs des marqueurs
+        self._pos = [1.0, 2.0, 3.0, 4.0, 5.0]  # positions réelles
+        self._desired = [1.0, 1.0 + 2 * p, 1.0 + 4 * p, 3.0 + 2 * p, 5.0]  # positions voulues
+        self._incr = [0.0, p / 2, p, (1.0 + p) / 2, 1.0]
+
+    def add(self, x: float) -> None:
+        self.n += 1
+        self.total += x
+        q = self._q
+        if self.n <= 5:
+            q.append(x)
+            if self.n == 5:
+                q.sort()
+            return
+
+        # Cellule de x, en étendant les extrêmes si besoin
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+
+        pos = self._pos
+        for i in range(k + 1, 5):
+            pos[i] += 1
+        for i in range(5):
+            self._desired[i] += self._incr[i]
+
+        # Ajuster les 3 marqueurs centraux
+        for i in (1, 2, 3):
+            d = self._desired[i] - pos[i]
+            if (d >= 1 and pos[i + 1] - pos[i] > 1) or (d <= -1 and pos[i - 1] - pos[i] < -1):
+                s = 1 if d > 0 else -1
+                qp = q[i] + s / (pos[i + 1] - pos[i - 1]) * (
+                    (pos[i] - pos[i - 1] + s) * (q[i + 1] - q[i]) / (pos[i + 1] - pos[i])
+                    + (pos[i + 1] - pos[i] - s) * (q[i] - q[i - 1]) / (pos[i] - pos[i - 1])
+                )
+                if not q[i - 1] < qp < q[i + 1]:
+                    # Parabole hors bornes : interpolation linéaire
+                    qp = q[i] + s * (q[i + s] - q[i]) / (pos[i + s] - pos[i])
+                q[i] = qp
+                pos[i] += s
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.n if self.n else math.nan
+
+    @property
+    def quantile(self) -> float:
+        if self.n == 0:
+            return math.nan
+        if self.n > 5:
+            return self._q[2]
+        # Peu d'échantillons : quantile exact (interpolation linéaire, comme np.percentile)
+        values = sorted(self._q)
+        rank = self.p * (len(values) - 1)
+        lo = int(rank)
+        hi = min(lo + 1, len(values) - 1)
+        return values[lo] + (values[hi] - values[lo]) * (rank - lo)
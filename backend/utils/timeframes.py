@@ -1,6 +1,7 @@
 """Gestion des timeframes et sessions"""
 from datetime import datetime, time, timedelta
 from typing import List, Dict, Any, Optional
+import numpy as np
 import pandas as pd
 import pytz
 import json
@@ -151,6 +152,38 @@ def get_session_info(timestamp: datetime, debug_log: bool = False) -> Dict[str,
     return matched_session
 
 
+# Codes de session_codes() -> noms renvoyés par get_session_info()['name']
+SESSION_NAMES = ('ny', 'london', 'asia', 'off_hours')
+
+
+def session_codes(timestamps) -> np.ndarray:
+    """
+    Version vectorisée de get_session_info(ts)['name'] pour un ensemble de timestamps.
+    
+    Mêmes bornes ET (NY prioritaire sur London) ; les timestamps naïfs sont supposés UTC.
+    
+    Returns:
+        np.int8 array d'indices dans SESSION_NAMES
+    """
+    idx = pd.DatetimeIndex(timestamps)
+    if idx.tz is None:
+        idx = idx.tz_localize('UTC')
+    et = idx.tz_convert('US/Eastern')
+    # Heure murale ET en secondes (bornes inclusives comme dans get_session_info)
+    tod = (
+        et.hour.to_numpy(np.int64) * 3600
+        + et.minute.to_numpy(np.int64) * 60
+        + et.second.to_numpy(np.int64)
+        + (et.microsecond.to_numpy(np.int64) * 1000 + et.nanosecond.to_numpy(np.int64)) / 1e9
+    )
+    
+    codes = np.full(len(idx), 3, dtype=np.int8)  # off_hours
+    codes[(tod >= 18 * 3600) | (tod <= 2 * 3600 + 59 * 60)] = 2  # asia
+    codes[(tod >= 3 * 3600) & (tod <= 9 * 3600 + 29 * 60)] = 1  # london
+    codes[(tod >= 9 * 3600 + 30 * 60) & (tod <= 16 * 3600)] = 0  # ny
+    return codes
+
+
 def export_session_debug(output_dir: Path, run_id: str) -> Optional[str]:
     """Exporte le buffer de debug des sessions vers un fichier JSONL."""
     if not SESSION_DEBUG_BUFFER: